@@ -4,13 +4,26 @@ SQLAdmin: административные представления для м
 - Определяет наборы полей, фильтров, лейблов и иконок для каждой сущности.
 - Реализует защиту от удаления пользователей.
 - Настраивает видимость, доступность и визуализацию данных в админке.
+- Правки отелей и номеров сбрасывают их записи в кеше справочных данных (память воркеров и Redis),
+  кеш ответов отеля и поиска (app/cache/tagged.py: evict_catalog) и увеличивают версию отеля (ETag).
+- Правки броней через админку пересобирают реестр room_inventory_daily за затронутые периоды
+  и сбрасывают кеш доступности по ним.
 """
 
+from datetime import date
+from typing import Any
+
 from sqladmin import ModelView
+from starlette.requests import Request
 
 from app.bookings.models import Bookings
+from app.cache.tagged import evict_catalog, evict_stay
+from app.database import async_session_maker
+from app.hotels.dao import HotelDAO
 from app.hotels.models import Hotels
+from app.hotels.rooms.dao import RoomDAO
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import InventoryDAO
 from app.users.models import Users
 
 
@@ -50,10 +63,12 @@ class HotelsAdmin(ModelView, model=Hotels):
 
     Особенности:
     - Выводит все поля из таблицы Hotels + rooms (список комнат).
+    - Служебная колонка поиска location_search скрыта (вычисляется из location).
+    - После изменения/удаления отеля сбрасывает его запись в кеше справочных данных.
     - Иконка: отель.
     """
-    # В column_list попадают все поля модели Hotels + реляция rooms
-    column_list = [c.name for c in Hotels.__table__.c] + [Hotels.rooms]
+    # В column_list попадают все поля модели Hotels (кроме служебных) + реляция rooms
+    column_list = [c.name for c in Hotels.__table__.c if c.name != "location_search"] + [Hotels.rooms]
     column_labels = {
         Hotels.name: "Название",
         Hotels.location: "Расположение",
@@ -61,6 +76,7 @@ class HotelsAdmin(ModelView, model=Hotels):
         Hotels.rooms_quantity: "Кол-во номеров",
         Hotels.rooms: "Номера",
     }
+    form_excluded_columns = [Hotels.location_search]
     form_widget_args = {
         Hotels.id: {"readonly": True},
     }
@@ -68,6 +84,16 @@ class HotelsAdmin(ModelView, model=Hotels):
     name_plural = "Отели"
     icon = "fa-solid fa-hotel"  # Иконка отеля
 
+    async def after_model_change(self, data: dict, model: Any, is_created: bool, request: Request) -> None:
+        """Сбрасывает отель в кеше справочных данных и ответов (и поиск) и увеличивает его версию (ETag)."""
+        await HotelDAO.invalidate_cached(model.id)
+        await evict_catalog([model.id])
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        """Сбрасывает удалённый отель в кеше справочных данных и ответов (и поиск) и увеличивает его версию."""
+        await HotelDAO.invalidate_cached(model.id)
+        await evict_catalog([model.id])
+
 
 class RoomsAdmin(ModelView, model=Rooms):
     """
@@ -75,6 +101,8 @@ class RoomsAdmin(ModelView, model=Rooms):
 
     Особенности:
     - Отображает все поля комнаты + реляции hotel, bookings.
+    - После изменения/удаления номера сбрасывает его запись в кеше справочных данных
+      и кеш ответов его отеля (при переносе — и прежнего) и поиска.
     - Иконка: кровать.
     """
     # В column_list попадают все поля модели Rooms + hotel и bookings (реляции)
@@ -95,6 +123,21 @@ class RoomsAdmin(ModelView, model=Rooms):
     name_plural = "Номера"
     icon = "fa-solid fa-bed"  # Иконка номера
 
+    async def on_model_change(self, data: dict, model: Any, is_created: bool, request: Request) -> None:
+        """Запоминает отель номера до правки: при переносе в другой отель кеш сбрасывается у обоих."""
+        request.state.previous_hotel_id = None if is_created else model.hotel_id
+
+    async def after_model_change(self, data: dict, model: Any, is_created: bool, request: Request) -> None:
+        """Сбрасывает номер в кеше справочных данных, кеш ответов его отеля (и поиск), увеличивает версию отеля."""
+        await RoomDAO.invalidate_cached(model.id)
+        previous_hotel_id = getattr(request.state, "previous_hotel_id", None)
+        await evict_catalog({model.hotel_id} | ({previous_hotel_id} if previous_hotel_id is not None else set()))
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        """Сбрасывает удалённый номер в кеше справочных данных, кеш ответов его отеля (и поиск), версию отеля."""
+        await RoomDAO.invalidate_cached(model.id)
+        await evict_catalog([model.hotel_id])
+
 
 class BookingsAdmin(ModelView, model=Bookings):
     """
@@ -103,6 +146,8 @@ class BookingsAdmin(ModelView, model=Bookings):
     Особенности:
     - Фильтрация по комнате и датам.
     - Скрыты итого и количество дней из формы (только для чтения).
+    - После создания/изменения/удаления брони пересобирает реестр занятости за затронутые периоды
+      и сбрасывает по ним кеш доступности.
     - Иконка: книга.
     """
     column_list = [
@@ -126,10 +171,38 @@ class BookingsAdmin(ModelView, model=Bookings):
     }
     column_filters = [Bookings.room, Bookings.date_from, Bookings.date_to]
     # Исключаем из формы вычисляемые поля
-    form_excluded_columns = [Bookings.total_cost, Bookings.total_days]
+    form_excluded_columns = [Bookings.total_cost, Bookings.total_days, Bookings.stay]
     form_widget_args = {
         Bookings.id: {"readonly": True},
     }
     name = "Бронь"
     name_plural = "Брони"
     icon = "fa-solid fa-book"  # Иконка бронирования
+
+    async def on_model_change(self, data: dict, model: Any, is_created: bool, request: Request) -> None:
+        """Запоминает исходные комнату и даты брони: при их смене пересобрать нужно оба периода."""
+        request.state.inventory_stays = (
+            set() if is_created else {(model.room_id, model.date_from, model.date_to)}
+        )
+
+    async def after_model_change(self, data: dict, model: Any, is_created: bool, request: Request) -> None:
+        """Пересобирает реестр занятости по старому и новому периоду брони."""
+        stays = getattr(request.state, "inventory_stays", set()) | {(model.room_id, model.date_from, model.date_to)}
+        await self._rebuild_inventory(stays)
+
+    async def after_model_delete(self, model: Any, request: Request) -> None:
+        """Освобождает ночи удалённой брони в реестре занятости."""
+        await self._rebuild_inventory({(model.room_id, model.date_from, model.date_to)})
+
+    @staticmethod
+    async def _rebuild_inventory(stays: set[tuple[int, date, date]]) -> None:
+        """
+        Пересобирает room_inventory_daily по указанным (комната, заезд, выезд) в одной транзакции,
+        затем сбрасывает кеш доступности по ним (старый период брони освобождается — как при снятии).
+        """
+        async with async_session_maker() as session:
+            for room_id, date_from, date_to in stays:
+                await InventoryDAO.rebuild(session, room_id=room_id, date_from=date_from, date_to=date_to)
+            await session.commit()
+        for room_id, date_from, date_to in stays:
+            await evict_stay(room_id, date_from, date_to, freed=True)
@@ -1,21 +1,39 @@
 """
 DAO для работы с бронированиями:
 - Получение всех бронирований пользователя.
-- Добавление новой брони с проверкой дат и количества доступных мест.
+- Добавление новой брони с проверкой дат и количества доступных мест (атомарно, одним запросом).
+- Удаление брони с освобождением ночей в реестре room_inventory_daily.
+- Массовый импорт броней (CSV: INSERT или потоковый COPY) с пересборкой реестра за период импорта.
+- Точечная инвалидация кеша доступности (app/cache/tagged.py) после брони и её снятия.
 - Логирование ошибок через logger.
 """
 
-from datetime import date
+import asyncio
+import random
+from datetime import date, datetime
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable
 
-from sqlalchemy import and_, func, insert, select
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import Date, Integer, Select, delete, func, insert, literal, select
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.bookings.models import Bookings
+from app.cache.tagged import evict_stay
+from app.config import settings
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.database import async_session_maker, read_session
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import InventoryDAO
 from app.logger import logger
 
+# SQLSTATE, при которых atomic-бронь повторяется: serialization_failure и deadlock_detected
+RETRYABLE_SQLSTATES = {"40001", "40P01"}
+
+
+def _as_date(value: date | datetime) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
 
 class BookingDAO(BaseDAO):
     """
@@ -26,11 +44,12 @@ class BookingDAO(BaseDAO):
     model = Bookings
 
     @classmethod
-    async def find_all(cls, user_id: int) -> list:
+    async def find_all(cls, user_id: int, primary: bool = False) -> list:
         """
         Получает список всех бронирований пользователя с информацией о номерах.
 
         :param user_id: ID пользователя
+        :param primary: читать из основной БД (сразу после брони реплика может её ещё не содержать)
         :return: Список бронирований (dict с полями Bookings и Rooms)
         """
         # СЫРОЙ SQL:
@@ -58,7 +77,7 @@ class BookingDAO(BaseDAO):
             .join(Rooms, Rooms.id == Bookings.room_id, isouter=True)
             .where(Bookings.user_id == user_id)
         )
-        async with async_session_maker() as session:
+        async with read_session(primary) as session:
             bookings = await session.execute(get_bookings)
             return bookings.mappings().all()
 
@@ -73,76 +92,24 @@ class BookingDAO(BaseDAO):
         """
         Пытается создать новую бронь для комнаты на выбранные даты.
 
-        Логика:
-        - Считает количество занятых мест по room_id и датам (через CTE booked_rooms).
-        - Если есть свободные места — создаёт бронирование, иначе возвращает None.
+        Режим задаётся settings.BOOKING_INSERT_MODE:
+        - "atomic" (по умолчанию) — см. _add_atomic: один SQL-запрос, корректен при конкурентных бронях.
+        - "checked" — см. _add_checked: проверка мест, запрос цены и вставка отдельными запросами.
+        После успешной брони из кеша удаляются записи отеля комнаты с пересекающимися датами.
+        Ошибка БД логируется и пробрасывается: "мест нет" — только None, а не любой сбой.
 
         :param user_id: ID пользователя
         :param room_id: ID комнаты
         :param date_from: дата заезда
         :param date_to: дата выезда
         :return: Объект Bookings или None (если мест нет)
+        :raises SQLAlchemyError: бронь не удалось создать (в т.ч. исчерпаны повторы, см. _add_atomic)
         """
-        # СЫРОЙ SQL:
-        # WITH booked_rooms AS (
-        #     SELECT * FROM bookings
-        #     WHERE room_id = :room_id
-        #       AND date_from <= :date_to
-        #       AND date_to >= :date_from
-        # )
-        # SELECT rooms.quantity - COUNT(booked_rooms.room_id) AS rooms_left
-        # FROM rooms
-        # LEFT JOIN booked_rooms ON booked_rooms.room_id = rooms.id
-        # WHERE rooms.id = :room_id
-        # GROUP BY rooms.quantity, booked_rooms.room_id
-
         try:
-            async with async_session_maker() as session:
-                # CTE: ищет все пересекающиеся бронирования по датам
-                booked_rooms = select(Bookings).where(
-                    and_(
-                        Bookings.room_id == room_id,
-                        and_(
-                            Bookings.date_to >= date_from,
-                            Bookings.date_from <= date_to
-                        )
-                    )
-                ).cte("booked_rooms")
-
-                # Считает оставшееся количество свободных мест
-                get_rooms_left = (
-                    select(
-                        (Rooms.quantity - func.count(booked_rooms.c.room_id)).label("rooms_left")
-                    )
-                    .select_from(Rooms)
-                    .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
-                    .where(Rooms.id == room_id)
-                    .group_by(Rooms.quantity, booked_rooms.c.room_id)
-                )
-
-                rooms_left = await session.execute(get_rooms_left)
-                rooms_left: int = rooms_left.scalar()
-
-                if rooms_left > 0:
-                    # Узнаём цену комнаты
-                    get_price = select(Rooms.price).filter_by(id=room_id)
-                    price = await session.execute(get_price)
-                    price: int = price.scalar()
-
-                    # Добавляем новую бронь
-                    add_booking = insert(Bookings).values(
-                        room_id=room_id,
-                        user_id=user_id,
-                        date_from=date_from,
-                        date_to=date_to,
-                        price=price,
-                    ).returning(Bookings)
-
-                    new_booking = await session.execute(add_booking)
-                    await session.commit()
-                    return new_booking.scalar()
-                else:
-                    return None
+            if settings.BOOKING_INSERT_MODE == "atomic":
+                new_booking = await cls._add_atomic(user_id, room_id, date_from, date_to)
+            else:
+                new_booking = await cls._add_checked(user_id, room_id, date_from, date_to)
         except SQLAlchemyError:
             logger.exception(
                 "Database Exc: Cannot add booking",
@@ -153,6 +120,7 @@ class BookingDAO(BaseDAO):
                     "date_to": date_to,
                 },
             )
+            raise
         except Exception:
             logger.exception(
                 "Unknown Exc: Cannot add booking",
@@ -163,3 +131,277 @@ class BookingDAO(BaseDAO):
                     "date_to": date_to,
                 },
             )
+            raise
+        if new_booking is not None:
+            await evict_stay(room_id, date_from, date_to)
+        return new_booking
+
+    @classmethod
+    async def _add_atomic(
+        cls,
+        user_id: int,
+        room_id: int,
+        date_from: date,
+        date_to: date,
+    ) -> Bookings | None:
+        """
+        Создаёт бронь одним условным INSERT ... SELECT ... WHERE rooms_left > 0 RETURNING.
+
+        Логика:
+        - Проверка мест, цена комнаты, вставка брони и обновление реестра room_inventory_daily —
+          один запрос (data-modifying CTE).
+        - Перед ним строка комнаты блокируется (FOR NO KEY UPDATE): брони одной комнаты выполняются
+          по очереди, и запрос (READ COMMITTED — снимок берётся после получения блокировки) видит
+          все закоммиченные до него брони. Брони разных комнат друг друга не ждут; вставки броней
+          (проверка внешнего ключа — FOR KEY SHARE) блокировка не задерживает.
+        - Взаимоблокировка или ошибка сериализации (SQLSTATE 40P01, 40001 — например, с одновременным
+          снятием брони) повторяется; всего попыток settings.BOOKING_SERIALIZABLE_RETRIES,
+          после последней ошибка пробрасывается.
+
+        :return: Объект Bookings или None (если мест нет)
+        :raises DBAPIError: ошибка БД или исчерпаны попытки
+        """
+        # СЫРОЙ SQL:
+        # SELECT rooms.id FROM rooms WHERE rooms.id = :room_id FOR NO KEY UPDATE;
+        #
+        # WITH booked_rooms AS (
+        #     SELECT room_id, MAX(booked_count) AS rooms_booked
+        #     FROM room_inventory_daily
+        #     WHERE day >= :date_from AND day < :date_to AND room_id = :room_id
+        #     GROUP BY room_id
+        # ),
+        # new_booking AS (
+        #     INSERT INTO bookings (room_id, user_id, date_from, date_to, price)
+        #     SELECT rooms.id, :user_id, :date_from, :date_to, rooms.price
+        #     FROM rooms
+        #     LEFT JOIN booked_rooms ON booked_rooms.room_id = rooms.id
+        #     WHERE rooms.id = :room_id
+        #       AND rooms.quantity - COALESCE(booked_rooms.rooms_booked, 0) > 0
+        #     RETURNING *
+        # ),
+        # ledger AS (
+        #     INSERT INTO room_inventory_daily ... SELECT ... FROM new_booking
+        #     ON CONFLICT (room_id, day) DO UPDATE ...
+        # )
+        # SELECT * FROM new_booking
+
+        lock_room = select(Rooms.id).where(Rooms.id == room_id).with_for_update(key_share=True)
+        add_booking = cls.atomic_add_query(user_id, room_id, date_from, date_to)
+
+        retries = settings.BOOKING_SERIALIZABLE_RETRIES
+        for attempt in range(1, retries + 1):
+            try:
+                async with async_session_maker() as session:
+                    await session.execute(lock_room)
+                    new_booking = await session.execute(add_booking)
+                    new_booking = new_booking.scalar()
+                    await session.commit()
+                    return new_booking
+            except DBAPIError as e:
+                if getattr(e.orig, "sqlstate", None) not in RETRYABLE_SQLSTATES or attempt == retries:
+                    raise
+                logger.info(
+                    "Booking conflict, retrying",
+                    extra={"room_id": room_id, "attempt": attempt},
+                )
+                # Небольшая случайная пауза, чтобы конкурирующие повторы не столкнулись снова
+                await asyncio.sleep(random.uniform(0, 0.005 * attempt))
+
+    @classmethod
+    def atomic_add_query(cls, user_id: int, room_id: int, date_from: date, date_to: date) -> Select:
+        """
+        Строит запрос atomic-брони (см. _add_atomic): new_booking + ledger в виде DML-CTE.
+
+        :return: SELECT по CTE new_booking (пустой результат — мест нет)
+        """
+        booked_rooms = InventoryDAO.booked_rooms_cte(date_from, date_to, room_id=room_id)
+        rooms_left = Rooms.quantity - func.coalesce(booked_rooms.c.rooms_booked, 0)
+        new_booking = (
+            insert(Bookings)
+            .from_select(
+                ["room_id", "user_id", "date_from", "date_to", "price"],
+                select(
+                    Rooms.id,
+                    literal(user_id, Integer),
+                    literal(date_from, Date),
+                    literal(date_to, Date),
+                    Rooms.price,
+                )
+                .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
+                .where(Rooms.id == room_id, rooms_left > 0),
+            )
+            .returning(*Bookings.__table__.columns)
+            .cte("new_booking")
+        )
+        return select(aliased(Bookings, new_booking)).add_cte(InventoryDAO.book_cte(new_booking))
+
+    @classmethod
+    async def _add_checked(
+        cls,
+        user_id: int,
+        room_id: int,
+        date_from: date,
+        date_to: date,
+    ) -> Bookings | None:
+        """
+        Создаёт бронь в несколько запросов (проверка мест, цена, вставка).
+
+        Логика:
+        - Считает максимальную занятость комнаты за ночи брони (CTE booked_rooms по room_inventory_daily).
+        - Если есть свободные места — создаёт бронирование и в той же транзакции
+          увеличивает booked_count по всем ночам брони, иначе возвращает None.
+
+        ВНИМАНИЕ: между проверкой и вставкой конкурентный запрос может занять последний номер.
+
+        :return: Объект Bookings или None (если мест нет)
+        """
+        # СЫРОЙ SQL:
+        # WITH booked_rooms AS (
+        #     SELECT room_id, MAX(booked_count) AS rooms_booked
+        #     FROM room_inventory_daily
+        #     WHERE day >= :date_from AND day < :date_to AND room_id = :room_id
+        #     GROUP BY room_id
+        # )
+        # SELECT rooms.quantity - COALESCE(booked_rooms.rooms_booked, 0) AS rooms_left
+        # FROM rooms
+        # LEFT JOIN booked_rooms ON booked_rooms.room_id = rooms.id
+        # WHERE rooms.id = :room_id
+
+        async with async_session_maker() as session:
+            # CTE: занятость комнаты по ночам брони (читаются только запрошенные дни)
+            booked_rooms = InventoryDAO.booked_rooms_cte(date_from, date_to, room_id=room_id)
+
+            # Считает оставшееся количество свободных мест
+            get_rooms_left = (
+                select(
+                    (Rooms.quantity - func.coalesce(booked_rooms.c.rooms_booked, 0)).label("rooms_left")
+                )
+                .select_from(Rooms)
+                .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
+                .where(Rooms.id == room_id)
+            )
+
+            rooms_left = await session.execute(get_rooms_left)
+            rooms_left: int = rooms_left.scalar()
+
+            if rooms_left > 0:
+                # Узнаём цену комнаты
+                get_price = select(Rooms.price).filter_by(id=room_id)
+                price = await session.execute(get_price)
+                price: int = price.scalar()
+
+                # Добавляем новую бронь
+                add_booking = insert(Bookings).values(
+                    room_id=room_id,
+                    user_id=user_id,
+                    date_from=date_from,
+                    date_to=date_to,
+                    price=price,
+                ).returning(Bookings)
+
+                new_booking = await session.execute(add_booking)
+                new_booking = new_booking.scalar()
+                # Занимаем ночи в реестре в той же транзакции
+                await InventoryDAO.book(session, room_id, date_from, date_to)
+                await session.commit()
+                return new_booking
+            else:
+                return None
+
+    @classmethod
+    async def add_bulk(cls, data: list[dict], chunk_size: int | None = None) -> list[int] | None:
+        """
+        Массовый импорт броней (см. BaseDAO.add_bulk) без проверки свободных мест.
+        В той же транзакции пересобирается реестр room_inventory_daily за период импорта,
+        после коммита сбрасывается кеш по затронутым комнатам.
+
+        :param data: брони (room_id, user_id, date_from, date_to, price)
+        :param chunk_size: строк в одном INSERT
+        :return: id добавленных броней или None, если импорт не удался (ошибка в логе)
+        """
+        if not data:
+            return []
+        # Конвертер CSV отдаёт даты как datetime
+        stays = [(row["room_id"], _as_date(row["date_from"]), _as_date(row["date_to"])) for row in data]
+        period_from = min(date_from for _, date_from, _ in stays)
+        period_to = max(date_to for _, _, date_to in stays)
+        try:
+            async with async_session_maker() as session:
+                ids = await cls.insert_bulk(session, data, chunk_size)
+                await InventoryDAO.rebuild(session, date_from=period_from, date_to=period_to)
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception("Database Exc: Cannot bulk insert bookings", extra={"rows": len(data)})
+            return None
+        except Exception:
+            logger.exception("Unknown Exc: Cannot bulk insert bookings", extra={"rows": len(data)})
+            return None
+
+        for room_id in {room_id for room_id, _, _ in stays}:
+            await evict_stay(room_id, period_from, period_to)
+        return ids
+
+    @classmethod
+    async def copy_batches(
+        cls,
+        batches: AsyncIterable[list[dict]],
+        skip_rows: int = 0,
+        on_batch: Callable[[AsyncSession, int], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[int]:
+        """
+        Потоковый импорт броней через COPY (см. BaseDAO.copy_batches) без проверки свободных мест.
+        Реестр room_inventory_daily пересобирается один раз — за общий период загруженных порций
+        (и при ошибке — за уже закоммиченные), затем сбрасывается кеш по затронутым комнатам.
+        Между коммитами порций и пересборкой реестр отстаёт от таблицы bookings.
+        Пропущенные строки (skip_rows) в период тоже входят: если прошлая попытка импорта оборвалась
+        до пересборки, реестр досчитается при продолжении.
+
+        :param batches: асинхронный поток порций броней (room_id, user_id, date_from, date_to, price)
+        :param skip_rows: сколько первых строк потока уже загружено
+        :param on_batch: вызывается в транзакции каждой порции (см. BaseDAO.copy_batches)
+        :return: асинхронный итератор: число строк каждой закоммиченной порции
+        """
+        room_ids: set[int] = set()
+        period: list[date] = []  # [самый ранний заезд, самый поздний выезд]
+
+        async def tracked() -> AsyncIterator[list[dict]]:
+            async for rows in batches:
+                room_ids.update(row["room_id"] for row in rows)
+                dates_from = [_as_date(row["date_from"]) for row in rows]
+                dates_to = [_as_date(row["date_to"]) for row in rows]
+                period[:] = [min(dates_from + period[:1]), max(dates_to + period[1:])]
+                yield rows
+
+        try:
+            async for count in super().copy_batches(tracked(), skip_rows, on_batch):
+                yield count
+        finally:
+            if period:
+                async with async_session_maker() as session:
+                    await InventoryDAO.rebuild(session, date_from=period[0], date_to=period[1])
+                    await session.commit()
+                for room_id in room_ids:
+                    await evict_stay(room_id, period[0], period[1])
+
+    @classmethod
+    async def delete(cls, **filter_by) -> None:
+        """
+        Удаляет брони по фильтру и освобождает их ночи в room_inventory_daily (в одной транзакции).
+        После коммита сбрасывает кеш по отелям и датам удалённых броней (включая записи поиска).
+
+        :param filter_by: критерии фильтрации (например, id=..., user_id=...)
+        """
+        async with async_session_maker() as session:
+            query = (
+                delete(Bookings)
+                .filter_by(**filter_by)
+                .returning(Bookings.room_id, Bookings.date_from, Bookings.date_to)
+            )
+            deleted = await session.execute(query)
+            deleted = deleted.all()
+            for booking in deleted:
+                await InventoryDAO.release(session, booking.room_id, booking.date_from, booking.date_to)
+            await session.commit()
+
+        for booking in deleted:
+            await evict_stay(booking.room_id, booking.date_from, booking.date_to, freed=True)
@@ -3,13 +3,15 @@
 
 - Связывает пользователя, комнату, даты и цену бронирования.
 - total_cost и total_days рассчитываются автоматически (через Computed).
+- stay — период брони как daterange (Computed) с GiST-индексом (room_id, stay) для поиска пересечений (&&).
 - Поддерживает связи user <-> bookings, room <-> bookings для ORM.
 """
 
 from datetime import date
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Column, Computed, Date, ForeignKey, Integer
+from sqlalchemy import Column, Computed, Date, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import DATERANGE, Range
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -30,6 +32,7 @@ class Bookings(Base):
         - price: стоимость одной ночи
         - total_cost: итоговая сумма брони (вычисляется, Computed)
         - total_days: длительность в днях (вычисляется, Computed)
+        - stay: период брони [date_from, date_to) как daterange (вычисляется, Computed)
     """
     __tablename__ = "bookings"
 
@@ -47,6 +50,16 @@ class Bookings(Base):
     # total_days: количество дней бронирования (автоматически, Computed)
     total_days: Mapped[int] = mapped_column(Computed("date_to - date_from"))
 
+    # stay: полуинтервал [date_from, date_to) — день выезда не пересекается со следующим заездом.
+    # Пересечение периодов: Bookings.stay.op("&&")(func.daterange(date_from, date_to))
+    stay: Mapped[Range[date]] = mapped_column(DATERANGE, Computed("daterange(date_from, date_to)"))
+
+    # GiST-индекс (room_id, stay) для фильтров "комната + пересечение дат".
+    # Целочисленный room_id в GiST-индексе требует расширения btree_gist.
+    __table_args__ = (
+        Index("ix_bookings_room_id_stay", "room_id", "stay", postgresql_using="gist"),
+    )
+
     # ORM-связи
     user: Mapped["Users"] = relationship(back_populates="bookings")
     room: Mapped["Rooms"] = relationship(back_populates="bookings")
@@ -9,11 +9,12 @@
 from datetime import date
 from typing import List
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 
 from app.bookings.dao import BookingDAO
-from app.bookings.schemas import SBookingInfo, SNewBooking
+from app.bookings.schemas import SBooking, SBookingInfo, SNewBooking
 from app.bookings.service import BookingsService
+from app.responses import typed_response
 # from app.tasks.tasks import send_booking_confirmation_email  # Отключено для тестов/демо
 from app.users.dependencies import get_current_user
 from app.users.models import Users
@@ -24,28 +25,29 @@ router = APIRouter(
 )
 
 
-@router.get("")
-async def get_bookings(user: Users = Depends(get_current_user)) -> List[SBookingInfo]:
+@router.get("", response_model=List[SBookingInfo])
+async def get_bookings(user: Users = Depends(get_current_user)) -> Response:
     """
     Получает список всех бронирований пользователя.
 
-    Требуется аутентификация.
-    :return: Список объектов SBookingInfo (ваши бронирования)
+    Требуется аутентификация. Читается из основной БД: только что созданная бронь видна сразу.
+    :return: Список объектов SBookingInfo (ваши бронирования): строки DAO сразу в байты JSON
     """
-    return await BookingDAO.find_all(user_id=user.id)
+    return typed_response(await BookingDAO.find_all(user_id=user.id, primary=True), List[SBookingInfo])
 
 
 @router.post("")
 async def add_booking(
     booking: SNewBooking,
     user: Users = Depends(get_current_user),
-) -> SBookingInfo:
+) -> SBooking:
     """
     Добавляет новое бронирование для текущего пользователя.
 
     :param booking: Данные для новой брони
     :param user: Текущий пользователь (автоматически из Depends)
-    :return: Информация о созданной брони (SBookingInfo)
+    :return: Созданная бронь (SBooking)
+    :raises RoomFullyBooked: 409, если свободных номеров не осталось
     """
     new_booking = await BookingsService.add_booking(booking, user)
     # Отправка email-уведомления временно отключена (для тестов/демо)
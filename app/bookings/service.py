@@ -6,9 +6,11 @@
 - Возвращает валидированные данные для API.
 """
 
-from app.bookings.dao import BookingDAO
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+
+from app.bookings.dao import RETRYABLE_SQLSTATES, BookingDAO
 from app.bookings.schemas import SBooking, SNewBooking
-from app.exceptions import RoomCannotBeBookedException
+from app.exceptions import BookingTemporarilyUnavailable, RoomCannotBeBookedException, RoomFullyBooked
 from app.users.models import Users
 
 
@@ -32,15 +34,24 @@ class BookingsService:
 
         :param booking: Схема с параметрами новой брони (room_id, date_from, date_to)
         :param user: Модель текущего пользователя (Users)
-        :raises RoomCannotBeBookedException: Если нет доступных мест/ошибка бронирования
+        :raises RoomFullyBooked: Если на выбранные даты не осталось свободных номеров (409)
+        :raises BookingTemporarilyUnavailable: Исчерпаны попытки при конфликте с параллельными изменениями (503)
+        :raises RoomCannotBeBookedException: Ошибка БД (500)
         :return: Объект SBooking (валидированные данные бронирования)
         """
-        db_booking = await BookingDAO.add(
-            user.id,
-            booking.room_id,
-            booking.date_from,
-            booking.date_to,
-        )
-        if not db_booking:
+        try:
+            db_booking = await BookingDAO.add(
+                user.id,
+                booking.room_id,
+                booking.date_from,
+                booking.date_to,
+            )
+        except DBAPIError as e:
+            if getattr(e.orig, "sqlstate", None) in RETRYABLE_SQLSTATES:
+                raise BookingTemporarilyUnavailable
             raise RoomCannotBeBookedException
+        except SQLAlchemyError:
+            raise RoomCannotBeBookedException
+        if not db_booking:
+            raise RoomFullyBooked
         return SBooking.model_validate(db_booking)
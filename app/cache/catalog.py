@@ -0,0 +1,204 @@
+"""
+Двухуровневый кеш справочных данных (отели и номера по id), которые почти не меняются.
+
+- 1-й уровень — память воркера (LocalTTLCache): LRU с TTL и ограничением числа записей.
+- 2-й уровень — Redis (тот же клиент, что у fastapi-cache), общий для всех воркеров.
+- Изменение записи (админка) удаляет её из Redis и рассылает ключ через Redis pub/sub:
+  каждый воркер (CatalogCache.listen в main.lifespan) удаляет её из своей памяти.
+- Инвалидация увеличивает поколение ключа: загруженное из БД значение сохраняется, только если
+  поколение не изменилось с начала загрузки (иначе запись, прочитанная до правки, вернулась бы в кеш на весь TTL).
+- Попадания и промахи считаются по уровням: метрика Prometheus catalog_cache_requests_total{tier, result}.
+
+Пока Redis-клиент кеша не задан (тесты без lifespan, скрипты), оба уровня выключены.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from prometheus_client import Counter
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.cache.client import get_cache_redis
+from app.config import settings
+from app.logger import logger
+
+CATALOG_PREFIX = "tcache:catalog"
+INVALIDATION_CHANNEL = f"{CATALOG_PREFIX}:invalidate"
+
+CATALOG_CACHE_REQUESTS = Counter(
+    "catalog_cache_requests_total",
+    "Обращения к кешу справочных данных по уровням (local — память воркера, redis)",
+    ["tier", "result"],
+)
+
+
+class LocalTTLCache:
+    """
+    Кеш в памяти процесса: LRU-вытеснение при max_entries записей и TTL каждой записи.
+    Не потокобезопасен — рассчитан на один цикл событий воркера.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Возвращает значение и помечает его как недавно использованное.
+
+        :return: значение или default (нет записи или она истекла)
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Сохраняет значение; при переполнении вытесняет давно не использованные записи."""
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Отличает "нет записи" от закешированного значения
+_MISSING = object()
+
+# Сохраняет запись, только если поколение ключа не изменилось с начала загрузки (проверка и запись — атомарно)
+_STORE_IF_CURRENT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+def _generation_key(key: str) -> str:
+    return f"{CATALOG_PREFIX}:generation:{key}"
+
+
+class CatalogCache:
+    """
+    Двухуровневый кеш справочных данных: память воркера -> Redis -> загрузчик (DAO).
+    Ключи — вида "hotel:{id}", "room:{id}"; значения должны сериализоваться в JSON.
+    """
+    local = LocalTTLCache(settings.CATALOG_LOCAL_CACHE_MAX_ENTRIES, settings.CATALOG_LOCAL_CACHE_TTL)
+
+    @classmethod
+    async def get_or_load(cls, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Возвращает значение из памяти, иначе из Redis, иначе из loader() (и сохраняет на оба уровня).
+        None от loader не кешируется (записи ещё нет — она может появиться). Значение, во время загрузки
+        которого ключ инвалидировали, отдаётся вызывающему, но не кешируется ни на одном уровне.
+
+        :param key: ключ справочника
+        :param loader: корутина-функция загрузки из БД
+        :return: значение (JSON-совместимое)
+        """
+        redis = get_cache_redis()
+        if redis is None:
+            return await loader()
+
+        value = cls.local.get(key, _MISSING)
+        if value is not _MISSING:
+            CATALOG_CACHE_REQUESTS.labels("local", "hit").inc()
+            return value
+        CATALOG_CACHE_REQUESTS.labels("local", "miss").inc()
+
+        redis_key = f"{CATALOG_PREFIX}:{key}"
+        try:
+            cached, generation = await redis.mget(redis_key, _generation_key(key))
+        except RedisError:
+            logger.warning("Cache Exc: Cannot read catalog entry", extra={"key": key})
+            return await loader()
+        if cached is not None:
+            CATALOG_CACHE_REQUESTS.labels("redis", "hit").inc()
+            value = json.loads(cached)
+            cls.local.set(key, value)
+            return value
+        CATALOG_CACHE_REQUESTS.labels("redis", "miss").inc()
+
+        value = await loader()
+        if value is None:
+            return None
+        value = jsonable_encoder(value)
+        try:
+            stored = await redis.eval(
+                _STORE_IF_CURRENT, 2, redis_key, _generation_key(key),
+                generation or "0", json.dumps(value, ensure_ascii=False), settings.CATALOG_CACHE_EXPIRE,
+            )
+        except RedisError:
+            logger.warning("Cache Exc: Cannot store catalog entry", extra={"key": key})
+            stored = True
+        if stored:
+            cls.local.set(key, value)
+        return value
+
+    @classmethod
+    async def invalidate(cls, *keys: str) -> None:
+        """
+        Удаляет записи из Redis и из памяти всех воркеров (через pub/sub) и увеличивает их поколение:
+        загрузка, начатая до инвалидации, свой результат уже не сохранит.
+
+        :param keys: ключи справочника
+        """
+        for key in keys:
+            cls.local.delete(key)
+        redis = get_cache_redis()
+        if redis is None or not keys:
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            pipe.delete(*[f"{CATALOG_PREFIX}:{key}" for key in keys])
+            for key in keys:
+                pipe.incr(_generation_key(key))
+                # Поколение живёт дольше любой загрузки; после истечения счёт начнётся заново
+                pipe.expire(_generation_key(key), settings.CATALOG_CACHE_EXPIRE)
+            await pipe.execute()
+            await redis.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+        except RedisError:
+            logger.warning("Cache Exc: Cannot invalidate catalog entries", extra={"keys": keys})
+
+    @classmethod
+    async def listen(cls, redis: aioredis.Redis) -> None:
+        """
+        Слушает канал инвалидации и удаляет полученные ключи из памяти воркера.
+        Запускается фоновой задачей в main.lifespan; при обрыве соединения или любой другой ошибке
+        (таймаут сокета, некорректное сообщение в канале) — переподключается, а не завершается:
+        иначе воркер до перезапуска отдавал бы из памяти устаревшие записи. Пропущенные сообщения
+        не восстановить, поэтому память воркера очищается. Останавливается только отменой задачи.
+        """
+        while True:
+            try:
+                async with redis.pubsub(ignore_subscribe_messages=True) as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    async for message in pubsub.listen():
+                        for key in json.loads(message["data"]):
+                            cls.local.delete(key)
+            except RedisError:
+                logger.warning("Cache Exc: Catalog invalidation channel lost, reconnecting")
+            except Exception:
+                logger.exception("Cache Exc: Catalog invalidation listener failed, reconnecting")
+            cls.local.clear()
+            await asyncio.sleep(1)
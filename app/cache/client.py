@@ -0,0 +1,30 @@
+"""
+Redis-клиент собственного слоя кеширования (app/cache).
+
+- Задаётся в main.lifespan тем же клиентом, что и бэкенд fastapi-cache.
+- Пока клиент не задан (тесты без lifespan, скрипты, воркеры), кеширование выключено:
+  декораторы просто вызывают функцию, инвалидация ничего не делает.
+"""
+
+from redis import asyncio as aioredis
+
+_redis: aioredis.Redis | None = None
+
+
+def init_cache_redis(redis: aioredis.Redis | None) -> None:
+    """
+    Задаёт Redis-клиент кеша (None — выключить кеширование).
+
+    :param redis: клиент redis.asyncio с decode_responses=True
+    """
+    global _redis
+    _redis = redis
+
+
+def get_cache_redis() -> aioredis.Redis | None:
+    """
+    Возвращает Redis-клиент кеша.
+
+    :return: клиент или None, если кеш не инициализирован
+    """
+    return _redis
@@ -0,0 +1,416 @@
+"""
+Кеш ответов о доступности номеров с точечной инвалидацией по броням.
+
+Каждая запись кеша помечается тегами зависимостей ("hotel:{id}", "search") и окном дат [from, to),
+за которое она считает занятость. Для каждого тега в Redis хранится индекс записей (sorted set):
+- score — момент истечения записи (просроченные члены вычищаются при записи);
+- member — "{from}|{to}|{ключ записи}".
+
+Бронь комнаты отеля H на [date_from, date_to) удаляет только записи с тегом "hotel:H",
+чьё окно пересекается с датами брони. Снятие брони дополнительно удаляет пересекающиеся
+записи поиска ("search"): освободившийся номер может добавить в выдачу отель, которого в ней не было.
+Изменение справочника (цена, количество, новые и удалённые отели и номера — админка и импорт CSV)
+удаляет записи его отелей и все записи поиска за любые даты (evict_catalog).
+
+Гонка "запрос посчитал ответ до брони, а записал в кеш после инвалидации" закрыта отметкой
+инвалидации тега: запись не сохраняется, если её тег инвалидировали после начала вычисления
+(с репликами — и за REPLICA_MAX_LAG секунд до него: реплика могла ещё не получить бронь).
+
+Промах по популярному ключу не вызывает лавину пересчётов (single-flight):
+- в процессе ответ считает один запрос на ключ, остальные ждут его результат;
+- между воркерами (settings.CACHE_REDIS_LOCK) — тот, кто взял Redis-блокировку ключа,
+  остальные ждут появления записи в Redis.
+
+Запись, истёкшая по времени (мягкий TTL), ещё stale_ttl секунд отдаётся сразу, а пересчитывается
+одной фоновой задачей (stale-while-revalidate) — промах по времени не ложится на задержку запроса.
+
+С response_model в Redis лежит уже сериализованный по схеме ответ (app/responses.py):
+попадание отдаётся как есть — без разбора JSON, валидации pydantic и повторной сериализации.
+
+Ошибки Redis не ломают запросы и брони: они логируются, а ответ считается без кеша.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import date
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterable
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from redis.exceptions import LockError, RedisError
+
+from app.cache.client import get_cache_redis
+from app.cache.versions import HotelVersions
+from app.config import settings
+from app.database import detached_context, replica_lag_allowance
+from app.logger import logger
+from app.responses import dumps, typed_json, typed_response
+
+CACHE_PREFIX = "tcache"
+
+# Тег записей поиска отелей по локации (GET /hotels/{location})
+SEARCH_TAG = "search"
+
+# Время жизни индекса тега: заведомо больше TTL любой записи (просроченные члены удаляются при записи)
+TAG_INDEX_TTL = 24 * 60 * 60
+
+# Сколько помнить отметку инвалидации тега: дольше любого вычисления ответа
+EVICTION_MARK_TTL = 60
+
+# Как часто воркер без блокировки проверяет, посчитана ли запись (сек)
+LOCK_POLL_INTERVAL = 0.05
+
+# Вычисляемые сейчас записи процесса: ключ -> Future с JSON ответа (single-flight)
+_inflight: dict[str, asyncio.Future] = {}
+
+# Фоновые пересчёты устаревших записей (stale-while-revalidate): задачи и их ключи
+_background_tasks: set[asyncio.Future] = set()
+_refreshing: set[str] = set()
+
+
+def hotel_tag(hotel_id: int) -> str:
+    """Тег записей, зависящих от занятости номеров отеля."""
+    return f"hotel:{hotel_id}"
+
+
+def request_window(params: dict) -> tuple[date, date]:
+    """Окно записи — даты запроса (date_from, date_to)."""
+    return params["date_from"], params["date_to"]
+
+
+def _entry_key(namespace: str, params: dict) -> str:
+    """Ключ записи: пространство имён + хеш нормализованных параметров запроса."""
+    raw = json.dumps(jsonable_encoder(params), sort_keys=True, ensure_ascii=False)
+    return f"{CACHE_PREFIX}:{namespace}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def encode_entry(body: str, fresh_until: float) -> str:
+    """
+    Значение записи в Redis: момент, после которого запись устарела (мягкий TTL), и JSON ответа —
+    первой строкой и остатком, чтобы отдавать JSON без разбора.
+    """
+    return f"{fresh_until}\n{body}"
+
+
+def _decode_entry(value: str) -> tuple[float, str]:
+    """Разбирает значение записи: (fresh_until, JSON ответа)."""
+    fresh_until, body = value.split("\n", 1)
+    return float(fresh_until), body
+
+
+def _tag_key(tag: str) -> str:
+    return f"{CACHE_PREFIX}:tag:{tag}"
+
+
+def _eviction_mark_key(tag: str) -> str:
+    return f"{CACHE_PREFIX}:evicted:{tag}"
+
+
+def _lock_key(key: str) -> str:
+    return f"{CACHE_PREFIX}:lock:{key}"
+
+
+def tagged_cache(
+    namespace: str,
+    window: Callable[[dict], tuple[date, date]],
+    tags: Callable[[dict, Any], Iterable[str]],
+    key_params: Callable[[dict], dict] | None = None,
+    expire: int | None = None,
+    stale_ttl: int | None = None,
+    response_model: Any = None,
+):
+    """
+    Декоратор эндпоинта: кеширует JSON-ответ в Redis с тегами зависимостей.
+    Эндпоинт должен вызываться с именованными аргументами (так их передаёт FastAPI).
+    Конкурентные промахи по одному ключу ждут один пересчёт (см. _single_flight, _load).
+
+    Stale-while-revalidate: запись свежая expire секунд (мягкий TTL), затем ещё stale_ttl секунд
+    (жёсткий TTL = expire + stale_ttl) отдаётся сразу, а одна фоновая задача её пересчитывает.
+    Брони по-прежнему удаляют записи сразу — устаревшей может быть только запись, истёкшая по времени.
+
+    :param namespace: пространство имён ключей (обычно имя эндпоинта)
+    :param window: kwargs -> (date_from, date_to) — окно дат, за которое ответ считает занятость
+    :param tags: (kwargs, ответ в виде JSON) -> теги записи
+    :param key_params: kwargs -> параметры ключа (нормализация); по умолчанию — kwargs как есть
+    :param expire: мягкий TTL записи, сек; по умолчанию settings.SEARCH_CACHE_EXPIRE
+    :param stale_ttl: сколько ещё отдавать запись после мягкого TTL, сек;
+        по умолчанию settings.SEARCH_CACHE_STALE_TTL (0 — без stale-while-revalidate)
+    :param response_model: схема ответа; если задана, декоратор всегда возвращает готовый
+        JSON Response (ответ валидируется и сериализуется один раз — при записи в кеш)
+    """
+    def serialize(result: Any) -> str:
+        """JSON ответа для записи: по схеме ответа, если она задана."""
+        return (typed_json(result, response_model) if response_model else dumps(result)).decode()
+
+    def respond(body: str) -> Any:
+        """Ответ из JSON записи: готовый Response (по схеме) или данные."""
+        if response_model:
+            return Response(body, media_type="application/json")
+        return orjson.loads(body)
+
+    def direct(result: Any) -> Any:
+        """Ответ без кеша (кеш выключен или Redis недоступен)."""
+        return typed_response(result, response_model) if response_model else result
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            redis = get_cache_redis()
+            if redis is None:
+                return direct(await func(*args, **kwargs))
+
+            key = _entry_key(namespace, key_params(kwargs) if key_params else kwargs)
+            try:
+                cached = await redis.get(key)
+            except RedisError:
+                logger.warning("Cache Exc: Cannot read cache entry", extra={"key": key})
+                return direct(await func(*args, **kwargs))
+
+            async def compute() -> str:
+                return serialize(await func(*args, **kwargs))
+
+            async def store(body: str, started_at: float) -> None:
+                date_from, date_to = window(kwargs)
+                await _store(
+                    key, body, list(tags(kwargs, orjson.loads(body))), date_from, date_to,
+                    expire or settings.SEARCH_CACHE_EXPIRE,
+                    settings.SEARCH_CACHE_STALE_TTL if stale_ttl is None else stale_ttl,
+                    started_at,
+                )
+
+            def load() -> Awaitable[str]:
+                return _load(redis, key, compute, store)
+
+            if cached is not None:
+                fresh_until, body = _decode_entry(cached)
+                if fresh_until <= time.time() and key not in _refreshing and key not in _inflight:
+                    _refreshing.add(key)
+                    _spawn(_refresh(key, load))
+                return respond(body)
+            return respond(await _single_flight(key, load))
+        return wrapper
+    return decorator
+
+
+async def _single_flight(key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Схлопывает конкурентные промахи по ключу в процессе: считает один вызов load(),
+    остальные ждут его результат (или его исключение).
+    """
+    while key in _inflight:
+        future = _inflight[key]
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # Отменён считавший запрос (клиент отключился) — считать будет один из ожидающих
+
+    future = asyncio.get_running_loop().create_future()
+    # Исключение, которое никто не ждал, не должно попадать в лог как "never retrieved"
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    _inflight[key] = future
+    try:
+        data = await load()
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(data)
+        return data
+    finally:
+        del _inflight[key]
+
+
+def _spawn(coro: Awaitable[Any]) -> None:
+    """
+    Запускает фоновую задачу и держит на неё ссылку до завершения (иначе её может собрать GC).
+    Задача не наследует сессии запроса, из которого запущена (см. database.detached_context).
+    """
+    task = asyncio.get_running_loop().create_task(coro, context=detached_context())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _refresh(key: str, load: Callable[[], Awaitable[Any]]) -> None:
+    """Фоновый пересчёт устаревшей записи; ошибка не трогает запись — она доживёт до жёсткого TTL."""
+    try:
+        await _single_flight(key, load)
+    except Exception:
+        logger.exception("Cache Exc: Cannot refresh stale cache entry", extra={"key": key})
+    finally:
+        _refreshing.discard(key)
+
+
+async def _load(redis, key: str, compute: Callable[[], Awaitable[str]], store) -> str:
+    """
+    Промах: вызывает эндпоинт (compute — JSON его ответа) и сохраняет ответ.
+    При settings.CACHE_REDIS_LOCK считает только воркер, взявший блокировку ключа,
+    остальные ждут появления записи (если её так и нет — считают сами).
+    Фоновый пересчёт устаревшей записи при занятой блокировке сразу получает ту же запись и завершается.
+    """
+    lock = None
+    if settings.CACHE_REDIS_LOCK:
+        lock = redis.lock(_lock_key(key), timeout=settings.CACHE_LOCK_TIMEOUT)
+        try:
+            if not await lock.acquire(blocking=False):
+                lock = None
+                cached = await _wait_for_entry(redis, key)
+                if cached is not None:
+                    return _decode_entry(cached)[1]
+        except RedisError:
+            logger.warning("Cache Exc: Cannot lock cache entry", extra={"key": key})
+            lock = None
+
+    started_at = time.time()
+    try:
+        body = await compute()
+        try:
+            await store(body, started_at)
+        except RedisError:
+            logger.warning("Cache Exc: Cannot store cache entry", extra={"key": key})
+        return body
+    finally:
+        if lock is not None:
+            try:
+                await lock.release()
+            except (LockError, RedisError):
+                # Блокировка истекла по таймауту — её уже мог взять другой воркер
+                pass
+
+
+async def _wait_for_entry(redis, key: str) -> str | None:
+    """
+    Ждёт, пока другой воркер посчитает запись: пока держится его блокировка, но не дольше её таймаута.
+
+    :return: значение записи или None (блокировка снята без записи)
+    """
+    deadline = time.monotonic() + settings.CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        cached, locked = await redis.pipeline(transaction=False).get(key).exists(_lock_key(key)).execute()
+        if cached is not None or not locked:
+            return cached
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+    return None
+
+
+async def _store(
+    key: str,
+    body: str,
+    tags: list[str],
+    date_from: date,
+    date_to: date,
+    expire: int,
+    stale_ttl: int,
+    started_at: float,
+) -> None:
+    """
+    Сохраняет запись (см. encode_entry) на expire + stale_ttl секунд и добавляет её в индексы тегов.
+    Не сохраняет, если какой-то из тегов инвалидирован после started_at (ответ мог устареть)
+    или незадолго до него — в пределах отставания реплик, с которых ответ читался.
+    """
+    redis = get_cache_redis()
+    if tags:
+        marks = await redis.mget([_eviction_mark_key(tag) for tag in tags])
+        not_before = started_at - replica_lag_allowance()
+        if any(mark is not None and float(mark) >= not_before for mark in marks):
+            return
+
+    now = time.time()
+    member = f"{date_from.isoformat()}|{date_to.isoformat()}|{key}"
+    pipe = redis.pipeline(transaction=False)
+    pipe.set(key, encode_entry(body, fresh_until=now + expire), ex=expire + stale_ttl)
+    for tag in tags:
+        tag_key = _tag_key(tag)
+        pipe.zremrangebyscore(tag_key, "-inf", now)
+        pipe.zadd(tag_key, {member: now + expire + stale_ttl})
+        pipe.expire(tag_key, TAG_INDEX_TTL)
+    await pipe.execute()
+
+
+async def evict(tags: Iterable[str], date_from: date, date_to: date) -> None:
+    """
+    Удаляет записи с любым из тегов, чьё окно пересекается с [date_from, date_to).
+
+    :param tags: теги зависимостей
+    :param date_from: дата заезда брони
+    :param date_to: дата выезда брони
+    """
+    redis = get_cache_redis()
+    if redis is None:
+        return
+
+    tags = list(tags)
+    now = time.time()
+    booking_from, booking_to = date_from.isoformat(), date_to.isoformat()
+    try:
+        # Сначала отметки: конкурентный промах по этим тегам не запишет устаревший ответ
+        pipe = redis.pipeline(transaction=False)
+        for tag in tags:
+            pipe.set(_eviction_mark_key(tag), now, ex=EVICTION_MARK_TTL)
+            pipe.zrangebyscore(_tag_key(tag), now, "+inf")
+        members_by_tag = (await pipe.execute())[1::2]
+
+        pipe = redis.pipeline(transaction=False)
+        keys = set()
+        for tag, members in zip(tags, members_by_tag):
+            for member in members:
+                entry_from, entry_to, key = member.split("|", 2)
+                # ISO-даты сравниваются как строки; окна полуоткрытые
+                if entry_from < booking_to and entry_to > booking_from:
+                    keys.add(key)
+                    pipe.zrem(_tag_key(tag), member)
+        if keys:
+            pipe.delete(*keys)
+            await pipe.execute()
+    except RedisError:
+        logger.warning(
+            "Cache Exc: Cannot evict cache entries",
+            extra={"tags": tags, "date_from": date_from, "date_to": date_to},
+        )
+
+
+async def evict_stay(room_id: int, date_from: date, date_to: date, freed: bool = False) -> None:
+    """
+    Инвалидирует кеш после изменения занятости комнаты на [date_from, date_to)
+    и увеличивает версию её отеля (ETag, app/cache/versions.py).
+
+    :param room_id: ID комнаты
+    :param date_from: дата заезда брони
+    :param date_to: дата выезда брони
+    :param freed: бронь снята (места освободились) — также сбросить пересекающиеся записи поиска
+    """
+    if get_cache_redis() is None:
+        return
+
+    # Импорт здесь: RoomDAO сам сбрасывает этот кеш после изменения номеров (evict_catalog)
+    from app.hotels.rooms.dao import RoomDAO
+
+    room = await RoomDAO.find_by_id_cached(room_id)
+    hotel_ids = [room["hotel_id"]] if room else []
+    tags = [hotel_tag(hotel_id) for hotel_id in hotel_ids]
+    if freed:
+        tags.append(SEARCH_TAG)
+    await evict(tags, date_from, date_to)
+    # Версии для ETag — после инвалидации: с новой версией клиент получит уже свежий ответ
+    await HotelVersions.bump(hotel_ids)
+
+
+async def evict_catalog(hotel_ids: Iterable[int]) -> None:
+    """
+    Инвалидирует кеш после изменения справочника (отели и номера: цена, количество, новые и удалённые)
+    и увеличивает версии отелей (ETag). Удаляются записи этих отелей и все записи поиска за любые даты:
+    изменённый или новый отель может появиться в выдаче, где его не было.
+
+    :param hotel_ids: ID затронутых отелей (у перенесённого номера — и прежний отель); может быть пустым
+    """
+    hotel_ids = set(hotel_ids)
+    await evict([hotel_tag(hotel_id) for hotel_id in hotel_ids] + [SEARCH_TAG], date.min, date.max)
+    await HotelVersions.bump(hotel_ids)
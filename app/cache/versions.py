@@ -0,0 +1,128 @@
+"""
+Версии данных отелей для условных GET (ETag / If-None-Match).
+
+- В Redis хранится счётчик версии на отель (tcache:version:hotel:{id}) и общий счётчик
+  (tcache:version:all) — они увеличиваются при бронях и изменениях справочника (админка, импорт CSV),
+  всегда после инвалидации кеша ответов (app/cache/tagged.py: evict_stay, evict_catalog).
+- ETag ответа — хеш пути и query-параметров запроса, нужных счётчиков и "эпохи" Redis
+  (случайная метка: после очистки Redis счётчики начнутся заново, но старые ETag не совпадут).
+- Зависимости hotel_etag/search_etag проверяют If-None-Match до обработчика: при совпадении
+  сразу 304 — без запросов к Postgres, кеша ответов и сериализации pydantic-моделей.
+  Иначе ETag запоминается в request.state.etag, а заголовок ставит middleware (main.py):
+  эндпоинты с кешем возвращают готовый Response, в который зависимость заголовок не добавит.
+
+Версия увеличивается после инвалидации кеша ответов: клиент, получивший новую версию,
+уже не получит устаревший ответ из кеша.
+
+С репликами ответ первые REPLICA_MAX_LAG секунд после увеличения версии может быть прочитан с реплики,
+ещё не получившей запись: такой ответ уходит без ETag (момент увеличения хранится рядом со счётчиком),
+иначе клиент получал бы 304 на устаревшие данные до следующей записи.
+"""
+
+import hashlib
+import time
+import uuid
+from typing import Iterable
+
+from fastapi import Request
+from redis.exceptions import RedisError
+
+from app.cache.client import get_cache_redis
+from app.database import replica_lag_allowance
+from app.exceptions import NotModifiedException
+from app.logger import logger
+from app.responses import NDJSON_MEDIA_TYPE, accepts_ndjson
+
+VERSION_PREFIX = "tcache:version"
+EPOCH_KEY = f"{VERSION_PREFIX}:epoch"
+ALL_VERSION_KEY = f"{VERSION_PREFIX}:all"
+
+
+def _hotel_version_key(hotel_id: int) -> str:
+    return f"{VERSION_PREFIX}:hotel:{hotel_id}"
+
+
+def _bumped_at_key(version_key: str) -> str:
+    return f"{version_key}:bumped_at"
+
+
+class HotelVersions:
+    """Счётчики версий данных отелей в Redis."""
+
+    @classmethod
+    async def bump(cls, hotel_ids: Iterable[int]) -> None:
+        """
+        Увеличивает версии отелей и общую версию (вызывать после коммита и инвалидации кеша)
+        и запоминает момент увеличения (ETag не отдаётся, пока реплики могут отставать от записи).
+
+        :param hotel_ids: ID изменённых отелей
+        """
+        redis = get_cache_redis()
+        if redis is None:
+            return
+        try:
+            now = time.time()
+            pipe = redis.pipeline(transaction=False)
+            for version_key in [_hotel_version_key(hotel_id) for hotel_id in set(hotel_ids)] + [ALL_VERSION_KEY]:
+                pipe.incr(version_key)
+                pipe.set(_bumped_at_key(version_key), now)
+            await pipe.execute()
+        except RedisError:
+            logger.warning("Cache Exc: Cannot bump hotel versions", extra={"hotel_ids": list(hotel_ids)})
+
+    @classmethod
+    async def etag(cls, request: Request, version_key: str, variant: str = "") -> tuple[str | None, float]:
+        """
+        Считает ETag запроса по версии version_key.
+
+        :param variant: представление ответа (например, медиатип NDJSON): у разных представлений — разные ETag
+
+        :return: (ETag в кавычках или None — кеш выключен или Redis недоступен;
+            момент последнего увеличения версии, time.time(), 0 — неизвестен)
+        """
+        redis = get_cache_redis()
+        if redis is None:
+            return None, 0.0
+        try:
+            epoch, version, bumped_at = await redis.mget(EPOCH_KEY, version_key, _bumped_at_key(version_key))
+            if epoch is None:
+                await redis.set(EPOCH_KEY, uuid.uuid4().hex, nx=True)
+                epoch, version, bumped_at = await redis.mget(EPOCH_KEY, version_key, _bumped_at_key(version_key))
+        except RedisError:
+            logger.warning("Cache Exc: Cannot read hotel version", extra={"key": version_key})
+            return None, 0.0
+        query = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+        raw = f"{request.url.path}?{query}|{variant}|{epoch}|{version or 0}"
+        return f'"{hashlib.sha1(raw.encode()).hexdigest()}"', float(bumped_at or 0)
+
+
+def _check_not_modified(request: Request, etag: str | None, bumped_at: float) -> None:
+    """
+    Отвечает 304, если ETag есть в If-None-Match, иначе запоминает ETag для ответа.
+    Пока версия увеличена недавно (меньше replica_lag_allowance() сек назад), ETag ответу не ставится:
+    тело может быть прочитано с реплики ещё без записи, поднявшей версию.
+    """
+    if etag is None:
+        return
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # Для If-None-Match сравнение "слабое": префикс W/ не учитывается
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in tags:
+            raise NotModifiedException(etag)
+    if time.time() - bumped_at >= replica_lag_allowance():
+        request.state.etag = etag
+
+
+async def hotel_etag(request: Request, hotel_id: int) -> None:
+    """Зависимость эндпоинтов одного отеля: ETag по версии отеля hotel_id (path-параметр)."""
+    _check_not_modified(request, *await HotelVersions.etag(request, _hotel_version_key(hotel_id)))
+
+
+async def search_etag(request: Request) -> None:
+    """
+    Зависимость поиска: выдача может включить любой отель, поэтому ETag — по общей версии.
+    JSON-страница и поток NDJSON (по Accept) — разные представления с разными ETag.
+    """
+    variant = NDJSON_MEDIA_TYPE if accepts_ndjson(request.headers.get("accept")) else ""
+    _check_not_modified(request, *await HotelVersions.etag(request, ALL_VERSION_KEY, variant))
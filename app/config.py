@@ -6,7 +6,8 @@
 - Использует Pydantic BaseSettings.
 """
 
-from typing import Literal
+from typing import Literal, Optional
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -21,6 +22,22 @@ class Settings(BaseSettings):
         --- Основная база данных ---
         DB_HOST, DB_PORT, DB_USER, DB_PASS, DB_NAME: параметры подключения к основной БД.
         DATABASE_URL: строка подключения к основной БД (генерируется автоматически).
+
+        --- Пул соединений (app/database.py) ---
+        DB_POOL_SIZE, DB_MAX_OVERFLOW: постоянные соединения пула и сколько ещё можно открыть сверх них.
+        DB_POOL_TIMEOUT: сколько секунд ждать свободное соединение, прежде чем запрос упадёт.
+        DB_POOL_RECYCLE: через сколько секунд переоткрывать соединение (-1 — никогда).
+        DB_POOL_PRE_PING: проверять соединение перед выдачей из пула (отсекает разорванные).
+        DB_STATEMENT_CACHE_SIZE: размер кеша подготовленных запросов на соединение
+            (asyncpg и SQLAlchemy; 0 — для PgBouncer в режиме transaction).
+        DB_STATEMENT_TIMEOUT: statement_timeout сессии Postgres, мс (0 — не задавать).
+            В режиме TEST пул не используется (NullPool), остальные параметры действуют.
+
+        --- Реплики для чтения ---
+        REPLICA_DATABASE_URL: URL реплик (postgresql+asyncpg://..., несколько — через запятую);
+            не задан — все чтения идут в основную БД. Пул у каждой реплики — с параметрами DB_POOL_*.
+        REPLICA_MAX_LAG: допустимое отставание реплик, сек: ответ, посчитанный так скоро после
+            инвалидации кеша бронью, в кеш не записывается (реплика могла ещё не получить бронь).
         
         --- Тестовая база данных ---
         TEST_DB_HOST, TEST_DB_PORT, TEST_DB_USER, TEST_DB_PASS, TEST_DB_NAME: параметры тестовой БД.
@@ -29,12 +46,47 @@ class Settings(BaseSettings):
         --- Секреты для JWT ---
         SECRET_KEY: секрет для JWT.
         ALGORITHM: алгоритм шифрования JWT.
+        PASSWORD_HASH_THREADS: потоков для bcrypt (хеширование и проверка паролей, app/users/auth.py) —
+            сколько входов и регистраций воркер обрабатывает одновременно, остальные ждут в очереди.
         
         --- Redis ---
         REDIS_HOST, REDIS_PORT: параметры подключения к Redis.
         
         --- SMTP ---
         SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASS: параметры почтового сервера.
+
+        --- Бронирование ---
+        BOOKING_INSERT_MODE: "atomic" — проверка мест и вставка брони одним SQL-запросом
+            под блокировкой строки комнаты; "checked" — прежняя схема (проверка, затем вставка).
+        BOOKING_SERIALIZABLE_RETRIES: сколько всего попыток atomic-вставки при взаимоблокировке
+            или конфликте сериализации (не меньше 1); после последней — ответ 503.
+
+        --- Импорт ---
+        BULK_INSERT_CHUNK_SIZE: строк в одном многострочном INSERT массовой вставки (BaseDAO.add_bulk).
+        IMPORT_COPY_BATCH_SIZE: строк в одной порции потокового импорта через COPY (читается, грузится
+            и коммитится порция за порцией).
+        IMPORT_PARSE_PROCESSES: процессов разбора CSV при импорте (0 — разбор в пуле потоков приложения).
+        IMPORT_PARSE_PROCESS_MIN_BYTES: файлы меньше этого размера разбираются в пуле потоков
+            (запуск процессов и передача строк между ними для них дороже самого разбора).
+        IMPORT_JOBS_DIR: каталог, куда сохраняются файлы фоновых задач импорта (mode=job); при нескольких
+            серверах приложения — общий для всех (воркер любого из них может взять задачу).
+        IMPORT_JOB_WORKER: запускать в процессе приложения воркер фоновых задач импорта (app/importer/jobs.py).
+        IMPORT_JOB_POLL_INTERVAL: как часто (сек) воркер проверяет очередь, если его не разбудили.
+        IMPORT_JOB_MAX_ATTEMPTS: сколько раз браться за задачу после ошибок, прежде чем пометить её failed.
+        IMPORT_JOB_STALE_AFTER: через сколько секунд без прогресса задача в статусе running считается
+            брошенной (воркер упал) и снова берётся в работу.
+
+        --- Кеш ---
+        SEARCH_CACHE_EXPIRE: TTL (сек) кеша поиска и доступности номеров (app/cache/tagged.py);
+            записи точечно сбрасываются бронями, поэтому TTL может быть длинным.
+        SEARCH_CACHE_STALE_TTL: сколько секунд после SEARCH_CACHE_EXPIRE запись ещё отдаётся,
+            пока фоновая задача её пересчитывает (stale-while-revalidate; 0 — выключено).
+        CACHE_REDIS_LOCK: при промахе ответ считает один воркер на ключ (Redis-блокировка),
+            а не только один запрос на ключ в каждом процессе.
+        CACHE_LOCK_TIMEOUT: таймаут (сек) этой блокировки и ожидания записи другими воркерами.
+        CATALOG_CACHE_EXPIRE: TTL (сек) отелей и номеров по id в Redis (app/cache/catalog.py).
+        CATALOG_LOCAL_CACHE_TTL, CATALOG_LOCAL_CACHE_MAX_ENTRIES: TTL (сек) и предельное число
+            записей того же кеша в памяти воркера.
     """
 
     # Общие параметры среды
@@ -54,6 +106,18 @@ class Settings(BaseSettings):
         """URL подключения к основной базе данных (PostgreSQL/asyncpg)."""
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
     
+    # Пул соединений и параметры сессий БД
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT: int = 0
+    # Реплики только для чтения (через запятую) и их допустимое отставание
+    REPLICA_DATABASE_URL: Optional[str] = None
+    REPLICA_MAX_LAG: float = 1.0
+
     # Тестовая база данных (используется для автотестов/CI)
     TEST_DB_HOST: str
     TEST_DB_PORT: int
@@ -69,6 +133,7 @@ class Settings(BaseSettings):
     # Секреты для JWT
     SECRET_KEY: str
     ALGORITHM: str
+    PASSWORD_HASH_THREADS: int = 2
 
     # Redis (кеш)
     REDIS_HOST: str
@@ -80,6 +145,34 @@ class Settings(BaseSettings):
     SMTP_USER: str
     SMTP_PASS: str
 
+    # Бронирование: режим вставки брони и число повторов при конфликте сериализации
+    BOOKING_INSERT_MODE: Literal["atomic", "checked"] = "atomic"
+    BOOKING_SERIALIZABLE_RETRIES: int = Field(5, ge=1)
+
+    # Массовая вставка (импорт CSV): строк в одном INSERT
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    IMPORT_COPY_BATCH_SIZE: int = 50_000
+    # Разбор CSV в процессах (не блокирует цикл событий и GIL процесса приложения)
+    IMPORT_PARSE_PROCESSES: int = 2
+    IMPORT_PARSE_PROCESS_MIN_BYTES: int = 4_000_000
+    # Фоновые задачи импорта
+    IMPORT_JOBS_DIR: str = "/tmp/import_jobs"
+    IMPORT_JOB_WORKER: bool = True
+    IMPORT_JOB_POLL_INTERVAL: float = 5
+    IMPORT_JOB_MAX_ATTEMPTS: int = 3
+    IMPORT_JOB_STALE_AFTER: int = 600
+
+    # Кеш поиска и доступности номеров: TTL записи (инвалидация — по броням)
+    SEARCH_CACHE_EXPIRE: int = 600
+    SEARCH_CACHE_STALE_TTL: int = 300
+    # Защита от лавины промахов между воркерами
+    CACHE_REDIS_LOCK: bool = False
+    CACHE_LOCK_TIMEOUT: int = 30
+    # Справочные данные (отели и номера по id): Redis + память воркера
+    CATALOG_CACHE_EXPIRE: int = 3600
+    CATALOG_LOCAL_CACHE_TTL: int = 60
+    CATALOG_LOCAL_CACHE_MAX_ENTRIES: int = 10_000
+
     # Конфиг Pydantic: путь к .env файлу (все переменные среды читаются оттуда)
     model_config = SettingsConfigDict(env_file=".env")  # .env лежит в корне проекта
 
@@ -3,13 +3,58 @@
 
 - Реализует универсальные CRUD-методы: поиск, добавление, удаление записей.
 - Используется только как родительский класс — в наследнике обязательно определить атрибут model!
-- Все операции выполняются через async-сессии.
+- Все операции выполняются через async-сессии; чтения — через read_session (реплика, если задана),
+  с primary=True — из основной БД (read-your-writes).
+- Справочные записи по id можно читать через двухуровневый кеш (find_by_id_cached, app/cache/catalog.py).
+- Массовая вставка (add_bulk, импорт CSV): многострочные INSERT ... RETURNING id порциями в одной транзакции.
+- Потоковая загрузка (copy_batches, импорт CSV в режиме copy): COPY через asyncpg, коммит после каждой порции.
+- Идемпотентная загрузка справочника (upsert_batches, импорт CSV в режиме upsert): COPY во временную таблицу
+  и слияние с таблицей модели по id или естественному ключу одним запросом.
 - Осторожно: массовые add/delete без фильтра могут привести к ошибкам или потере данных.
 """
 
-from sqlalchemy import delete, insert, select
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable
 
-from app.database import async_session_maker
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Boolean,
+    Column,
+    Identity,
+    MetaData,
+    Table,
+    delete,
+    exists,
+    false,
+    func,
+    insert,
+    literal_column,
+    select,
+    text,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.catalog import CatalogCache
+from app.config import settings
+from app.database import async_session_maker, read_session
+from app.logger import logger
+
+
+def _copy_adapter(column: Column) -> Callable[[Any], Any]:
+    """
+    Приводит значение строки импорта к виду, который ждёт COPY asyncpg для колонки:
+    пустая строка CSV — NULL; JSON/JSONB — текстом (кодек SQLAlchemy для asyncpg принимает строку).
+    """
+    if isinstance(column.type, JSON):
+        return lambda value: None if value in (None, "") else json.dumps(value, ensure_ascii=False)
+    return lambda value: None if value == "" else value
 
 
 class BaseDAO:
@@ -19,44 +64,74 @@ class BaseDAO:
     Атрибуты:
         model: SQLAlchemy-модель, с которой работает конкретный DAO.
             ВНИМАНИЕ: всегда переопределяйте model в наследнике!
+        natural_key: естественный ключ записи для upsert_batches (None — только по id).
     """
     model = None  # Должен быть определён в наследуемом классе (например: model = Bookings)
+    # Колонки, по которым импорт в режиме upsert сопоставляет строки файла без id (например: ("name", "location"))
+    natural_key: tuple[str, ...] | None = None
 
     @classmethod
-    async def find_by_id(cls, model_id: int) -> dict | None:
+    async def find_by_id(cls, model_id: int, primary: bool = False) -> dict | None:
         """
         Возвращает одну запись по id как dict, либо None, если не найдено.
 
         :param model_id: ID записи
+        :param primary: читать из основной БД, а не из реплики
         :return: dict (ключи как в модели) или None
         """
-        async with async_session_maker() as session:
+        async with read_session(primary) as session:
             query = select(cls.model.__table__.columns).filter_by(id=model_id)
             result = await session.execute(query)
             return result.mappings().one_or_none()
 
     @classmethod
-    async def find_one_or_none(cls, **filter_by) -> dict | None:
+    async def find_by_id_cached(cls, model_id: int) -> dict | None:
+        """
+        То же, что find_by_id, но через кеш справочных данных: память воркера -> Redis -> БД.
+        Только для редко меняющихся таблиц (отели, номера); после изменения записи — invalidate_cached.
+        Промах читается из основной БД: отстающая реплика вернула бы в кеш запись до правки.
+
+        :param model_id: ID записи
+        :return: dict (JSON-совместимые значения) или None
+        """
+        return await CatalogCache.get_or_load(
+            f"{cls.model.__tablename__}:{model_id}",
+            lambda: cls.find_by_id(model_id, primary=True),
+        )
+
+    @classmethod
+    async def invalidate_cached(cls, *model_ids: int) -> None:
+        """
+        Сбрасывает записи find_by_id_cached в Redis и в памяти всех воркеров.
+
+        :param model_ids: ID изменённых записей
+        """
+        await CatalogCache.invalidate(*[f"{cls.model.__tablename__}:{model_id}" for model_id in model_ids])
+
+    @classmethod
+    async def find_one_or_none(cls, primary: bool = False, **filter_by) -> dict | None:
         """
         Возвращает одну запись по фильтру как dict, либо None.
 
+        :param primary: читать из основной БД, а не из реплики
         :param filter_by: критерии фильтрации (name=value)
         :return: dict или None
         """
-        async with async_session_maker() as session:
+        async with read_session(primary) as session:
             query = select(cls.model.__table__.columns).filter_by(**filter_by)
             result = await session.execute(query)
             return result.mappings().one_or_none()
 
     @classmethod
-    async def find_all(cls, **filter_by) -> list[dict]:
+    async def find_all(cls, primary: bool = False, **filter_by) -> list[dict]:
         """
         Возвращает все записи по фильтру как список dict.
 
+        :param primary: читать из основной БД, а не из реплики
         :param filter_by: критерии фильтрации (name=value)
         :return: list[dict]
         """
-        async with async_session_maker() as session:
+        async with read_session(primary) as session:
             query = select(cls.model.__table__.columns).filter_by(**filter_by)
             result = await session.execute(query)
             return result.mappings().all()
@@ -74,6 +149,281 @@ class BaseDAO:
             await session.execute(query)
             await session.commit()
 
+    @classmethod
+    async def insert_bulk(cls, session: AsyncSession, data: list[dict], chunk_size: int | None = None) -> list[int]:
+        """
+        Вставляет строки в переданной сессии (коммит — на стороне вызывающего кода).
+
+        SQLAlchemy "insertmanyvalues": executemany превращается в многострочные
+        INSERT ... VALUES (...), (...) RETURNING id по chunk_size строк (меньше — если упрётся
+        в лимит параметров asyncpg), т.е. один round-trip на порцию, а не на строку.
+
+        :param session: сессия
+        :param data: строки (dict с одинаковым набором колонок)
+        :param chunk_size: строк в одном INSERT; по умолчанию settings.BULK_INSERT_CHUNK_SIZE
+        :return: id вставленных строк в порядке data
+
+        СЫРОЙ SQL (одна порция; номер строки sen_counter — чтобы вернуть id в порядке data):
+        INSERT INTO rooms (hotel_id, name, price, quantity, image_id)
+        SELECT p0, p1, p2, p3, p4
+        FROM (VALUES ($1, $2, $3, $4, $5, 0), ($6, $7, $8, $9, $10, 1), ...)
+            AS imp_sen(p0, p1, p2, p3, p4, sen_counter)
+        ORDER BY sen_counter
+        RETURNING rooms.id, rooms.id AS id__1
+        """
+        if not data:
+            return []
+        table = cls.model.__table__  # Core-вставка: без ORM-обработки каждой строки
+        query = (
+            insert(table)
+            .returning(table.c.id, sort_by_parameter_order=True)
+            .execution_options(insertmanyvalues_page_size=chunk_size or settings.BULK_INSERT_CHUNK_SIZE)
+        )
+        result = await session.execute(query, data)
+        return list(result.scalars())
+
+    @classmethod
+    async def add_bulk(cls, data: list[dict], chunk_size: int | None = None) -> list[int] | None:
+        """
+        Добавляет много записей одной транзакцией (см. insert_bulk): либо все, либо ни одной.
+
+        :param data: строки (dict с одинаковым набором колонок)
+        :param chunk_size: строк в одном INSERT; по умолчанию settings.BULK_INSERT_CHUNK_SIZE
+        :return: id добавленных записей или None, если вставка не удалась (ошибка в логе)
+        """
+        try:
+            async with async_session_maker() as session:
+                ids = await cls.insert_bulk(session, data, chunk_size)
+                await session.commit()
+        except SQLAlchemyError:
+            logger.exception("Database Exc: Cannot bulk insert data", extra={"table": cls.model.__tablename__})
+            return None
+        except Exception:
+            logger.exception("Unknown Exc: Cannot bulk insert data", extra={"table": cls.model.__tablename__})
+            return None
+        await cls.after_insert([{**row, "id": model_id} for row, model_id in zip(data, ids)])
+        return ids
+
+    @classmethod
+    async def copy_records(cls, session: AsyncSession, rows: list[dict], table: Table | None = None) -> None:
+        """
+        Загружает строки через COPY (asyncpg copy_records_to_table) в транзакции сессии, без коммита.
+        COPY в бинарном формате не разбирает SQL и не строит план на строку — быстрее любого INSERT.
+        id не возвращаются; колонки — ключи первой строки.
+
+        :param session: сессия
+        :param rows: строки (dict с одинаковым набором колонок)
+        :param table: таблица назначения с теми же колонками (например, промежуточная); по умолчанию — модели
+
+        СЫРОЙ SQL:
+        COPY bookings (room_id, user_id, date_from, date_to, price) FROM STDIN (FORMAT binary)
+        """
+        if not rows:
+            return
+        table = cls.model.__table__ if table is None else table
+        columns = list(rows[0])
+        adapters = [_copy_adapter(table.c[name]) for name in columns]
+        records = [tuple(adapt(row.get(name)) for name, adapt in zip(columns, adapters)) for row in rows]
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        if not raw_connection.driver_connection.is_in_transaction():
+            # Адаптер asyncpg открывает транзакцию (BEGIN) лениво, с первым запросом через SQLAlchemy:
+            # COPY напрямую через драйвер иначе выполнился бы в автокоммите и не откатился бы с транзакцией
+            await connection.exec_driver_sql("SELECT 1")
+        await raw_connection.driver_connection.copy_records_to_table(
+            table.name, records=records, columns=columns, schema_name=table.schema,
+        )
+
+    @classmethod
+    async def copy_batches(
+        cls,
+        batches: AsyncIterable[list[dict]],
+        skip_rows: int = 0,
+        on_batch: Callable[[AsyncSession, int], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[int]:
+        """
+        Потоковая загрузка: каждая порция — COPY и коммит (см. copy_records); в памяти только текущая порция.
+        Ошибка откатывает только текущую порцию: закоммиченные остаются, исключение пробрасывается.
+        После коммита каждой порции вызывается after_insert с её строками.
+
+        :param batches: асинхронный поток порций строк
+        :param skip_rows: сколько первых строк потока уже загружено (продолжение прерванного импорта)
+        :param on_batch: вызывается после COPY порции в её транзакции (сессия, число строк) —
+            например, чтобы отметить прогресс импорта атомарно с самими строками
+        :return: асинхронный итератор: число строк каждой закоммиченной порции
+        """
+        async with async_session_maker() as session:
+            async for rows in batches:
+                if skip_rows >= len(rows):
+                    skip_rows -= len(rows)
+                    continue
+                rows, skip_rows = rows[skip_rows:], 0
+                await cls.copy_records(session, rows)
+                if on_batch is not None:
+                    await on_batch(session, len(rows))
+                await session.commit()
+                await cls.after_insert(rows)
+                yield len(rows)
+
+    @classmethod
+    async def upsert_batches(cls, batches: AsyncIterable[list[dict]]) -> dict[str, int]:
+        """
+        Идемпотентная загрузка справочника (импорт в режиме upsert) одной транзакцией:
+        порции грузятся через COPY во временную таблицу, затем сливаются с таблицей модели одним запросом.
+        Строки сопоставляются по id, если он есть в файле, иначе по natural_key. Из строк файла с одинаковым
+        ключом берётся последняя; строка таблицы, совпадающая с файлом, не перезаписывается.
+        На время слияния таблица блокируется от записи (чтение не блокируется). После коммита вызывается
+        after_upsert с добавленными и изменёнными строками; при сопоставлении по id у изменённых строк
+        в previous — прежние значения natural_key (например, отель, из которого перенесён номер).
+
+        :param batches: асинхронный поток порций строк (колонки — как в первой строке файла)
+        :return: {"inserted", "updated", "unchanged", "duplicates"} — число строк;
+            duplicates — строки файла, перекрытые более поздней строкой с тем же ключом
+        :raises ValueError: в файле нет id, а natural_key у модели не задан
+
+        СЫРОЙ SQL (по id; по natural_key — UPDATE ... FROM и INSERT ... WHERE NOT EXISTS в двух CTE):
+        CREATE TEMPORARY TABLE hotels_import_staging (
+            import_row BIGINT GENERATED BY DEFAULT AS IDENTITY, id INTEGER, name VARCHAR, ...
+        ) ON COMMIT DROP;
+        COPY hotels_import_staging (id, name, ...) FROM STDIN (FORMAT binary);
+        DELETE FROM hotels_import_staging s USING hotels_import_staging d
+            WHERE s.id = d.id AND s.import_row < d.import_row;
+        LOCK TABLE hotels IN SHARE ROW EXCLUSIVE MODE;
+        INSERT INTO hotels (id, name, ...) SELECT id, name, ... FROM hotels_import_staging
+        ON CONFLICT (id) DO UPDATE SET name = excluded.name, ...
+            WHERE (hotels.name, ...) IS DISTINCT FROM (excluded.name, ...)
+        RETURNING hotels.*, xmax = 0 AS inserted;
+        SELECT setval('hotels_id_seq', GREATEST((SELECT max(id) FROM hotels), (SELECT last_value FROM hotels_id_seq)));
+        """
+        table = cls.model.__table__
+        staging = None
+        copied = 0
+        async with async_session_maker() as session:
+            async for rows in batches:
+                if staging is None:
+                    columns = list(rows[0])
+                    key = ["id"] if "id" in columns else list(cls.natural_key or [])
+                    if not key:
+                        raise ValueError(f"{table.name}: нет колонки id, а natural_key не задан")
+                    staging = Table(
+                        f"{table.name}_import_staging",
+                        MetaData(),
+                        Column("import_row", BigInteger, Identity()),
+                        *[Column(name, table.c[name].type) for name in columns],
+                        prefixes=["TEMPORARY"],
+                        postgresql_on_commit="DROP",
+                    )
+                    await (await session.connection()).run_sync(staging.create)
+                await cls.copy_records(session, rows, staging)
+                copied += len(rows)
+            if staging is None:
+                return {"inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0}
+
+            later = staging.alias("later")
+            duplicates = await session.execute(
+                delete(staging).where(
+                    *[staging.c[name] == later.c[name] for name in key],
+                    staging.c.import_row < later.c.import_row,
+                )
+            )
+            duplicates = duplicates.rowcount
+            await session.execute(text(f"ANALYZE {staging.name}"))
+            await session.execute(text(f"LOCK TABLE {table.name} IN SHARE ROW EXCLUSIVE MODE"))
+
+            previous = {}
+            if key == ["id"] and cls.natural_key:
+                # Таблица уже заблокирована от записи: значения не изменятся до слияния
+                result = await session.execute(
+                    select(table.c.id, *[table.c[name] for name in cls.natural_key])
+                    .join(staging, staging.c.id == table.c.id)
+                )
+                previous = {row["id"]: dict(row) for row in result.mappings()}
+
+            values = [name for name in columns if name not in key]
+            if key == ["id"]:
+                query = pg_insert(table).from_select(columns, select(*[staging.c[name] for name in columns]))
+                if values:
+                    query = query.on_conflict_do_update(
+                        index_elements=key,
+                        set_={name: query.excluded[name] for name in values},
+                        where=tuple_(*[table.c[name] for name in values]).is_distinct_from(
+                            tuple_(*[query.excluded[name] for name in values])
+                        ),
+                    )
+                else:
+                    query = query.on_conflict_do_nothing(index_elements=key)
+                # xmax = 0 только у только что вставленной строки (у обновлённой — id нашей транзакции)
+                query = query.returning(*table.c, literal_column("xmax = 0", Boolean).label("inserted"))
+            else:
+                matches = [table.c[name] == staging.c[name] for name in key]
+                updated = (
+                    update(table)
+                    .where(
+                        *matches,
+                        tuple_(*[table.c[name] for name in values]).is_distinct_from(
+                            tuple_(*[staging.c[name] for name in values])
+                        ),
+                    )
+                    .values({name: staging.c[name] for name in values})
+                    .returning(*table.c, false().label("inserted"))
+                    .cte("updated")
+                )
+                inserted = (
+                    insert(table)
+                    .from_select(
+                        columns,
+                        select(*[staging.c[name] for name in columns]).where(~exists().where(*matches)),
+                    )
+                    .returning(*table.c, true().label("inserted"))
+                    .cte("inserted")
+                )
+                query = union_all(select(updated), select(inserted))
+            changed = [
+                {**row, "previous": None if row["inserted"] else previous.get(row["id"])}
+                for row in (await session.execute(query)).mappings()
+            ]
+
+            if key == ["id"] and any(row["inserted"] for row in changed):
+                # Явные id не двигают последовательность: следующий add выдал бы уже занятый id
+                sequence = (await session.execute(
+                    select(func.pg_get_serial_sequence(table.name, "id"))
+                )).scalar_one()
+                await session.execute(text(
+                    f"SELECT setval('{sequence}', GREATEST((SELECT max(id) FROM {table.name}), "
+                    f"(SELECT last_value FROM {sequence})))"
+                ))
+            await session.commit()
+
+        await cls.after_upsert(changed)
+        inserted_count = sum(1 for row in changed if row["inserted"])
+        return {
+            "inserted": inserted_count,
+            "updated": len(changed) - inserted_count,
+            "unchanged": copied - duplicates - len(changed),
+            "duplicates": duplicates,
+        }
+
+    @classmethod
+    async def after_insert(cls, rows: list[dict]) -> None:
+        """
+        Вызывается после коммита add_bulk и каждой порции copy_batches. Наследники сбрасывают
+        зависящие от новых строк версии (например, версии отелей для ETag); по умолчанию — ничего:
+        новых записей в кеше справочных данных нет (отсутствующие записи не кешируются).
+
+        :param rows: добавленные строки (у add_bulk — с id; у copy_batches — как в файле)
+        """
+
+    @classmethod
+    async def after_upsert(cls, rows: list[dict]) -> None:
+        """
+        Вызывается после коммита upsert_batches: сбрасывает изменённые записи в кеше справочных данных.
+        Наследники дополняют (например, версии отелей для ETag).
+
+        :param rows: добавленные и изменённые строки (все колонки модели, флаг inserted
+            и previous — прежние значения natural_key изменённой строки или None)
+        """
+        await cls.invalidate_cached(*[row["id"] for row in rows if not row["inserted"]])
+
     @classmethod
     async def delete(cls, **filter_by) -> None:
         """
@@ -3,9 +3,18 @@
 
 - Автоматически выбирает конфигурацию для основной или тестовой БД.
 - Для тестовой среды используется NullPool (без connection pool'а).
+- Пул соединений и параметры сессий asyncpg задаются в Settings (DB_POOL_*, DB_STATEMENT_*).
 - Создаёт фабрику асинхронных сессий и базовый класс для моделей.
+- Если заданы реплики (REPLICA_DATABASE_URL), чтения DAO идут в них (read_session),
+  запись и чтение "своих записей" (primary=True) — в основную БД.
+- В HTTP-запросе (request_scope) чтения DAO делят одну сессию: одно соединение из пула на запрос.
 """
 
+import random
+from contextlib import asynccontextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import AsyncIterator
+
 from sqlalchemy import NullPool
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
@@ -19,16 +28,156 @@ if settings.MODE == "TEST":
     DATABASE_PARAM = {"poolclass": NullPool}  # NullPool = без пула, соединения создаются по запросу
 else:
     DATABASE_URL = settings.DATABASE_URL
-    DATABASE_PARAM = {}
+    DATABASE_PARAM = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+# Параметры соединений asyncpg (для любого окружения)
+CONNECT_ARGS = {
+    "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,  # кеш asyncpg
+    "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,  # кеш SQLAlchemy поверх asyncpg
+}
+if settings.DB_STATEMENT_TIMEOUT:
+    CONNECT_ARGS["server_settings"] = {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)}
 
 # Создаём асинхронный engine и фабрику сессий для работы с БД.
-engine = create_async_engine(DATABASE_URL, **DATABASE_PARAM)
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=CONNECT_ARGS,
+    **DATABASE_PARAM,
+)
 async_session_maker = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 # async_session_maker используется для создания асинхронных сессий:
 # async with async_session_maker() as session: ...
 
+# Реплики только для чтения: те же параметры пула, у каждой — свой engine
+REPLICA_URLS = [url.strip() for url in (settings.REPLICA_DATABASE_URL or "").split(",") if url.strip()]
+replica_engines = [
+    create_async_engine(url, pool_pre_ping=settings.DB_POOL_PRE_PING, connect_args=CONNECT_ARGS, **DATABASE_PARAM)
+    for url in REPLICA_URLS
+]
+replica_session_makers = [
+    sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
+
+
+def _session_maker(primary: bool) -> sessionmaker:
+    """Фабрика сессий чтения: случайная реплика, а без реплик (или с primary=True) — основная БД."""
+    if primary or not replica_session_makers:
+        return async_session_maker
+    return random.choice(replica_session_makers)
+
+
+class RequestSessions:
+    """
+    Сессии чтения одного HTTP-запроса: открываются при первом обращении DAO и закрываются
+    в конце запроса (request_scope) — весь запрос берёт из пула одно соединение, а не по одному на вызов DAO.
+    Не для параллельных запросов к БД внутри одного HTTP-запроса (одно соединение asyncpg).
+    """
+
+    def __init__(self):
+        self._primary: AsyncSession | None = None
+        self._replica: AsyncSession | None = None
+
+    def get(self, primary: bool) -> AsyncSession:
+        """
+        Сессия запроса: основной БД (primary=True или реплик нет) или реплики.
+        Если основная уже открыта, чтения с реплики тоже идут в неё: она не отстаёт и соединение уже взято.
+        """
+        if primary or not replica_session_makers or self._primary is not None:
+            if self._primary is None:
+                self._primary = async_session_maker()
+            return self._primary
+        if self._replica is None:
+            self._replica = _session_maker(primary=False)()
+        return self._replica
+
+    async def close(self) -> None:
+        for session in (self._primary, self._replica):
+            if session is not None:
+                await session.close()
+
+
+_request_sessions: ContextVar[RequestSessions | None] = ContextVar("request_sessions", default=None)
+
+
+@asynccontextmanager
+async def request_scope() -> AsyncIterator[None]:
+    """
+    Область сессий одного запроса (middleware в main.py): read_session внутри неё
+    отдаёт общую сессию запроса, на выходе сессии закрываются и соединения возвращаются в пул.
+    """
+    sessions = RequestSessions()
+    token = _request_sessions.set(sessions)
+    try:
+        yield
+    finally:
+        _request_sessions.reset(token)
+        await sessions.close()
+
+
+def detached_context() -> Context:
+    """
+    Контекст для фоновой задачи, запущенной из запроса: без сессий запроса
+    (задача переживёт запрос, а его сессии закроются вместе с ним).
+    """
+    context = copy_context()
+    context.run(_request_sessions.set, None)
+    return context
+
+
+@asynccontextmanager
+async def read_session(primary: bool = False, request_scoped: bool = True) -> AsyncIterator[AsyncSession]:
+    """
+    Сессия для чтения: случайная реплика, а без реплик (или с primary=True) — основная БД.
+    Внутри request_scope — общая сессия запроса (не закрывается на выходе из блока), иначе — новая.
+    Использовать только для SELECT; запись — через async_session_maker.
+
+    :param primary: читать из основной БД (read-your-writes: сразу после своей записи реплика может отставать)
+    :param request_scoped: False — всегда новая сессия (например, поток, который читается после выхода из эндпоинта)
+    :return: async with read_session() as session: ...
+    """
+    sessions = _request_sessions.get() if request_scoped else None
+    if sessions is not None:
+        session = sessions.get(primary)
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()  # ошибка запроса не должна ломать следующие чтения этого HTTP-запроса
+            raise
+        return
+    async with _session_maker(primary)() as session:
+        yield session
+
+
+def replica_lag_allowance() -> float:
+    """Сколько секунд после записи чтения с реплик могут её не видеть (0 — реплик нет)."""
+    return settings.REPLICA_MAX_LAG if replica_session_makers else 0
+
+
+def pool_config() -> dict:
+    """
+    Действующие параметры пула и сессий (для лога при старте приложения).
+
+    :return: класс пула, его размеры и таймауты, кеш подготовленных запросов, statement_timeout
+    """
+    config = {"pool": type(engine.pool).__name__, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    config.update((name, value) for name, value in DATABASE_PARAM.items() if name != "poolclass")
+    config.update(
+        statement_cache_size=settings.DB_STATEMENT_CACHE_SIZE,
+        statement_timeout_ms=settings.DB_STATEMENT_TIMEOUT,
+        replicas=len(replica_engines),
+    )
+    return config
+
+
 class Base(DeclarativeBase):
     """Базовый класс SQLAlchemy для всех моделей проекта."""
     pass
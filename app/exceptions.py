@@ -69,12 +69,24 @@ class RoomCannotBeBookedException(BookingException):
     detail = "Не удалось забронировать номер ввиду неизвестной ошибки"
 
 
+class BookingTemporarilyUnavailable(BookingException):
+    """Бронь не создана: конфликт с параллельными изменениями не разрешился за все попытки (503)."""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Не удалось забронировать номер, повторите попытку"
+
+
 class DateFromCannotBeAfterDateTo(BookingException):
     """Дата заезда позже даты выезда (400)."""
     status_code = status.HTTP_400_BAD_REQUEST
     detail = "Дата заезда не может быть позже даты выезда"
 
 
+class IncorrectHotelIdsException(BookingException):
+    """Список hotel_ids не разобран или слишком длинный (400)."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "hotel_ids — список id отелей через запятую (не более 100)"
+
+
 class CannotBookHotelForLongPeriod(BookingException):
     """Попытка забронировать отель на срок более месяца (400)."""
     status_code = status.HTTP_400_BAD_REQUEST
@@ -92,3 +104,37 @@ class CannotProcessCSV(BookingException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     detail = "Не удалось обработать CSV файл"
 
+
+class CSVImportInterrupted(BookingException):
+    """Потоковый импорт прерван ошибкой: закоммиченные порции остались в БД (500)."""
+    status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+
+    def __init__(self, rows_committed: int):
+        self.detail = f"Импорт прерван ошибкой, загружено строк: {rows_committed}"
+        super().__init__()
+
+
+class UpsertNotSupported(BookingException):
+    """Импорт в режиме upsert для таблицы не поддерживается (400)."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Режим upsert доступен только для справочников: hotels, rooms"
+
+
+class ImportJobNotFound(BookingException):
+    """Задача импорта с таким id не найдена (404)."""
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Задача импорта не найдена"
+
+
+class ImportJobCannotBeResumed(BookingException):
+    """Продолжить можно только задачу импорта, завершившуюся ошибкой (409)."""
+    status_code = status.HTTP_409_CONFLICT
+    detail = "Задача импорта не в статусе failed"
+
+
+class NotModifiedException(BookingException):
+    """Данные не изменились с версии клиента: If-None-Match совпал с ETag (304, без тела)."""
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+    def __init__(self, etag: str):
+        HTTPException.__init__(self, status_code=self.status_code, headers={"ETag": etag})
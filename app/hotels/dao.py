@@ -1,18 +1,30 @@
 """
 DAO для работы с отелями:
-- Поиск отелей с учётом занятости комнат на выбранные даты и фильтрации по локации.
+- Поиск отелей с учётом занятости комнат на выбранные даты и фильтрации по локации
+  (нормализованная колонка location_search + триграммный индекс pg_trgm, допускаются опечатки).
+- Постраничная выдача поиска: keyset-пагинация по id (курсор — id последнего отеля страницы).
+- Фильтры по услугам отеля (JSONB @>, GIN-индекс) и по максимальной цене номера — на стороне БД.
+- Потоковая выдача всех результатов поиска через серверный курсор (stream_all, NDJSON).
 - Получение всех отелей без фильтрации по датам/номерам.
+Все запросы — только чтение: выполняются на реплике, если она задана (read_session).
+Импорт справочника (BaseDAO.upsert_batches) сопоставляет отели без id по названию и локации.
 """
 
 from datetime import date
+from typing import AsyncIterator, Sequence
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import RowMapping, and_, func, or_, select, true
+from sqlalchemy.orm import aliased
 
-from app.bookings.models import Bookings
+from app.cache.tagged import evict_catalog
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.database import read_session
 from app.hotels.models import Hotels
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import InventoryDAO
+
+# Сколько строк поиска читать из серверного курсора за раз (stream_all)
+STREAM_BATCH_SIZE = 500
 
 
 class HotelDAO(BaseDAO):
@@ -21,65 +33,89 @@ class HotelDAO(BaseDAO):
     """
 
     model = Hotels
+    natural_key = ("name", "location")
 
     @classmethod
-    async def find_all(cls, location: str, date_from: date, date_to: date) -> list[dict]:
+    async def after_insert(cls, rows: list[dict]) -> None:
         """
-        Получает список всех отелей, расположенных в определенной локации со свободными номерами.
+        После импорта новых отелей (режимы insert, copy, job): сбрасывает кеш поиска и увеличивает
+        версии отелей (evict_catalog) — поиск с прежним ETag получит 200 с новыми отелями, а не 304.
 
-        :param location: Строка для поиска по местоположению (LIKE/ILIKE)
-        :param date_from: Дата заезда
-        :param date_to: Дата выезда
-        :return: Список отелей (dict), у каждого указано rooms_left
+        :param rows: добавленные отели (id известен только у add_bulk и у строк файла с колонкой id)
+        """
+        if rows:
+            await evict_catalog([row["id"] for row in rows if row.get("id") is not None])
 
-        Ниже — реальный SQL из бизнес-логики (для читаемости и ревью):
+    @classmethod
+    async def after_upsert(cls, rows: list[dict]) -> None:
+        """
+        После импорта справочника: сбрасывает изменённые отели в кеше справочных данных,
+        кеш ответов по ним и поиска и увеличивает их версии (ETag) — как правка в админке.
 
-        WITH booked_rooms AS (
-            SELECT 
-                b.room_id, 
-                COUNT(b.room_id) AS rooms_booked
-            FROM bookings b
-            WHERE 
-                b.date_to >= '2023-05-15' 
-                AND b.date_from <= '2023-06-20' -- Проверка пересечения дат
-            GROUP BY b.room_id
-        ),
-        booked_hotels AS (
-            SELECT 
-                r.hotel_id, 
-                SUM(GREATEST(r.quantity - COALESCE(br.rooms_booked, 0), 0)) AS rooms_left -- Учитываем, что rooms_left не может быть отрицательным
-            FROM rooms r
-            LEFT JOIN booked_rooms br ON br.room_id = r.id
-            GROUP BY r.hotel_id
-        )
-        SELECT 
-            h.id, 
-            h.name, 
-            h.location, 
-            h.services, 
-            h.rooms_quantity, 
-            h.image_id,
-            bh.rooms_left
-        FROM hotels h
-        JOIN booked_hotels bh ON bh.hotel_id = h.id -- INNER JOIN, т.к. нужны только отели с доступными номерами
-        WHERE 
-            bh.rooms_left > 0
-            AND h.location ILIKE '%алтай%'; -- Поддержка частичного поиска
+        :param rows: добавленные и изменённые отели
         """
-        # Определяем количество занятых номеров
-        booked_rooms = (
-            select(Bookings.room_id, func.count(Bookings.room_id).label("rooms_booked"))
-            .select_from(Bookings)
-            .where(
-                and_(
-                    Bookings.date_to >= date_from,
-                    Bookings.date_from <= date_to
-                )
-            )
-            .group_by(Bookings.room_id)
-            .cte("booked_rooms")
+        await super().after_upsert(rows)
+        if rows:
+            await evict_catalog([row["id"] for row in rows])
+
+    @staticmethod
+    def normalize_location(location: str) -> str:
+        """
+        Нормализует строку локации так же, как колонка Hotels.location_search:
+        нижний регистр, ё→е, без крайних пробелов.
+
+        :param location: строка поиска от пользователя
+        :return: нормализованная строка
+        """
+        return location.lower().replace("ё", "е").strip()
+
+    @classmethod
+    def location_filter(cls, location: str):
+        """
+        Условие поиска по локации (по колонке location_search, GIN-индекс gin_trgm_ops).
+
+        - Если хоть одна локация содержит нормализованную строку как подстроку — ищем по подстроке (LIKE).
+        - Иначе запрос считается опечаткой: подходят локации с похожим словом
+          (оператор pg_trgm %>, порог pg_trgm.word_similarity_threshold), например "Сыктывкр".
+        Нечёткое сравнение — только запасной вариант: иначе "Республика Алтай" находил бы
+        и "Республику Коми" по общему слову.
+
+        :param location: строка поиска от пользователя
+        :return: SQL-условие; для пустой строки — TRUE (без фильтра)
+        """
+        term = cls.normalize_location(location)
+        if not term:
+            return true()
+        other_hotels = aliased(Hotels)
+        exact_match_exists = (
+            select(other_hotels.id)
+            .where(other_hotels.location_search.contains(term, autoescape=True))
+            .exists()
+        )
+        return or_(
+            Hotels.location_search.contains(term, autoescape=True),
+            and_(~exact_match_exists, Hotels.location_search.op("%>")(term)),
         )
 
+    @classmethod
+    def search_query(
+        cls,
+        location: str,
+        date_from: date,
+        date_to: date,
+        limit: int | None = None,
+        after_id: int | None = None,
+        services: list[str] | None = None,
+        max_price: int | None = None,
+    ):
+        """
+        Запрос поиска отелей со свободными номерами (SQL и параметры — см. find_all).
+
+        :return: SELECT отелей с колонкой rooms_left, по возрастанию id
+        """
+        # Определяем количество занятых номеров по посуточному реестру
+        booked_rooms = InventoryDAO.booked_rooms_cte(date_from, date_to)
+
         # Подсчет доступных номеров в каждом отеле
         booked_hotels = (
             select(
@@ -91,8 +127,11 @@ class HotelDAO(BaseDAO):
             .select_from(Rooms)
             .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)
             .group_by(Rooms.hotel_id)
-            .cte("booked_hotels")
         )
+        if max_price is not None:
+            # Дорогие номера не считаются свободными: отель без подходящих номеров отсеется по rooms_left > 0
+            booked_hotels = booked_hotels.where(Rooms.price <= max_price)
+        booked_hotels = booked_hotels.cte("booked_hotels")
 
         # Запрос на выборку отелей с доступными номерами
         get_hotels_with_rooms = (
@@ -104,17 +143,167 @@ class HotelDAO(BaseDAO):
             .where(
                 and_(
                     booked_hotels.c.rooms_left > 0,
-                    Hotels.location.ilike(f"%{location}%"),  # Используем `ILIKE` для нечувствительного поиска
+                    cls.location_filter(location),  # Подстрока или похожее слово в location_search
                 )
             )
             .order_by(Hotels.id)
+            .limit(limit)
+        )
+        if services:
+            # JSONB "содержит все": services @> '["Wi-Fi", "Парковка"]'
+            get_hotels_with_rooms = get_hotels_with_rooms.where(Hotels.services.contains(services))
+        if after_id is not None:
+            # Keyset: продолжаем с места, где закончилась предыдущая страница (индекс по PK, без OFFSET)
+            get_hotels_with_rooms = get_hotels_with_rooms.where(Hotels.id > after_id)
+        return get_hotels_with_rooms
+
+    @classmethod
+    async def find_all(
+        cls,
+        location: str,
+        date_from: date,
+        date_to: date,
+        limit: int | None = None,
+        after_id: int | None = None,
+        services: list[str] | None = None,
+        max_price: int | None = None,
+    ) -> list[dict]:
+        """
+        Получает список отелей, расположенных в определенной локации со свободными номерами (по возрастанию id).
+
+        :param location: Строка для поиска по местоположению (подстрока или похожее слово, см. location_filter)
+        :param date_from: Дата заезда
+        :param date_to: Дата выезда
+        :param limit: Максимум отелей в ответе (None — без ограничения)
+        :param after_id: Курсор keyset-пагинации: вернуть только отели с id > after_id
+        :param services: Услуги, которые должны быть у отеля все одновременно (services @> [...])
+        :param max_price: Максимальная цена номера за ночь: учитываются только номера не дороже
+        :return: Список отелей (dict), у каждого указано rooms_left (по номерам, прошедшим фильтр цены)
+
+        Ниже — реальный SQL из бизнес-логики (для читаемости и ревью):
+
+        WITH booked_rooms AS (
+            SELECT 
+                rid.room_id, 
+                MAX(rid.booked_count) AS rooms_booked -- Пиковая занятость за ночи периода
+            FROM room_inventory_daily rid
+            WHERE 
+                rid.day >= '2023-05-15' 
+                AND rid.day < '2023-06-20' -- Читаются только ночи запрошенного периода
+            GROUP BY rid.room_id
+        ),
+        booked_hotels AS (
+            SELECT 
+                r.hotel_id, 
+                SUM(GREATEST(r.quantity - COALESCE(br.rooms_booked, 0), 0)) AS rooms_left -- Учитываем, что rooms_left не может быть отрицательным
+            FROM rooms r
+            LEFT JOIN booked_rooms br ON br.room_id = r.id
+            WHERE r.price <= 5000 -- max_price (если передан)
+            GROUP BY r.hotel_id
+        )
+        SELECT 
+            h.id, 
+            h.name, 
+            h.location, 
+            h.services, 
+            h.rooms_quantity, 
+            h.image_id,
+            bh.rooms_left
+        FROM hotels h
+        JOIN booked_hotels bh ON bh.hotel_id = h.id -- INNER JOIN, т.к. нужны только отели с доступными номерами
+        WHERE 
+            bh.rooms_left > 0
+            AND (
+                h.location_search LIKE '%алтай%' -- Подстрока нормализованной локации (индекс gin_trgm_ops)
+                OR (
+                    NOT EXISTS (SELECT 1 FROM hotels h2 WHERE h2.location_search LIKE '%алтай%')
+                    AND h.location_search %> 'алтай' -- Совпадений нет: ищем похожее слово (опечатка)
+                )
+            )
+            AND h.services @> '["Wi-Fi", "Парковка"]' -- services (если переданы), индекс ix_hotels_services_gin
+            AND h.id > 20 -- Курсор (если передан)
+        ORDER BY h.id
+        LIMIT 21; -- Размер страницы + 1 (если передан)
+        """
+        get_hotels_with_rooms = cls.search_query(
+            location, date_from, date_to,
+            limit=limit, after_id=after_id, services=services, max_price=max_price,
         )
 
         # Выполнение запроса
-        async with async_session_maker() as session:
+        async with read_session() as session:
             hotels_with_rooms = await session.execute(get_hotels_with_rooms)
             return hotels_with_rooms.mappings().all()
 
+    @classmethod
+    async def stream_all(
+        cls,
+        location: str,
+        date_from: date,
+        date_to: date,
+        after_id: int | None = None,
+        services: list[str] | None = None,
+        max_price: int | None = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Sequence[RowMapping]]:
+        """
+        Отдаёт все найденные отели (тот же запрос, что find_all, без limit) порциями через
+        серверный курсор: первая порция доступна до окончания запроса, в памяти — не больше batch_size строк.
+
+        Сессия (и соединение пула) занята, пока вызывающий читает поток.
+
+        :param location: Строка для поиска по местоположению
+        :param date_from: Дата заезда
+        :param date_to: Дата выезда
+        :param after_id: Вернуть только отели с id > after_id
+        :param services: Услуги, которые должны быть у отеля все одновременно
+        :param max_price: Максимальная цена номера за ночь
+        :param batch_size: Сколько строк читать из курсора за раз
+        :return: Асинхронный итератор порций строк (RowMapping с rooms_left)
+        """
+        query = cls.search_query(
+            location, date_from, date_to,
+            after_id=after_id, services=services, max_price=max_price,
+        ).execution_options(yield_per=batch_size)
+        # Поток читается уже после выхода из эндпоинта — своя сессия, а не сессия запроса
+        async with read_session(request_scoped=False) as session:
+            result = await session.stream(query)
+            async for rows in result.mappings().partitions():
+                yield rows
+
+    @classmethod
+    async def find_page(
+        cls,
+        location: str,
+        date_from: date,
+        date_to: date,
+        limit: int,
+        cursor: int | None = None,
+        services: list[str] | None = None,
+        max_price: int | None = None,
+    ) -> dict:
+        """
+        Возвращает одну страницу поиска отелей (см. find_all) и курсор следующей страницы.
+
+        Запрашивается limit + 1 отель: если лишний нашёлся — следующая страница есть.
+
+        :param location: Строка для поиска по местоположению
+        :param date_from: Дата заезда
+        :param date_to: Дата выезда
+        :param limit: Размер страницы
+        :param cursor: next_cursor предыдущей страницы (None — первая страница)
+        :param services: Услуги, которые должны быть у отеля все одновременно
+        :param max_price: Максимальная цена номера за ночь
+        :return: {"items": [отели страницы], "next_cursor": id последнего отеля страницы или None}
+        """
+        hotels = await cls.find_all(
+            location, date_from, date_to,
+            limit=limit + 1, after_id=cursor, services=services, max_price=max_price,
+        )
+        items = list(hotels[:limit])
+        next_cursor = items[-1]["id"] if len(hotels) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
     @classmethod
     async def get_all(cls) -> list[Hotels]:
         """
@@ -122,6 +311,6 @@ class HotelDAO(BaseDAO):
 
         :return: Список ORM-объектов Hotels
         """
-        async with async_session_maker() as session:
+        async with read_session() as session:
             result = await session.execute(select(Hotels))
             return result.scalars().all()
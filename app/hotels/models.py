@@ -2,11 +2,14 @@
 Модель отеля для SQLAlchemy ORM.
 
 Описывает структуру таблицы 'hotels' — основные поля, формат хранения услуг, связь с комнатами.
+Для поиска по локации хранится нормализованная копия location (location_search) с триграммным GIN-индексом.
+Услуги хранятся в JSONB с GIN-индексом — фильтр "содержит все услуги" (@>) выполняется в БД по индексу.
 """
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, Column, Integer, String
+from sqlalchemy import Column, Computed, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -24,7 +27,8 @@ class Hotels(Base):
         id: int — первичный ключ (идентификатор отеля)
         name: str — название отеля
         location: str — город, адрес или геолокация
-        services: list[str] — список предоставляемых услуг (хранится как JSON в базе)
+        location_search: str — location в нижнем регистре, ё→е, без крайних пробелов (вычисляется, Computed)
+        services: list[str] — список предоставляемых услуг (хранится как JSONB в базе)
             Пример: ["Wi-Fi", "Парковка", "Завтрак"]
         rooms_quantity: int — общее количество комнат в отеле
         image_id: int — id изображения для превью или галереи
@@ -35,10 +39,30 @@ class Hotels(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(nullable=False)           # Название отеля
     location: Mapped[str] = mapped_column(nullable=False)       # Город или адрес
-    services: Mapped[list[str]] = mapped_column(JSON)           # JSON-список услуг (array of str)
+    services: Mapped[list[str]] = mapped_column(JSONB)          # JSONB-список услуг (array of str)
     rooms_quantity: Mapped[int] = mapped_column(nullable=False) # Сколько всего комнат в отеле
     image_id: Mapped[int]                                       # id изображения (внешняя связь, если есть)
 
+    # Нормализованная локация для поиска; та же нормализация применяется к запросу в HotelDAO
+    location_search: Mapped[str] = mapped_column(Computed("btrim(replace(lower(location), 'ё', 'е'))"))
+
+    __table_args__ = (
+        # Триграммный GIN-индекс (pg_trgm): ускоряет LIKE '%...%' и нечёткое сравнение (%>) по location_search
+        Index(
+            "ix_hotels_location_search_trgm",
+            "location_search",
+            postgresql_using="gin",
+            postgresql_ops={"location_search": "gin_trgm_ops"},
+        ),
+        # GIN-индекс по услугам (jsonb_path_ops): фильтр services @> '["Wi-Fi", "Парковка"]'
+        Index(
+            "ix_hotels_services_gin",
+            "services",
+            postgresql_using="gin",
+            postgresql_ops={"services": "jsonb_path_ops"},
+        ),
+    )
+
     # ORM-связь: список комнат, относящихся к этому отелю
     rooms: Mapped[list["Rooms"]] = relationship(back_populates="hotel")
 
@@ -1,17 +1,24 @@
 """
 DAO для операций с номерами (rooms) отеля.
 - Получение всех комнат по отелю с расчётом свободных мест и стоимости на период.
+- То же сразу для нескольких отелей одним запросом (для страницы результатов поиска).
+- Календарь свободных номеров отеля по дням (один запрос: generate_series + реестр занятости).
 - Получение только доступных комнат на даты.
+Все запросы — только чтение: выполняются на реплике, если она задана (read_session).
+Импорт справочника (BaseDAO.upsert_batches) сопоставляет номера без id по отелю и названию.
 """
 
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import and_, func, select
+from sqlalchemy import Date, Select, and_, cast, func, literal_column, select, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
-from app.bookings.models import Bookings
+from app.cache.tagged import evict_catalog
 from app.dao.base import BaseDAO
-from app.database import async_session_maker
+from app.database import read_session
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import InventoryDAO
+from app.inventory.models import RoomInventoryDaily
 from app.logger import logger
 
 
@@ -21,9 +28,40 @@ class RoomDAO(BaseDAO):
 
     Методы:
         - find_all: получить все комнаты, даже занятые, с расчётом стоимости и свободных мест.
+        - find_all_for_hotels: то же для списка отелей одним запросом, с группировкой по отелю.
+        - find_calendar: свободные номера каждой комнаты отеля по дням периода.
         - find_available: получить только свободные комнаты на даты.
+        - after_insert: инвалидация кеша ответов и версии отелей (ETag) после импорта новых номеров.
+        - after_upsert: то же и кеш справочных данных после импорта справочника (mode=upsert).
     """
     model = Rooms
+    natural_key = ("hotel_id", "name")
+
+    @classmethod
+    async def after_insert(cls, rows: list[dict]) -> None:
+        """
+        После импорта новых номеров (режимы insert, copy, job): сбрасывает кеш ответов их отелей
+        и поиска и увеличивает версии отелей (evict_catalog).
+
+        :param rows: добавленные номера
+        """
+        if rows:
+            await evict_catalog(row["hotel_id"] for row in rows)
+
+    @classmethod
+    async def after_upsert(cls, rows: list[dict]) -> None:
+        """
+        После импорта справочника: сбрасывает изменённые номера в кеше справочных данных,
+        кеш ответов их отелей и поиска и увеличивает версии отелей (ETag) — как правка в админке.
+        У номера, перенесённого в другой отель, затронут и прежний отель.
+
+        :param rows: добавленные и изменённые номера (previous — прежние значения ключа, см. BaseDAO.upsert_batches)
+        """
+        await super().after_upsert(rows)
+        if rows:
+            hotel_ids = {row["hotel_id"] for row in rows}
+            hotel_ids.update(row["previous"]["hotel_id"] for row in rows if row.get("previous"))
+            await evict_catalog(hotel_ids)
 
     @classmethod
     async def find_all(cls, hotel_id: int, date_from: date, date_to: date) -> list[dict]:
@@ -40,11 +78,11 @@ class RoomDAO(BaseDAO):
         WITH booked_rooms AS (
             SELECT 
                 room_id, 
-                COUNT(room_id) AS rooms_booked
-            FROM bookings
+                MAX(booked_count) AS rooms_booked
+            FROM room_inventory_daily
             WHERE 
-                date_to >= '2023-05-15'
-                AND date_from <= '2023-06-20'
+                day >= '2023-05-15'
+                AND day < '2023-06-20'
             GROUP BY room_id
         )
         SELECT 
@@ -63,22 +101,126 @@ class RoomDAO(BaseDAO):
         WHERE r.hotel_id = 1;
         """
 
-        # Подсчет забронированных номеров
-        booked_rooms = (
-            select(Bookings.room_id, func.count(Bookings.room_id).label("rooms_booked"))
-            .where(
-                and_(
-                    Bookings.date_to >= date_from,
-                    Bookings.date_from <= date_to,
-                )
+        # Все номера отеля с расчётом стоимости и свободных мест
+        get_rooms = cls._rooms_with_availability(date_from, date_to).where(Rooms.hotel_id == hotel_id)
+
+        async with read_session() as session:
+            rooms = await session.execute(get_rooms)
+            rooms_data = rooms.mappings().all()
+            logger.info(f"📦 Result count: {len(rooms_data)}")
+            return rooms_data
+
+    @classmethod
+    async def find_all_for_hotels(
+        cls,
+        hotel_ids: list[int],
+        date_from: date,
+        date_to: date,
+    ) -> dict[int, list[dict]]:
+        """
+        Получает все номера сразу нескольких отелей (как find_all) одним запросом и одной сессией.
+        CTE booked_rooms считается один раз на все отели — вместо N вызовов find_all.
+
+        :param hotel_ids: список ID отелей
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        :return: {hotel_id: [dict комнаты с total_cost, rooms_left]} — ключи для всех запрошенных отелей
+                 (пустой список, если у отеля нет номеров или отель не найден)
+
+        СЫРОЙ SQL: как в find_all, но
+        WHERE r.hotel_id IN (1, 2, 3)
+        ORDER BY r.hotel_id, r.id;
+        """
+        rooms_by_hotel: dict[int, list[dict]] = {hotel_id: [] for hotel_id in hotel_ids}
+        if not hotel_ids:
+            return rooms_by_hotel
+
+        get_rooms = (
+            cls._rooms_with_availability(date_from, date_to)
+            .where(Rooms.hotel_id.in_(hotel_ids))
+            .order_by(Rooms.hotel_id, Rooms.id)
+        )
+
+        async with read_session() as session:
+            rooms = await session.execute(get_rooms)
+            for room in rooms.mappings().all():
+                rooms_by_hotel[room["hotel_id"]].append(room)
+            return rooms_by_hotel
+
+    @classmethod
+    async def find_calendar(cls, hotel_id: int, date_from: date, days: int) -> list[dict]:
+        """
+        Календарь доступности: сколько номеров каждой комнаты отеля свободно в каждую ночь периода.
+        Считается одним запросом (ряд дней generate_series × комнаты отеля + реестр занятости),
+        а не отдельной проверкой на каждый день.
+
+        :param hotel_id: ID отеля
+        :param date_from: первый день календаря
+        :param days: количество дней
+        :return: список dict по комнатам (по возрастанию id): room_id, quantity, price,
+                 free — список свободных номеров по дням, free[i] относится к date_from + i дней
+
+        СЫРОЙ SQL:
+        SELECT
+            r.id AS room_id,
+            r.quantity,
+            r.price,
+            ARRAY_AGG(GREATEST(r.quantity - COALESCE(rid.booked_count, 0), 0) ORDER BY d.day) AS free
+        FROM rooms r
+        CROSS JOIN generate_series('2023-06-01'::date, '2023-08-29'::date, interval '1 day') AS d(day)
+        LEFT JOIN room_inventory_daily rid ON rid.room_id = r.id AND rid.day = d.day::date
+        WHERE r.hotel_id = 1
+        GROUP BY r.id
+        ORDER BY r.id;
+        """
+        calendar_days = (
+            func.generate_series(
+                date_from,
+                date_from + timedelta(days=days - 1),
+                literal_column("interval '1 day'"),
             )
-            .select_from(Bookings)
-            .group_by(Bookings.room_id)
-            .cte("booked_rooms")
+            .table_valued("day")
+            .render_derived(name="d")
         )
+        day = cast(calendar_days.c.day, Date)
+        free = func.greatest(Rooms.quantity - func.coalesce(RoomInventoryDaily.booked_count, 0), 0)
 
-        # Запрос на выборку всех номеров отеля
-        get_rooms = (
+        get_calendar = (
+            select(
+                Rooms.id.label("room_id"),
+                Rooms.quantity,
+                Rooms.price,
+                func.array_agg(aggregate_order_by(free, day)).label("free"),
+            )
+            .select_from(Rooms)
+            .join(calendar_days, true())  # CROSS JOIN: каждая комната × каждый день
+            .join(
+                RoomInventoryDaily,
+                and_(RoomInventoryDaily.room_id == Rooms.id, RoomInventoryDaily.day == day),
+                isouter=True,
+            )
+            .where(Rooms.hotel_id == hotel_id)
+            .group_by(Rooms.id)
+            .order_by(Rooms.id)
+        )
+
+        async with read_session() as session:
+            calendar = await session.execute(get_calendar)
+            return calendar.mappings().all()
+
+    @classmethod
+    def _rooms_with_availability(cls, date_from: date, date_to: date) -> Select:
+        """
+        Базовый SELECT номеров с total_cost и rooms_left на период (без фильтра по отелю).
+
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        :return: SELECT, к которому вызывающий метод добавляет WHERE по отелю/отелям
+        """
+        # Подсчет забронированных номеров по посуточному реестру
+        booked_rooms = InventoryDAO.booked_rooms_cte(date_from, date_to)
+
+        return (
             select(
                 Rooms.id,
                 Rooms.hotel_id,
@@ -92,15 +234,8 @@ class RoomDAO(BaseDAO):
                 func.greatest(Rooms.quantity - func.coalesce(booked_rooms.c.rooms_booked, 0), 0).label("rooms_left"),  # Оставшиеся номера
             )
             .join(booked_rooms, booked_rooms.c.room_id == Rooms.id, isouter=True)  # LEFT JOIN
-            .where(Rooms.hotel_id == hotel_id)  # Только для нужного отеля
         )
 
-        async with async_session_maker() as session:
-            rooms = await session.execute(get_rooms)
-            rooms_data = rooms.mappings().all()
-            logger.info(f"📦 Result count: {len(rooms_data)}")
-            return rooms_data
-
     @classmethod
     async def find_available(cls, hotel_id: int, date_from: date, date_to: date) -> list[dict]:
         """
@@ -114,17 +249,7 @@ class RoomDAO(BaseDAO):
         Логика аналогична find_all, но фильтрует только те, где rooms_left > 0.
         """
 
-        booked_rooms = (
-            select(Bookings.room_id, func.count(Bookings.room_id).label("rooms_booked"))
-            .where(
-                and_(
-                    Bookings.date_to >= date_from,
-                    Bookings.date_from <= date_to,
-                )
-            )
-            .group_by(Bookings.room_id)
-            .cte("booked_rooms")
-        )
+        booked_rooms = InventoryDAO.booked_rooms_cte(date_from, date_to)
 
         rooms_left_expr = func.greatest(Rooms.quantity - func.coalesce(booked_rooms.c.rooms_booked, 0), 0)
 
@@ -143,6 +268,6 @@ class RoomDAO(BaseDAO):
             )
         )
 
-        async with async_session_maker() as session:
+        async with read_session() as session:
             result = await session.execute(query)
             return result.mappings().all()
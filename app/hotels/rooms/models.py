@@ -1,11 +1,13 @@
 """
 Модель SQLAlchemy для комнат отеля (rooms).
 - Описывает структуру таблицы rooms и связи с отелями и бронями.
+- Услуги хранятся в JSONB с GIN-индексом (фильтр по услугам выполняется в БД).
 """
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import JSON, Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -26,7 +28,7 @@ class Rooms(Base):
         name: str — название типа комнаты (например, "Стандарт", "Люкс")
         description: str | None — описание (nullable)
         price: int — цена за ночь
-        services: list[str] | None — список предоставляемых услуг, хранится как JSON (nullable)
+        services: list[str] | None — список предоставляемых услуг, хранится как JSONB (nullable)
             Пример: ["Wi-Fi", "Кондиционер", "Завтрак"]
         quantity: int — количество одинаковых номеров данного типа
         image_id: int — id изображения комнаты (для галереи или превью)
@@ -42,10 +44,20 @@ class Rooms(Base):
     name: Mapped[str] = mapped_column(nullable=False)                   # Название типа комнаты (например, "Стандарт", "Люкс")
     description: Mapped[str] = mapped_column(nullable=True)             # Описание комнаты (опционально)
     price: Mapped[int] = mapped_column(nullable=False)                  # Цена за ночь
-    services: Mapped[list[str]] = mapped_column(JSON, nullable=True)    # Список услуг (nullable, JSON)
+    services: Mapped[list[str]] = mapped_column(JSONB, nullable=True)   # Список услуг (nullable, JSONB)
     quantity: Mapped[int] = mapped_column(nullable=False)               # Количество одинаковых номеров
     image_id: Mapped[int]                                               # id изображения (nullable не указан — уточните если нужно)
 
+    # GIN-индекс по услугам (jsonb_path_ops): фильтр services @> '["Кондиционер"]'
+    __table_args__ = (
+        Index(
+            "ix_rooms_services_gin",
+            "services",
+            postgresql_using="gin",
+            postgresql_ops={"services": "jsonb_path_ops"},
+        ),
+    )
+
     # ORM-связи
     hotel: Mapped["Hotels"] = relationship(back_populates="rooms")      # Объект-отель, к которому принадлежит эта комната
     bookings: Mapped[list["Bookings"]] = relationship(back_populates="room")  # Все бронирования этой комнаты
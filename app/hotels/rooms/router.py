@@ -1,22 +1,35 @@
 """
 Роутер FastAPI для операций с комнатами отеля.
 
-Позволяет получить список всех комнат по отелю с расчетом свободных мест и стоимости за период.
+Позволяет получить список всех комнат по отелю с расчетом свободных мест и стоимости за период,
+а также календарь свободных номеров по дням и самые дешёвые окна дат ("гибкие даты")
+для выбора дат без перебора запросами.
+
+Ответы кешируются с тегом отеля (app/cache/tagged.py) и сбрасываются бронями его номеров
+на пересекающиеся даты. Номера отеля поддерживают условный GET (ETag по версии отеля, 304).
 """
 
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import List, Optional
 
-from fastapi import Query, HTTPException
-from fastapi_cache.decorator import cache
+from fastapi import Depends, Query, HTTPException
 
+from app.cache.tagged import hotel_tag, request_window, tagged_cache
+from app.cache.versions import hotel_etag
+from app.exceptions import DateFromCannotBeAfterDateTo
 from app.hotels.rooms.dao import RoomDAO
-from app.hotels.rooms.schemas import SRoomInfo
+from app.hotels.rooms.schemas import SHotelCalendar, SRoomInfo, SRoomWindow
+from app.hotels.rooms.service import RoomsService
 from app.hotels.router import router
 
 
-@router.get("/{hotel_id}/rooms")
-@cache(expire=3)
+def hotel_tags(params: dict, data) -> list[str]:
+    """Теги записи кеша эндпоинтов одного отеля."""
+    return [hotel_tag(params["hotel_id"])]
+
+
+@router.get("/{hotel_id}/rooms", dependencies=[Depends(hotel_etag)])
+@tagged_cache("hotel_rooms", window=request_window, tags=hotel_tags, response_model=List[SRoomInfo])
 async def get_rooms_by_date(
     hotel_id: int,
     date_from: date = Query(..., description=f"Дата заезда, например, {datetime.now().date()}"),
@@ -49,3 +62,106 @@ async def get_rooms_by_date(
         raise HTTPException(status_code=400, detail="Дата заезда не может быть позже даты выезда")
 
     return await RoomDAO.find_all(hotel_id, date_from, date_to)
+
+
+# Календарь: дней по умолчанию и максимум за один запрос
+CALENDAR_DEFAULT_DAYS = 90
+CALENDAR_MAX_DAYS = 366
+
+
+def calendar_cache_key(params: dict) -> dict:
+    """
+    Параметры ключа кеша календаря: "с сегодня" раскрывается в конкретную дату,
+    иначе завтра отдавался бы вчерашний календарь.
+    """
+    return {**params, "date_from": params["date_from"] or date.today()}
+
+
+def calendar_window(params: dict) -> tuple[date, date]:
+    """Окно записи календаря: [from, from + days)."""
+    date_from = params["date_from"] or date.today()
+    return date_from, date_from + timedelta(days=params["days"])
+
+
+@router.get("/{hotel_id}/calendar")
+@tagged_cache(
+    "hotel_calendar", window=calendar_window, tags=hotel_tags, key_params=calendar_cache_key,
+    response_model=SHotelCalendar,
+)
+async def get_hotel_calendar(
+    hotel_id: int,
+    date_from: Optional[date] = Query(None, alias="from", description="Первый день календаря, по умолчанию — сегодня"),
+    days: int = Query(CALENDAR_DEFAULT_DAYS, ge=1, le=CALENDAR_MAX_DAYS, description="Количество дней"),
+) -> SHotelCalendar:
+    """
+    Календарь доступности отеля: сколько номеров каждой комнаты свободно в каждую ночь периода.
+    Считается одним SQL-запросом по реестру занятости.
+
+    :param hotel_id: ID отеля
+    :param date_from: Первый день календаря (query-параметр from, YYYY-MM-DD)
+    :param days: Количество дней (1..CALENDAR_MAX_DAYS)
+    :return: SHotelCalendar — rooms[].free[i] относится к дню from + i
+
+    Пример ответа:
+        {
+            "hotel_id": 1,
+            "date_from": "2025-07-01",
+            "days": 3,
+            "rooms": [{"room_id": 1, "quantity": 5, "free": [5, 4, 4]}]
+        }
+    """
+    date_from = date_from or date.today()
+    rooms = await RoomDAO.find_calendar(hotel_id, date_from, days)
+    return {"hotel_id": hotel_id, "date_from": date_from, "days": days, "rooms": rooms}
+
+
+# Гибкие даты: максимум ночей (как и для брони — не более месяца) и окон в ответе
+BEST_DATES_MAX_NIGHTS = 30
+BEST_DATES_MAX_LIMIT = 100
+
+
+def best_dates_window(params: dict) -> tuple[date, date]:
+    """Окно записи гибких дат: [within_from, within_to) с теми же умолчаниями, что у эндпоинта."""
+    within_from = params["within_from"] or date.today()
+    return within_from, params["within_to"] or within_from + timedelta(days=CALENDAR_DEFAULT_DAYS)
+
+
+def best_dates_cache_key(params: dict) -> dict:
+    """Параметры ключа кеша гибких дат: умолчания периода раскрываются в конкретные даты."""
+    within_from, within_to = best_dates_window(params)
+    return {**params, "within_from": within_from, "within_to": within_to}
+
+
+@router.get("/{hotel_id}/best-dates")
+@tagged_cache(
+    "hotel_best_dates", window=best_dates_window, tags=hotel_tags, key_params=best_dates_cache_key,
+    response_model=List[SRoomWindow],
+)
+async def get_best_dates(
+    hotel_id: int,
+    nights: int = Query(..., ge=1, le=BEST_DATES_MAX_NIGHTS, description="Количество ночей"),
+    within_from: Optional[date] = Query(None, description="Самая ранняя дата заезда, по умолчанию — сегодня"),
+    within_to: Optional[date] = Query(None, description="Самая поздняя дата выезда, по умолчанию — через 90 дней"),
+    limit: int = Query(10, ge=1, le=BEST_DATES_MAX_LIMIT, description="Сколько окон вернуть"),
+) -> List[SRoomWindow]:
+    """
+    Поиск гибких дат: самые дешёвые окна (дата заезда, комната), в которые комната свободна nights ночей подряд.
+    Занятость за период читается одним запросом, окна считаются в NumPy.
+
+    :param hotel_id: ID отеля
+    :param nights: Количество ночей (1..BEST_DATES_MAX_NIGHTS)
+    :param within_from: Самая ранняя дата заезда (YYYY-MM-DD)
+    :param within_to: Самая поздняя дата выезда (YYYY-MM-DD); период не длиннее CALENDAR_MAX_DAYS
+    :param limit: Сколько окон вернуть
+    :return: Список SRoomWindow по возрастанию total_cost (затем по дате заезда)
+    :raises DateFromCannotBeAfterDateTo: если within_from не раньше within_to
+    :raises HTTPException 400: если период длиннее CALENDAR_MAX_DAYS
+    """
+    within_from = within_from or date.today()
+    within_to = within_to or within_from + timedelta(days=CALENDAR_DEFAULT_DAYS)
+    if within_from >= within_to:
+        raise DateFromCannotBeAfterDateTo
+    if (within_to - within_from).days > CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Период поиска не может быть длиннее {CALENDAR_MAX_DAYS} дней")
+
+    return await RoomsService.find_best_dates(hotel_id, nights, within_from, within_to, limit)
@@ -3,8 +3,12 @@ Pydantic-схемы для работы с комнатами (rooms) в API.
 
 SRoom     — базовая схема комнаты (описание, услуги, цена и пр.)
 SRoomInfo — расширенная схема для ответа API (добавляет стоимость за период и кол-во свободных мест).
+SHotelRooms — номера одного отеля в пакетном ответе (GET /hotels/rooms?hotel_ids=...).
+SRoomCalendar / SHotelCalendar — календарь свободных номеров по дням (GET /hotels/{hotel_id}/calendar).
+SRoomWindow — окно дат для комнаты в поиске гибких дат (GET /hotels/{hotel_id}/best-dates).
 """
 
+from datetime import date
 from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
@@ -52,3 +56,65 @@ class SRoomInfo(SRoom):
     rooms_left: int        # Сколько осталось свободных комнат
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SHotelRooms(BaseModel):
+    """
+    Номера одного отеля в пакетном ответе GET /hotels/rooms.
+
+    Атрибуты:
+        hotel_id: int            — идентификатор отеля
+        rooms: list[SRoomInfo]   — все номера отеля с total_cost и rooms_left (пустой, если номеров нет)
+    """
+    hotel_id: int
+    rooms: List[SRoomInfo]
+
+
+class SRoomCalendar(BaseModel):
+    """
+    Свободные номера одной комнаты по дням календаря.
+
+    Атрибуты:
+        room_id: int     — идентификатор комнаты
+        quantity: int    — сколько таких комнат в отеле всего
+        free: list[int]  — свободных номеров по дням; free[i] — на ночь date_from + i дней
+    """
+    room_id: int
+    quantity: int
+    free: List[int]
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SHotelCalendar(BaseModel):
+    """
+    Календарь доступности отеля (для выбора дат и тепловой карты на странице отеля).
+
+    Атрибуты:
+        hotel_id: int               — идентификатор отеля
+        date_from: date             — первый день календаря
+        days: int                   — количество дней
+        rooms: list[SRoomCalendar]  — календарь по каждой комнате отеля
+    """
+    hotel_id: int
+    date_from: date
+    days: int
+    rooms: List[SRoomCalendar]
+
+
+class SRoomWindow(BaseModel):
+    """
+    Окно дат, в которое комната свободна все ночи подряд (поиск гибких дат).
+
+    Атрибуты:
+        room_id: int     — идентификатор комнаты
+        date_from: date  — дата заезда
+        date_to: date    — дата выезда
+        total_cost: int  — стоимость проживания за все ночи окна
+        rooms_left: int  — минимум свободных номеров этой комнаты за ночи окна
+    """
+    room_id: int
+    date_from: date
+    date_to: date
+    total_cost: int
+    rooms_left: int
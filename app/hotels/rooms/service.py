@@ -0,0 +1,80 @@
+"""
+Сервисный слой для номеров отеля.
+
+- Поиск "гибких дат": самые дешёвые окна (дата заезда, комната) заданной длины внутри периода.
+- Занятость за весь период берётся одним запросом (RoomDAO.find_calendar),
+  а окна проверяются векторно в NumPy — без запроса в БД на каждую дату заезда.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.hotels.rooms.dao import RoomDAO
+
+
+class RoomsService:
+    """
+    Сервис для работы с номерами отеля.
+
+    Зачем нужен:
+    - DAO отдаёт сырые данные (календарь занятости).
+    - Service-слой — вычисления поверх них (скользящее окно, ранжирование по стоимости).
+    """
+
+    @classmethod
+    async def find_best_dates(
+        cls,
+        hotel_id: int,
+        nights: int,
+        within_from: date,
+        within_to: date,
+        limit: int,
+    ) -> list[dict]:
+        """
+        Находит самые дешёвые окна из nights ночей, в которые комната свободна все ночи подряд.
+
+        Логика:
+        - Календарь свободных номеров по дням для всех комнат отеля → матрица free[комната, день].
+        - sliding_window_view + min по окну: минимум свободных номеров за nights ночей от каждой даты заезда.
+        - Окно подходит, если минимум > 0; сортировка по total_cost, затем по дате заезда и id комнаты.
+
+        :param hotel_id: ID отеля
+        :param nights: количество ночей
+        :param within_from: самая ранняя дата заезда
+        :param within_to: самая поздняя дата выезда
+        :param limit: сколько окон вернуть (top-k)
+        :return: список dict: room_id, date_from, date_to, total_cost, rooms_left (минимум свободных за окно)
+        """
+        days = (within_to - within_from).days
+        if nights < 1 or days < nights:
+            return []
+
+        calendar = await RoomDAO.find_calendar(hotel_id, within_from, days)
+        if not calendar:
+            return []
+
+        room_ids = np.array([room["room_id"] for room in calendar])
+        prices = np.array([room["price"] for room in calendar])
+        free = np.array([room["free"] for room in calendar])  # shape: (комнаты, дни)
+
+        # windows_free[r, s] — минимум свободных номеров комнаты r за ночи s .. s + nights - 1
+        windows_free = sliding_window_view(free, nights, axis=1).min(axis=-1)
+        room_idx, start_idx = np.nonzero(windows_free > 0)
+        total_costs = prices[room_idx] * nights
+
+        # lexsort: последний ключ — главный (total_cost, затем дата заезда, затем id комнаты)
+        order = np.lexsort((room_ids[room_idx], start_idx, total_costs))[:limit]
+
+        best_dates = []
+        for i in order:
+            date_from = within_from + timedelta(days=int(start_idx[i]))
+            best_dates.append({
+                "room_id": int(room_ids[room_idx[i]]),
+                "date_from": date_from,
+                "date_to": date_from + timedelta(days=nights),
+                "total_cost": int(total_costs[i]),
+                "rooms_left": int(windows_free[room_idx[i], start_idx[i]]),
+            })
+        return best_dates
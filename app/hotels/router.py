@@ -1,9 +1,18 @@
 """
 Роутер FastAPI для работы с отелями:
-- Поиск отелей по локации и датам (GET /hotels/{location})
+- Номера нескольких отелей на даты одним запросом (GET /hotels/rooms?hotel_ids=1,2,3)
+- Поиск отелей по локации и датам (GET /hotels/{location}), постранично: limit + cursor,
+  с фильтрами по услугам (services) и цене номера (max_price);
+  с Accept: application/x-ndjson — вся выдача потоком NDJSON из серверного курсора
 - Получение информации об отеле по id (GET /hotels/id/{hotel_id})
 
-Используется кеширование через fastapi-cache2 (60 сек) — компромисс между актуальностью и скоростью.
+Поиск и номера кешируются в Redis с тегами зависимостей (app/cache/tagged.py): брони точечно
+сбрасывают затронутые записи, поэтому TTL длинный (settings.SEARCH_CACHE_EXPIRE), а rooms_left актуален.
+Истёкшая по времени запись ещё SEARCH_CACHE_STALE_TTL сек отдаётся сразу и пересчитывается в фоне.
+В кеше лежит уже сериализованный по схеме JSON — попадание отдаётся без pydantic (app/responses.py).
+Отель по id читается через двухуровневый кеш справочных данных (app/cache/catalog.py).
+Поиск и отель по id поддерживают условный GET: ETag по версиям данных отелей (app/cache/versions.py),
+при совпадении If-None-Match — 304 без обращения к БД.
 В демо-режиме искусственная задержка (3 сек), чтобы продемонстрировать работу кеша.
 """
 
@@ -11,46 +20,165 @@ import asyncio
 from datetime import date, datetime, timedelta
 from typing import List, Optional
 
-from fastapi import APIRouter, Query
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Depends, Header, Query
+from fastapi.responses import Response, StreamingResponse
 
-from app.exceptions import DateFromCannotBeAfterDateTo
+from app.cache.tagged import SEARCH_TAG, hotel_tag, request_window, tagged_cache
+from app.cache.versions import hotel_etag, search_etag
+from app.exceptions import DateFromCannotBeAfterDateTo, IncorrectHotelIdsException
 from app.hotels.dao import HotelDAO
-from app.hotels.schemas import SHotel, SHotelInfo
+from app.hotels.rooms.dao import RoomDAO
+from app.hotels.rooms.schemas import SHotelRooms
+from app.hotels.schemas import SHotel, SHotelInfo, SHotelsPage
+from app.responses import NDJSON_MEDIA_TYPE, accepts_ndjson, ndjson_stream
 
 router = APIRouter(
     prefix="/hotels",
     tags=["Отели"],
 )
 
+# Максимум отелей в одном пакетном запросе номеров (страница результатов поиска)
+MAX_BATCH_HOTEL_IDS = 100
 
-@router.get("/{location}")
-@cache(expire=60)
+# Размер страницы поиска отелей: по умолчанию и максимальный
+HOTELS_PAGE_LIMIT = 20
+HOTELS_PAGE_MAX_LIMIT = 100
+
+
+def search_cache_key(params: dict) -> dict:
+    """
+    Параметры ключа кеша поиска: локация нормализуется так же, как при поиске,
+    услуги — без учёта порядка и повторов ("Алтай" и " алтай " — одна запись).
+    """
+    return {
+        **params,
+        "location": HotelDAO.normalize_location(params["location"]),
+        "services": sorted(set(params["services"] or [])),
+    }
+
+
+# Объявлен до /{location}: иначе "rooms" будет принят за локацию
+@router.get("/rooms")
+@tagged_cache(
+    "hotels_rooms",
+    window=request_window,
+    tags=lambda params, hotels: [hotel_tag(hotel["hotel_id"]) for hotel in hotels],
+    response_model=List[SHotelRooms],
+)
+async def get_rooms_for_hotels(
+    hotel_ids: str = Query(..., description="ID отелей через запятую, например, 1,2,3"),
+    date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),
+    date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),
+) -> List[SHotelRooms]:
+    """
+    Получает номера сразу нескольких отелей на период — один запрос к БД вместо
+    GET /hotels/{hotel_id}/rooms на каждый отель страницы результатов.
+
+    :param hotel_ids: ID отелей через запятую (не более MAX_BATCH_HOTEL_IDS)
+    :param date_from: Дата заезда (YYYY-MM-DD)
+    :param date_to: Дата выезда (YYYY-MM-DD)
+    :return: Список SHotelRooms в порядке hotel_ids (без повторов)
+    :raises IncorrectHotelIdsException: если hotel_ids не список чисел или их слишком много
+    :raises DateFromCannotBeAfterDateTo: если дата заезда позже даты выезда
+    """
+    try:
+        ids = list(dict.fromkeys(int(hotel_id) for hotel_id in hotel_ids.split(",") if hotel_id.strip()))
+    except ValueError:
+        raise IncorrectHotelIdsException
+    if not ids or len(ids) > MAX_BATCH_HOTEL_IDS:
+        raise IncorrectHotelIdsException
+    if date_from > date_to:
+        raise DateFromCannotBeAfterDateTo
+
+    rooms_by_hotel = await RoomDAO.find_all_for_hotels(ids, date_from, date_to)
+    return [{"hotel_id": hotel_id, "rooms": rooms} for hotel_id, rooms in rooms_by_hotel.items()]
+
+
+@tagged_cache(
+    "hotels_search",
+    window=request_window,
+    tags=lambda params, page: [SEARCH_TAG] + [hotel_tag(hotel["id"]) for hotel in page["items"]],
+    key_params=search_cache_key,
+    response_model=SHotelsPage,
+)
+async def search_hotels_page(
+    location: str,
+    date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),
+    date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),
+    limit: int = Query(HOTELS_PAGE_LIMIT, ge=1, le=HOTELS_PAGE_MAX_LIMIT, description="Размер страницы"),
+    cursor: Optional[int] = Query(None, description="next_cursor из предыдущей страницы"),
+    services: Optional[List[str]] = Query(None, description="Услуги, которые должны быть у отеля все (повторяющийся параметр)"),
+    max_price: Optional[int] = Query(None, ge=0, description="Максимальная цена номера за ночь"),
+) -> SHotelsPage:
+    """
+    Страница поиска отелей с кешем (JSON-ответ по схеме SHotelsPage).
+    Используется эндпоинтом поиска и HTML-страницей /pages/hotels (как зависимость).
+
+    ⚠️ Кеш сбрасывается бронями отелей страницы (и снятием любой брони на пересекающиеся даты);
+    искусственная задержка (3 сек) — для демонстрации.
+    """
+    await asyncio.sleep(3)  # Искуственная задержка для демонстрации кеша
+    if date_from > date_to:
+        raise DateFromCannotBeAfterDateTo
+    return await HotelDAO.find_page(
+        location, date_from, date_to,
+        limit=limit, cursor=cursor, services=services, max_price=max_price,
+    )
+
+
+@router.get(
+    "/{location}",
+    dependencies=[Depends(search_etag)],
+    response_model=SHotelsPage,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {"schema": SHotelInfo.model_json_schema()}}}},
+)
 async def get_hotels_by_location_and_time(
     location: str,
     date_from: date = Query(..., description=f"Например, {datetime.now().date()}"),
     date_to: date = Query(..., description=f"Например, {(datetime.now() + timedelta(days=14)).date()}"),
-) -> List[SHotelInfo]:
+    limit: int = Query(HOTELS_PAGE_LIMIT, ge=1, le=HOTELS_PAGE_MAX_LIMIT, description="Размер страницы"),
+    cursor: Optional[int] = Query(None, description="next_cursor из предыдущей страницы"),
+    services: Optional[List[str]] = Query(None, description="Услуги, которые должны быть у отеля все (повторяющийся параметр)"),
+    max_price: Optional[int] = Query(None, ge=0, description="Максимальная цена номера за ночь"),
+    accept: Optional[str] = Header(None, include_in_schema=False),
+) -> Response:
     """
-    Получает список всех отелей по локации, где есть свободные номера на указанные даты.
+    Получает страницу отелей по локации, где есть свободные номера на указанные даты.
+
+    С заголовком Accept: application/x-ndjson отдаёт не страницу, а все найденные отели
+    (после cursor; limit не применяется) потоком — по SHotelInfo на строку, без кеша:
+    строки читаются из серверного курсора и отправляются порциями, память воркера не растёт с объёмом выдачи.
 
     :param location: Город или регион (поиск по подстроке, нечувствительно к регистру)
     :param date_from: Дата заезда (YYYY-MM-DD)
     :param date_to: Дата выезда (YYYY-MM-DD)
-    :return: Список SHotelInfo (отели с полем rooms_left)
+    :param limit: Сколько отелей вернуть (не более HOTELS_PAGE_MAX_LIMIT)
+    :param cursor: Курсор следующей страницы (next_cursor предыдущего ответа)
+    :param services: Услуги отеля, все обязательны (?services=Wi-Fi&services=Парковка)
+    :param max_price: Максимальная цена номера за ночь; rooms_left считается только по таким номерам
+    :param accept: Заголовок Accept (выбор JSON-страницы или NDJSON-потока)
+    :return: SHotelsPage — отели с полем rooms_left и next_cursor (None на последней странице);
+        для NDJSON — поток SHotelInfo
     :raises DateFromCannotBeAfterDateTo: если дата заезда позже даты выезда
-
-    ⚠️ Используется кеш 60 сек и искусственная задержка (3 сек) для демонстрации.
     """
-    await asyncio.sleep(3)  # Искуственная задержка для демонстрации кеша
     if date_from > date_to:
         raise DateFromCannotBeAfterDateTo
-    hotels = await HotelDAO.find_all(location, date_from, date_to)
-    return hotels
+    if accepts_ndjson(accept):
+        batches = HotelDAO.stream_all(
+            location, date_from, date_to,
+            after_id=cursor, services=services, max_price=max_price,
+        )
+        response = StreamingResponse(ndjson_stream(batches, SHotelInfo), media_type=NDJSON_MEDIA_TYPE)
+    else:
+        response = await search_hotels_page(
+            location=location, date_from=date_from, date_to=date_to,
+            limit=limit, cursor=cursor, services=services, max_price=max_price,
+        )
+    response.headers["Vary"] = "Accept"
+    return response
 
 
-@router.get("/id/{hotel_id}")
-@cache(expire=60)
+@router.get("/id/{hotel_id}", dependencies=[Depends(hotel_etag)])
 async def get_hotel_by_id(
     hotel_id: int,
 ) -> Optional[SHotel]:
@@ -59,5 +187,7 @@ async def get_hotel_by_id(
 
     :param hotel_id: id отеля
     :return: SHotel (данные отеля) или None, если не найден
+
+    Читается через двухуровневый кеш (память воркера -> Redis), сбрасывается правкой отеля в админке.
     """
-    return await HotelDAO.find_one_or_none(id=hotel_id)
+    return await HotelDAO.find_by_id_cached(hotel_id)
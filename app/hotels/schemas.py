@@ -3,9 +3,10 @@ Pydantic-схемы для работы с объектами отелей.
 
 - SHotel: базовая схема отеля (для большинства запросов и выдачи по id)
 - SHotelInfo: расширенная схема с полем rooms_left (выдаётся при поиске отелей с фильтрацией по датам)
+- SHotelsPage: страница результатов поиска (отели + курсор следующей страницы)
 """
 
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -42,3 +43,15 @@ class SHotelInfo(SHotel):
     rooms_left: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class SHotelsPage(BaseModel):
+    """
+    Страница результатов поиска отелей (keyset-пагинация по id).
+
+    Атрибуты:
+        items: List[SHotelInfo] — отели страницы (по возрастанию id)
+        next_cursor: int | None — передать как cursor, чтобы получить следующую страницу; None — страниц больше нет
+    """
+    items: List[SHotelInfo]
+    next_cursor: Optional[int]
@@ -0,0 +1,184 @@
+"""
+DAO для фоновых задач импорта CSV (import_jobs):
+- Создание задачи и выбор следующей воркером (FOR UPDATE SKIP LOCKED — без гонки между воркерами).
+- Прогресс порции — в переданной сессии, т.е. в транзакции COPY самой порции.
+- Завершение, ошибка (с повтором или окончательная), возврат задачи в очередь.
+- Задачу меняет только воркер, который её взял (claim_token): у воркера, чью брошенную задачу забрал
+  другой, прогресс порции не проходит — и порция откатывается вместе с ним.
+"""
+
+from datetime import timedelta
+from uuid import uuid4
+
+from sqlalchemy import and_, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.dao.base import BaseDAO
+from app.database import async_session_maker
+from app.importer.models import ImportJobs
+
+
+class ImportJobClaimLost(Exception):
+    """Задачу забрал другой воркер (claim брошенной задачи): этот воркер больше не вправе её менять."""
+
+
+class ImportJobDAO(BaseDAO):
+    """
+    Data Access Object для таблицы import_jobs.
+
+    Статусы: pending -> running -> done | failed; при ошибке с оставшимися попытками — снова pending.
+    """
+    model = ImportJobs
+
+    @classmethod
+    async def create(cls, table_name: str, file_path: str) -> int:
+        """
+        Ставит файл в очередь импорта.
+
+        :param table_name: целевая таблица
+        :param file_path: путь к сохранённому CSV
+        :return: id задачи
+        """
+        async with async_session_maker() as session:
+            query = insert(ImportJobs).values(table_name=table_name, file_path=file_path).returning(ImportJobs.id)
+            job_id = (await session.execute(query)).scalar_one()
+            await session.commit()
+            return job_id
+
+    @classmethod
+    async def claim(cls, stale_after: float) -> dict | None:
+        """
+        Берёт в работу самую раннюю задачу в очереди или брошенную (running без прогресса дольше stale_after).
+        Строку, которую в этот момент берёт другой воркер, запрос пропускает, а не ждёт.
+        Задаче выдаётся новая claim_token: прежний владелец брошенной задачи её больше не изменит.
+
+        :param stale_after: сек без прогресса, после которых задача running считается брошенной
+        :return: задача (dict со всеми колонками) или None, если очередь пуста
+
+        СЫРОЙ SQL:
+        UPDATE import_jobs SET status = 'running', attempts = attempts + 1, claim_token = :token, updated_at = now()
+        WHERE id = (
+            SELECT id FROM import_jobs
+            WHERE status = 'pending' OR (status = 'running' AND updated_at < now() - :stale_after)
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING *
+        """
+        next_job = (
+            select(ImportJobs.id)
+            .where(
+                or_(
+                    ImportJobs.status == "pending",
+                    and_(
+                        ImportJobs.status == "running",
+                        ImportJobs.updated_at < func.now() - timedelta(seconds=stale_after),
+                    ),
+                )
+            )
+            .order_by(ImportJobs.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        query = (
+            update(ImportJobs)
+            .where(ImportJobs.id == next_job)
+            .values(
+                status="running", attempts=ImportJobs.attempts + 1, claim_token=uuid4().hex, updated_at=func.now(),
+            )
+            .returning(*ImportJobs.__table__.columns)
+        )
+        async with async_session_maker() as session:
+            job = (await session.execute(query)).mappings().one_or_none()
+            await session.commit()
+            return job
+
+    @classmethod
+    async def progress(cls, session: AsyncSession, job: dict, rows: int, elapsed: float) -> None:
+        """
+        Учитывает закоммиченную порцию. Вызывается в транзакции порции (без коммита):
+        rows_done всегда равен числу строк файла, которые уже в БД.
+
+        :param session: сессия порции
+        :param job: задача, взятая через claim (id и claim_token)
+        :param rows: строк в порции
+        :param elapsed: сколько секунд заняла порция (чтение, разбор и загрузка)
+        :raises ImportJobClaimLost: задачу забрал другой воркер — транзакцию порции нужно откатить
+        """
+        query = (
+            update(ImportJobs)
+            .where(ImportJobs.id == job["id"], ImportJobs.claim_token == job["claim_token"])
+            .values(
+                rows_done=ImportJobs.rows_done + rows,
+                elapsed=ImportJobs.elapsed + elapsed,
+                updated_at=func.now(),
+            )
+        )
+        if (await session.execute(query)).rowcount == 0:
+            raise ImportJobClaimLost(job["id"])
+
+    @classmethod
+    async def _set(cls, job_id: int, *conditions, **values) -> dict | None:
+        """Обновляет задачу (при выполнении условий) и возвращает её новое состояние."""
+        query = (
+            update(ImportJobs)
+            .where(ImportJobs.id == job_id, *conditions)
+            .values(updated_at=func.now(), **values)
+            .returning(*ImportJobs.__table__.columns)
+        )
+        async with async_session_maker() as session:
+            job = (await session.execute(query)).mappings().one_or_none()
+            await session.commit()
+            return job
+
+    @classmethod
+    async def _set_claimed(cls, job: dict, **values) -> bool:
+        """Обновляет задачу, если она всё ещё у этого воркера, и снимает claim_token; False — её забрали."""
+        updated = await cls._set(job["id"], ImportJobs.claim_token == job["claim_token"], claim_token=None, **values)
+        return updated is not None
+
+    @classmethod
+    async def finish(cls, job: dict) -> bool:
+        """
+        Помечает задачу выполненной.
+
+        :param job: задача, взятая через claim
+        :return: False — задачу забрал другой воркер (она не изменена)
+        """
+        return await cls._set_claimed(job, status="done", error=None, finished_at=func.now())
+
+    @classmethod
+    async def fail(cls, job: dict, error: str, retry: bool) -> bool:
+        """
+        Записывает ошибку задачи.
+
+        :param job: задача, взятая через claim
+        :param error: текст ошибки
+        :param retry: вернуть задачу в очередь (продолжится с rows_done) или пометить failed
+        :return: False — задачу забрал другой воркер (она не изменена)
+        """
+        if retry:
+            return await cls._set_claimed(job, status="pending", error=error)
+        return await cls._set_claimed(job, status="failed", error=error, finished_at=func.now())
+
+    @classmethod
+    async def release(cls, job: dict) -> bool:
+        """
+        Возвращает задачу в очередь без траты попытки (воркер останавливается).
+
+        :param job: задача, взятая через claim
+        :return: False — задачу забрал другой воркер (она не изменена)
+        """
+        return await cls._set_claimed(job, status="pending", attempts=ImportJobs.attempts - 1)
+
+    @classmethod
+    async def resume(cls, job_id: int) -> dict | None:
+        """
+        Возвращает в очередь задачу, завершившуюся ошибкой: она продолжится с rows_done, попытки — заново.
+
+        :param job_id: ID задачи
+        :return: задача или None, если она не в статусе failed
+        """
+        return await cls._set(job_id, ImportJobs.status == "failed", status="pending", attempts=0, finished_at=None)
@@ -0,0 +1,126 @@
+"""
+Фоновые задачи импорта CSV (POST /import/{table_name}?mode=job).
+
+- spool_upload: загруженный файл сохраняется на диск (IMPORT_JOBS_DIR), запрос сразу получает id задачи.
+- ImportJobWorker: цикл asyncio в процессе приложения (main.lifespan) берёт задачи из таблицы import_jobs
+  и грузит файл через COPY порциями (ModelDAO.copy_batches), отмечая прогресс в транзакции каждой порции.
+- После ошибки задача продолжается с последней закоммиченной порции: rows_done строк файла пропускаются.
+  Попытки повторяются до IMPORT_JOB_MAX_ATTEMPTS, затем задача — failed (продолжить: POST .../resume).
+- Задачи хранятся в БД: при нескольких воркерах приложения каждую берёт ровно один (SKIP LOCKED),
+  а задачу упавшего воркера подхватывает другой через IMPORT_JOB_STALE_AFTER сек.
+"""
+
+import asyncio
+import os
+import shutil
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi import UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.importer.dao import ImportJobClaimLost, ImportJobDAO
+from app.importer.utils import TABLE_MODEL_MAP, read_csv_batches
+from app.logger import logger
+
+
+async def spool_upload(file: UploadFile) -> str:
+    """
+    Копирует загруженный файл в IMPORT_JOBS_DIR (в пуле потоков, не читая его в память целиком).
+
+    :param file: загруженный CSV
+    :return: путь к сохранённому файлу
+    """
+    directory = Path(settings.IMPORT_JOBS_DIR)
+    path = directory / f"{uuid4().hex}.csv"
+
+    def copy() -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as target:
+            shutil.copyfileobj(file.file, target)
+
+    try:
+        await run_in_threadpool(copy)
+    finally:
+        file.file.close()
+    return str(path)
+
+
+class ImportJobWorker:
+    """
+    Воркер фоновых задач импорта: одна задача за раз на процесс.
+    Просыпается по notify() (задача поставлена этим процессом) или раз в IMPORT_JOB_POLL_INTERVAL сек.
+    """
+    _wakeup: asyncio.Event | None = None
+
+    @classmethod
+    def notify(cls) -> None:
+        """Будит воркер этого процесса (если он запущен), не дожидаясь очередного опроса очереди."""
+        if cls._wakeup is not None:
+            cls._wakeup.set()
+
+    @classmethod
+    async def run(cls) -> None:
+        """
+        Бесконечный цикл воркера; запускается фоновой задачей в main.lifespan и отменяется при остановке.
+        После неудачной попытки выдерживает паузу опроса, чтобы не тратить попытки подряд на временный сбой.
+        """
+        cls._wakeup = asyncio.Event()
+        while True:
+            try:
+                job = await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER)
+                if job is not None and await cls.process(job):
+                    continue
+            except Exception:
+                logger.exception("Database Exc: Import job worker cannot update job queue")
+            cls._wakeup.clear()
+            try:
+                await asyncio.wait_for(cls._wakeup.wait(), settings.IMPORT_JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    @classmethod
+    async def process(cls, job: dict) -> bool:
+        """
+        Грузит файл задачи, пропуская уже загруженные rows_done строк.
+        При остановке воркера (отмена) задача возвращается в очередь и продолжится с последней порции.
+        Если задачу забрал другой воркер (этот завис дольше IMPORT_JOB_STALE_AFTER), текущая порция
+        откатывается и воркер отступает, не трогая задачу.
+
+        :param job: задача, взятая через ImportJobDAO.claim
+        :return: True — задача выполнена, False — ошибка (задача в очереди на повтор или failed) или её забрали
+        """
+        ModelDAO = TABLE_MODEL_MAP[job["table_name"]]
+        last_commit = time.monotonic()
+
+        async def on_batch(session: AsyncSession, rows: int) -> None:
+            nonlocal last_commit
+            now = time.monotonic()
+            await ImportJobDAO.progress(session, job, rows, now - last_commit)
+            last_commit = now
+
+        try:
+            with open(job["file_path"], "rb") as file:
+                batches = read_csv_batches(file, settings.IMPORT_COPY_BATCH_SIZE, ModelDAO.model)
+                async for _ in ModelDAO.copy_batches(batches, job["rows_done"], on_batch):
+                    pass
+        except asyncio.CancelledError:
+            await ImportJobDAO.release(job)
+            raise
+        except ImportJobClaimLost:
+            logger.warning("Import Exc: Import job was claimed by another worker", extra={"job_id": job["id"]})
+            return False
+        except Exception as e:
+            retry = job["attempts"] < settings.IMPORT_JOB_MAX_ATTEMPTS
+            logger.exception("Import Exc: Import job failed", extra={"job_id": job["id"], "retry": retry})
+            await ImportJobDAO.fail(job, f"{type(e).__name__}: {e}", retry)
+            return False
+
+        if not await ImportJobDAO.finish(job):
+            logger.warning("Import Exc: Import job was claimed by another worker", extra={"job_id": job["id"]})
+            return False
+        os.remove(job["file_path"])
+        return True
@@ -0,0 +1,58 @@
+"""
+Модель SQLAlchemy для фоновых задач импорта CSV (import_jobs).
+
+- Одна строка = один загруженный файл, который воркер (app/importer/jobs.py) грузит порциями через COPY.
+- rows_done обновляется в транзакции каждой порции — ровно столько строк файла уже в БД,
+  с этого места задача продолжается после ошибки или перезапуска.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ImportJobs(Base):
+    """
+    Модель таблицы 'import_jobs' (фоновые задачи импорта).
+
+    Атрибуты:
+        id: int — идентификатор задачи
+        table_name: str — целевая таблица ("hotels", "rooms", "bookings")
+        file_path: str — путь к сохранённому на диск CSV-файлу
+        status: str — pending (ждёт воркера), running, done, failed
+        rows_done: int — строк файла, уже закоммиченных в БД
+        elapsed: float — суммарное время загрузки, сек (для rows/s)
+        attempts: int — сколько раз задачу брал воркер
+        claim_token: str | None — метка воркера, взявшего задачу (claim): прогресс и завершение пишет
+            только он, воркер, у которого брошенную задачу забрали, строк уже не закоммитит
+        error: str | None — текст последней ошибки
+        created_at, updated_at: время создания и последнего изменения (прогресса) задачи
+        finished_at: время завершения (done или окончательный failed)
+    """
+    __tablename__ = "import_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(32), nullable=False)
+    file_path: Mapped[str] = mapped_column(nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, server_default="pending")
+    rows_done: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    elapsed: Mapped[float] = mapped_column(nullable=False, server_default="0")
+    attempts: Mapped[int] = mapped_column(nullable=False, server_default="0")
+    claim_token: Mapped[Optional[str]] = mapped_column(String(32))
+    error: Mapped[Optional[str]]
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+    # Воркер выбирает задачи по статусу — в таблице в основном завершённые
+    __table_args__ = (
+        Index("ix_import_jobs_status", "status"),
+    )
+
+    def __str__(self) -> str:
+        """Строковое представление задачи для отладки."""
+        return f"Импорт #{self.id} в {self.table_name}: {self.status}, строк {self.rows_done}"
@@ -0,0 +1,121 @@
+"""
+Разбор CSV для импорта по схеме таблицы (типы колонок — из моделей SQLAlchemy).
+
+- column_kinds: тип каждой колонки таблицы ("int", "date", "datetime", "json", "str").
+- parse_chunk: кусок файла (целые записи CSV) -> строки импорта; тип известен заранее, и значения
+  приводятся колонка за колонкой, а не угадываются по каждой ячейке (isdigit, "date" в имени колонки).
+- Модуль не импортирует остальное приложение: parse_chunk выполняется в процессах пула
+  (app/importer/utils.py: read_csv_batches), которым не нужны БД и настройки.
+"""
+
+import csv
+import gc
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable
+
+from sqlalchemy import JSON, Date, DateTime, Integer, Table
+
+
+def column_kinds(table: Table) -> dict[str, str]:
+    """
+    Типы колонок таблицы для разбора CSV (вычисляемые колонки не импортируются и не входят).
+
+    :param table: таблица модели (Model.__table__)
+    :return: {имя колонки: "int" | "date" | "datetime" | "json" | "str"}
+    """
+    kinds = {}
+    for column in table.columns:
+        if column.computed is not None:
+            continue
+        if isinstance(column.type, Integer):
+            kinds[column.name] = "int"
+        elif isinstance(column.type, DateTime):
+            kinds[column.name] = "datetime"
+        elif isinstance(column.type, Date):
+            kinds[column.name] = "date"
+        elif isinstance(column.type, JSON):
+            kinds[column.name] = "json"
+        else:
+            kinds[column.name] = "str"
+    return kinds
+
+
+def _parse_date(value: str) -> date:
+    """YYYY-MM-DD (date.fromisoformat — в C) с запасным разбором неканоничной записи вроде 2024-1-5."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _parse_json(value: str) -> Any:
+    """JSON-значение; список в одинарных кавычках (['Wi-Fi']) из старых выгрузок тоже принимается."""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return json.loads(value.replace("'", '"'))
+
+
+_PARSERS: dict[str, Callable[[str], Any]] = {
+    "int": int,
+    "date": _parse_date,
+    "datetime": datetime.fromisoformat,
+    "json": _parse_json,
+}
+
+
+def convert_column(name: str, kind: str, values: tuple[str, ...]) -> list[Any] | tuple[str, ...]:
+    """
+    Приводит значения одной колонки к её типу; пустая ячейка — None (у строковых колонок остаётся "").
+
+    :param name: имя колонки (для текста ошибки)
+    :param kind: тип из column_kinds
+    :param values: значения колонки по всем строкам порции
+    :return: приведённые значения
+    :raises ValueError: значение не приводится к типу колонки (в тексте — колонка и значение)
+    """
+    parse = _PARSERS.get(kind)
+    if parse is None:
+        return values
+    try:
+        return [parse(value) if value else None for value in values]
+    except ValueError:
+        bad = next(value for value in values if value and _fails(parse, value))
+        raise ValueError(f"Колонка {name}: некорректное значение {bad!r}") from None
+
+
+def _fails(parse: Callable[[str], Any], value: str) -> bool:
+    try:
+        parse(value)
+    except ValueError:
+        return True
+    return False
+
+
+def parse_chunk(chunk: bytes, header: list[str], kinds: dict[str, str]) -> list[dict]:
+    """
+    Разбирает кусок CSV (разделитель ";", без строки заголовков) и приводит колонки к типам.
+
+    :param chunk: байты целых записей CSV (UTF-8)
+    :param header: имена колонок файла
+    :param kinds: типы колонок таблицы (column_kinds); колонки файла не из таблицы остаются строками
+    :return: строки импорта (dict: колонка -> значение)
+    """
+    # Порция — сотни тысяч новых объектов разом: сборщик мусора на них запускался бы десятки раз
+    # и обходил бы их все (они живут до конца разбора) — на время разбора он не нужен
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        rows = [row for row in csv.reader(io.StringIO(chunk.decode("utf-8")), delimiter=";") if row]
+        if not rows:
+            return []
+        if any(len(row) != len(header) for row in rows):
+            bad = next(row for row in rows if len(row) != len(header))
+            raise ValueError(f"Ожидалось колонок: {len(header)}, в строке {len(bad)}: {';'.join(bad)!r}")
+        columns = [convert_column(name, kinds.get(name, "str"), values) for name, values in zip(header, zip(*rows))]
+        return [dict(zip(header, values)) for values in zip(*columns)]
+    finally:
+        if gc_enabled:
+            gc.enable()
@@ -4,18 +4,42 @@
 Позволяет залить несколько объектов за раз — удобно для тестовой инициализации и интеграции с внешними системами.
 Ожидается файл в формате CSV с разделителем ";". В случае ошибок структуры или сохранения — выдаёт кастомные исключения.
 
+Режимы (параметр mode):
+- insert — файл разбирается целиком и вставляется одной транзакцией (BaseDAO.add_bulk), ответ — id записей;
+- copy — файл читается и грузится через COPY порциями по IMPORT_COPY_BATCH_SIZE строк с коммитом каждой
+  (BaseDAO.copy_batches): память не растёт с размером файла, ответ — число загруженных строк;
+- job — файл сохраняется на диск и грузится так же, но фоновым воркером (app/importer/jobs.py):
+  ответ (202) — сразу, с id задачи; прогресс — GET /import/jobs/{job_id};
+- upsert (hotels, rooms) — повторная загрузка справочника без дублей (BaseDAO.upsert_batches): COPY во временную
+  таблицу и слияние по id или естественному ключу одной транзакцией, ответ — число добавленных,
+  изменённых и неизменных строк.
+
 Пример запроса (через curl):
     curl -F "file=@hotels.csv" "http://localhost:8000/import/hotels" -H "Authorization: Bearer <TOKEN>"
+    curl -F "file=@bookings.csv" "http://localhost:8000/import/bookings?mode=copy"
+    curl -F "file=@bookings.csv" "http://localhost:8000/import/bookings?mode=job"
+    curl "http://localhost:8000/import/jobs/1"
+    curl -F "file=@hotels.csv" "http://localhost:8000/import/hotels?mode=upsert"
 """
 
-import codecs
-import csv
 from typing import Literal
 
-from fastapi import APIRouter, UploadFile
+from fastapi import APIRouter, Query, Response, UploadFile, status
 
-from app.exceptions import CannotAddDataToDatabase, CannotProcessCSV
-from app.importer.utils import TABLE_MODEL_MAP, convert_csv_to_postgres_format
+from app.config import settings
+from app.exceptions import (
+    CannotAddDataToDatabase,
+    CannotProcessCSV,
+    CSVImportInterrupted,
+    ImportJobCannotBeResumed,
+    ImportJobNotFound,
+    UpsertNotSupported,
+)
+from app.importer.dao import ImportJobDAO
+from app.importer.jobs import ImportJobWorker, spool_upload
+from app.importer.schemas import SImportJob
+from app.importer.utils import TABLE_MODEL_MAP, read_csv_batches
+from app.logger import logger
 
 router = APIRouter(
     prefix="/import",
@@ -30,13 +54,26 @@ router = APIRouter(
 async def import_data_to_table(
     file: UploadFile,
     table_name: Literal["hotels", "rooms", "bookings"],
+    response: Response,
+    mode: Literal["insert", "copy", "job", "upsert"] = Query(
+        "insert",
+        description=(
+            "insert — одной транзакцией, copy — потоково через COPY, job — фоновой задачей, "
+            "upsert — слияние справочника по id или естественному ключу"
+        ),
+    ),
 ) -> dict:
     """
     Массовый импорт данных в одну из таблиц (hotels, rooms, bookings) через CSV-файл.
 
     :param file: Файл в формате CSV, обязательно с разделителем ';'. Первая строка — заголовки столбцов.
     :param table_name: Название целевой таблицы ("hotels", "rooms" или "bookings")
-    :return: dict с ключами "result" (список добавленных объектов) и "error" (если была ошибка)
+    :param response: ответ (в режиме job — статус 202)
+    :param mode: "insert", "copy" (потоковая загрузка больших файлов), "job" (то же в фоне)
+        или "upsert" (повторная загрузка справочника hotels/rooms без дублей)
+    :return: dict с ключами "result" (id добавленных записей; в режиме copy — {"rows": число строк},
+        в режиме job — {"job_id": id задачи}, в режиме upsert — {"inserted", "updated", "unchanged",
+        "duplicates"}) и "error" (если была ошибка)
 
     Формат CSV (пример для hotels):
         name;location;services;rooms_quantity;image_id
@@ -45,15 +82,89 @@ async def import_data_to_table(
     Ошибки:
         - Если файл не распознан или пуст — CannotProcessCSV (422)
         - Если не удалось добавить данные — CannotAddDataToDatabase (500)
+        - Если потоковый импорт прерван — CSVImportInterrupted (500, в detail — сколько строк уже загружено)
+        - Если upsert запрошен для bookings — UpsertNotSupported (400); при ошибке upsert не загружается ничего
     """
     ModelDAO = TABLE_MODEL_MAP[table_name]
-    # Чтение CSV с разделителем ";"
-    csvReader = csv.DictReader(codecs.iterdecode(file.file, 'utf-8'), delimiter=";")
-    data = convert_csv_to_postgres_format(csvReader)
-    file.file.close()
+    if mode == "job":
+        job_id = await ImportJobDAO.create(table_name, await spool_upload(file))
+        ImportJobWorker.notify()
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"result": {"job_id": job_id}, "error": ""}
+    if mode == "upsert":
+        if ModelDAO.natural_key is None:
+            raise UpsertNotSupported
+        try:
+            counts = await ModelDAO.upsert_batches(read_csv_batches(file.file, settings.IMPORT_COPY_BATCH_SIZE, ModelDAO.model))
+        except Exception:
+            logger.exception("Import Exc: Upsert import failed", extra={"table": table_name})
+            raise CannotAddDataToDatabase
+        finally:
+            file.file.close()
+        if not any(counts.values()):
+            raise CannotProcessCSV
+        return {"result": counts, "error": ""}
+    if mode == "copy":
+        rows = 0
+        try:
+            async for count in ModelDAO.copy_batches(read_csv_batches(file.file, settings.IMPORT_COPY_BATCH_SIZE, ModelDAO.model)):
+                rows += count
+        except Exception:
+            logger.exception("Import Exc: COPY import interrupted", extra={"table": table_name, "rows": rows})
+            raise CSVImportInterrupted(rows)
+        finally:
+            file.file.close()
+        if not rows:
+            raise CannotProcessCSV
+        return {"result": {"rows": rows}, "error": ""}
+
+    # Чтение CSV с разделителем ";" и приведение значений по типам колонок модели
+    try:
+        batches = read_csv_batches(file.file, settings.IMPORT_COPY_BATCH_SIZE, ModelDAO.model)
+        data = [row async for rows in batches for row in rows]
+    except ValueError:
+        logger.exception("Import Exc: Cannot convert CSV into DB format", extra={"table": table_name})
+        raise CannotProcessCSV
+    finally:
+        file.file.close()
     if not data:
         raise CannotProcessCSV
     added_data = await ModelDAO.add_bulk(data)
     if not added_data:
         raise CannotAddDataToDatabase
     return {"result": added_data, "error": ""}
+
+
+@router.get("/jobs/{job_id}")
+async def get_import_job(job_id: int) -> SImportJob:
+    """
+    Состояние фоновой задачи импорта: статус, сколько строк загружено, скорость (rows/s), ошибка.
+
+    :param job_id: ID задачи (из ответа POST /import/{table_name}?mode=job)
+    :return: SImportJob
+    :raises ImportJobNotFound: задачи нет (404)
+    """
+    job = await ImportJobDAO.find_by_id(job_id, primary=True)
+    if job is None:
+        raise ImportJobNotFound
+    return job
+
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_import_job(job_id: int) -> SImportJob:
+    """
+    Возвращает в очередь задачу, завершившуюся ошибкой (исчерпаны попытки):
+    она продолжится с последней загруженной порции.
+
+    :param job_id: ID задачи
+    :return: SImportJob (статус pending)
+    :raises ImportJobNotFound: задачи нет (404)
+    :raises ImportJobCannotBeResumed: задача не в статусе failed (409)
+    """
+    job = await ImportJobDAO.resume(job_id)
+    if job is None:
+        if await ImportJobDAO.find_by_id(job_id, primary=True) is None:
+            raise ImportJobNotFound
+        raise ImportJobCannotBeResumed
+    ImportJobWorker.notify()
+    return job
@@ -0,0 +1,43 @@
+"""
+Pydantic-схемы фоновых задач импорта CSV.
+
+- SImportJob: состояние задачи для GET /import/jobs/{job_id} (прогресс, скорость, ошибка)
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict, computed_field
+
+
+class SImportJob(BaseModel):
+    """
+    Состояние задачи импорта.
+
+    Атрибуты:
+        id: int — идентификатор задачи
+        table_name: str — целевая таблица
+        status: str — pending, running, done или failed
+        rows_done: int — строк файла, уже загруженных в БД
+        elapsed: float — суммарное время загрузки, сек
+        rows_per_sec: float — средняя скорость загрузки (вычисляется)
+        attempts: int — сколько раз задачу брал воркер
+        error: str | None — последняя ошибка (у pending — ошибка прошлой попытки)
+        created_at, finished_at: время постановки в очередь и завершения
+    """
+    id: int
+    table_name: str
+    status: str
+    rows_done: int
+    elapsed: float
+    attempts: int
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def rows_per_sec(self) -> float:
+        return round(self.rows_done / self.elapsed, 1) if self.elapsed else 0.0
@@ -2,22 +2,32 @@
 Утилиты для импорта данных из CSV в БД.
 
 - TABLE_MODEL_MAP: маппинг названия таблицы (hotels, rooms, bookings) на соответствующий DAO-класс.
-- convert_csv_to_postgres_format: функция преобразования строк из CSV к формату, пригодному для записи в БД.
+- read_csv_batches: потоковое чтение CSV порциями с приведением значений по типам колонок модели
+  (app/importer/parsing.py); большие файлы разбираются в пуле процессов.
 """
 
-from datetime import datetime
-import json
-from typing import Iterable
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import io
+from itertools import islice
+from multiprocessing import get_context
+from typing import AsyncIterator, BinaryIO
+
+from starlette.concurrency import run_in_threadpool
 
 from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.database import Base
 from app.hotels.dao import HotelDAO
 from app.hotels.rooms.dao import RoomDAO
-from app.logger import logger
+from app.importer.parsing import column_kinds, parse_chunk
 
 # Пример использования:
 #   ModelDAO = TABLE_MODEL_MAP["hotels"]
-#   data = convert_csv_to_postgres_format(csv.DictReader(...))
-#   ModelDAO.add_bulk(data)
+#   async for rows in read_csv_batches(file, 1000, ModelDAO.model):
+#       await ModelDAO.add_bulk(rows)
 
 TABLE_MODEL_MAP = {
     "hotels": HotelDAO,
@@ -25,51 +35,96 @@ TABLE_MODEL_MAP = {
     "bookings": BookingDAO,
 }
 
-def convert_csv_to_postgres_format(csv_iterable: Iterable) -> list[dict]:
+_parse_pool: ProcessPoolExecutor | None = None
+
+
+def _read_chunk(file: BinaryIO, batch_size: int) -> bytes:
     """
-    Преобразует строки из CSV в формат, пригодный для PostgreSQL и ORM-DAO.
-
-    Ожидаемый формат CSV:
-        - Числовые поля (id, quantity, price, image_id и др.) хранятся как строки, преобразуются в int.
-        - Поле services (строка) содержит JSON-список услуг, например: ["Wi-Fi", "Парковка"]
-        - Поля с 'date' преобразуются к datetime (YYYY-MM-DD)
-        - Пустые значения остаются пустыми.
-
-    :param csv_iterable: iterable (например, csv.DictReader), где каждая строка — dict с полями CSV.
-    :return: список dict, пригодных для записи в БД.
-    :raises: В случае ошибки возвращает пустой список и логгирует ошибку.
-
-    Пример строки на входе:
-        {
-            "name": "Sample Hotel",
-            "location": "Москва",
-            "services": "[\"Wi-Fi\", \"Парковка\"]",
-            "rooms_quantity": "10",
-            "image_id": "1"
-        }
+    Читает до batch_size строк файла, заканчивая на границе записи CSV: перевод строки внутри
+    кавычек продолжает запись (кавычки в CSV экранируются удвоением, поэтому их число в целых записях чётно).
+
+    :return: байты целых записей (пусто — конец файла)
+    """
+    chunk = b"".join(islice(file, batch_size))
+    quotes = chunk.count(b'"')
+    while quotes % 2 and (line := file.readline()):
+        chunk += line
+        quotes += line.count(b'"')
+    return chunk
+
+
+def _remaining_bytes(file: BinaryIO) -> int:
+    """Сколько байт файла ещё не прочитано (позиция в файле не меняется)."""
+    position = file.tell()
+    size = file.seek(0, io.SEEK_END)
+    file.seek(position)
+    return size - position
+
+
+def get_parse_pool() -> ProcessPoolExecutor | None:
+    """
+    Пул процессов разбора CSV (создаётся при первом большом импорте, закрывается в main.lifespan).
+    Процессы запускаются через spawn: fork процесса приложения с потоками и соединениями небезопасен.
+
+    :return: пул или None, если IMPORT_PARSE_PROCESSES = 0
     """
+    global _parse_pool
+    if settings.IMPORT_PARSE_PROCESSES <= 0:
+        return None
+    if _parse_pool is None:
+        _parse_pool = ProcessPoolExecutor(settings.IMPORT_PARSE_PROCESSES, mp_context=get_context("spawn"))
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Останавливает пул процессов разбора CSV, если он создавался."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(cancel_futures=True)
+        _parse_pool = None
+
+
+async def read_csv_batches(file: BinaryIO, batch_size: int, model: type[Base]) -> AsyncIterator[list[dict]]:
+    """
+    Читает CSV (разделитель ";", первая строка — заголовки) порциями по batch_size строк и приводит
+    значения к типам колонок модели (app/importer/parsing.py). В памяти — только порции в обработке.
+
+    Файл больше IMPORT_PARSE_PROCESS_MIN_BYTES разбирается в пуле процессов: несколько порций сразу,
+    пока вызывающий код загружает предыдущие (порядок порций сохраняется), без GIL процесса приложения.
+    Меньшие файлы — в пуле потоков (запуск процессов и передача строк между ними дороже самого разбора).
+
+    :param file: бинарный файл (UploadFile.file или открытый файл задачи импорта)
+    :param batch_size: строк в порции
+    :param model: модель SQLAlchemy целевой таблицы
+    :return: асинхронный итератор порций (list[dict]: колонка -> значение)
+    :raises ValueError: значение не приводится к типу колонки или в строке не то число колонок
+    """
+    header_line = await run_in_threadpool(file.readline)
+    header = next(csv.reader([header_line.decode("utf-8")], delimiter=";"), [])
+    if not header:
+        return
+    kinds = column_kinds(model.__table__)
+
+    pool = get_parse_pool() if _remaining_bytes(file) > settings.IMPORT_PARSE_PROCESS_MIN_BYTES else None
+    if pool is None:
+        while chunk := await run_in_threadpool(_read_chunk, file, batch_size):
+            yield await run_in_threadpool(parse_chunk, chunk, header, kinds)
+        return
+
+    loop = asyncio.get_running_loop()
+    pending: deque[asyncio.Future] = deque()
+    exhausted = False
     try:
-        data = []
-        for row in csv_iterable:
-            for k, v in row.items():
-                if v is None or v == "":
-                    continue
-                if v.isdigit():
-                    row[k] = int(v)
-                elif k == "services":
-                    try:
-                        row[k] = json.loads(v.replace("'", '"'))
-                    except Exception:
-                        logger.error(f"Не удалось декодировать поле services: {v!r}")
-                        row[k] = []
-                elif "date" in k:
-                    try:
-                        row[k] = datetime.strptime(v, "%Y-%m-%d")
-                    except Exception:
-                        logger.error(f"Некорректная дата: {k}={v!r}")
-                        row[k] = None
-            data.append(row)
-        return data
-    except Exception:
-        logger.error("Cannot convert CSV into DB format", exc_info=True)
-        return []
+        while True:
+            while not exhausted and len(pending) <= settings.IMPORT_PARSE_PROCESSES:
+                chunk = await run_in_threadpool(_read_chunk, file, batch_size)
+                if chunk:
+                    pending.append(loop.run_in_executor(pool, parse_chunk, chunk, header, kinds))
+                else:
+                    exhausted = True
+            if not pending:
+                return
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,220 @@
+"""
+DAO для посуточного реестра занятости номеров (room_inventory_daily):
+- Построение CTE booked_rooms по реестру (читаются только запрошенные ночи).
+- Учёт новой брони и снятие брони — в переданной сессии, т.е. в транзакции самой брони.
+- Пересборка реестра (целиком, по комнате и/или по периоду) по таблице bookings.
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import CTE, Date, Delete, delete, func, literal_column, select, update
+from sqlalchemy.dialects.postgresql import Insert, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bookings.models import Bookings
+from app.dao.base import BaseDAO
+from app.inventory.models import RoomInventoryDaily
+
+
+class InventoryDAO(BaseDAO):
+    """
+    Data Access Object для таблицы room_inventory_daily.
+
+    Методы book/release не открывают собственных сессий и не коммитят:
+    они вызываются из BookingDAO внутри его транзакции.
+    """
+    model = RoomInventoryDaily
+
+    @staticmethod
+    def nights(date_from: date, date_to: date) -> list[date]:
+        """
+        Возвращает список ночей брони: date_from <= day < date_to.
+
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        :return: список дат (пустой, если date_to <= date_from)
+        """
+        return [date_from + timedelta(days=i) for i in range((date_to - date_from).days)]
+
+    @classmethod
+    def booked_rooms_cte(cls, date_from: date, date_to: date, room_id: int | None = None) -> CTE:
+        """
+        CTE booked_rooms: максимальная занятость каждой комнаты за ночи периода.
+
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        :param room_id: ID комнаты — ограничить CTE одной комнатой (для бронирования)
+        :return: CTE с колонками room_id, rooms_booked
+
+        СЫРОЙ SQL:
+        WITH booked_rooms AS (
+            SELECT room_id, MAX(booked_count) AS rooms_booked
+            FROM room_inventory_daily
+            WHERE day >= :date_from AND day < :date_to
+            GROUP BY room_id
+        )
+        """
+        query = (
+            select(
+                RoomInventoryDaily.room_id,
+                func.max(RoomInventoryDaily.booked_count).label("rooms_booked"),
+            )
+            .where(
+                RoomInventoryDaily.day >= date_from,
+                RoomInventoryDaily.day < date_to,
+            )
+            .group_by(RoomInventoryDaily.room_id)
+        )
+        if room_id is not None:
+            query = query.where(RoomInventoryDaily.room_id == room_id)
+        return query.cte("booked_rooms")
+
+    @classmethod
+    async def book(cls, session: AsyncSession, room_id: int, date_from: date, date_to: date) -> None:
+        """
+        Увеличивает booked_count на 1 для каждой ночи брони (UPSERT).
+
+        :param session: сессия, в транзакции которой создаётся бронь
+        :param room_id: ID комнаты
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        """
+        nights = cls.nights(date_from, date_to)
+        if not nights:
+            return
+        query = insert(RoomInventoryDaily).values(
+            [{"room_id": room_id, "day": day, "booked_count": 1} for day in nights]
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[RoomInventoryDaily.room_id, RoomInventoryDaily.day],
+            set_={"booked_count": RoomInventoryDaily.booked_count + query.excluded.booked_count},
+        )
+        await session.execute(query)
+
+    @classmethod
+    def book_cte(cls, new_booking: CTE) -> CTE:
+        """
+        DML-CTE: занимает ночи брони, вставленной в том же запросе (CTE new_booking).
+        Позволяет создать бронь и обновить реестр одним SQL-запросом.
+
+        :param new_booking: CTE с колонками room_id, date_from, date_to (INSERT ... RETURNING)
+        :return: CTE ledger, который нужно подключить к итоговому запросу через add_cte()
+
+        СЫРОЙ SQL:
+        ledger AS (
+            INSERT INTO room_inventory_daily (room_id, day, booked_count)
+            SELECT room_id, generate_series(date_from, date_to - 1, interval '1 day')::date, 1
+            FROM new_booking
+            ON CONFLICT (room_id, day) DO UPDATE
+                SET booked_count = room_inventory_daily.booked_count + excluded.booked_count
+        )
+        """
+        nights = func.generate_series(
+            new_booking.c.date_from,
+            new_booking.c.date_to - 1,
+            literal_column("interval '1 day'"),
+        )
+        query = insert(RoomInventoryDaily).from_select(
+            ["room_id", "day", "booked_count"],
+            select(new_booking.c.room_id, nights.cast(Date), literal_column("1")),
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[RoomInventoryDaily.room_id, RoomInventoryDaily.day],
+            set_={"booked_count": RoomInventoryDaily.booked_count + query.excluded.booked_count},
+        )
+        return query.cte("ledger")
+
+    @classmethod
+    async def release(cls, session: AsyncSession, room_id: int, date_from: date, date_to: date) -> None:
+        """
+        Уменьшает booked_count на 1 для каждой ночи удалённой брони.
+
+        :param session: сессия, в транзакции которой удаляется бронь
+        :param room_id: ID комнаты
+        :param date_from: дата заезда
+        :param date_to: дата выезда
+        """
+        query = (
+            update(RoomInventoryDaily)
+            .where(
+                RoomInventoryDaily.room_id == room_id,
+                RoomInventoryDaily.day >= date_from,
+                RoomInventoryDaily.day < date_to,
+            )
+            .values(booked_count=RoomInventoryDaily.booked_count - 1)
+        )
+        await session.execute(query)
+
+    @classmethod
+    async def rebuild(
+        cls,
+        session: AsyncSession,
+        room_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> None:
+        """
+        Пересобирает реестр по таблице bookings (та же логика, что в миграции).
+        Используется после записи броней в обход BookingDAO (тестовые фикстуры, админка).
+
+        Если задан период [date_from, date_to) — пересобираются только его ночи:
+        брони отбираются по пересечению stay && daterange(date_from, date_to)
+        (GiST-индекс ix_bookings_room_id_stay), т.е. без чтения всей истории комнаты.
+
+        :param session: сессия (коммит — на стороне вызывающего кода)
+        :param room_id: ID комнаты; если не указан — по всем комнатам
+        :param date_from: начало периода (включительно); если не указан — весь реестр
+        :param date_to: конец периода (не включительно)
+
+        СЫРОЙ SQL (для комнаты и периода):
+        DELETE FROM room_inventory_daily
+        WHERE room_id = :room_id AND day >= :date_from AND day < :date_to;
+
+        INSERT INTO room_inventory_daily (room_id, day, booked_count)
+        SELECT stays.room_id, stays.day, COUNT(*)
+        FROM (
+            SELECT room_id, generate_series(
+                GREATEST(date_from, :date_from), LEAST(date_to, :date_to) - 1, interval '1 day'
+            )::date AS day
+            FROM bookings
+            WHERE room_id = :room_id AND stay && daterange(:date_from, :date_to)
+        ) AS stays
+        GROUP BY stays.room_id, stays.day
+        """
+        clear, fill = cls.rebuild_queries(room_id, date_from, date_to)
+        await session.execute(clear)
+        await session.execute(fill)
+
+    @classmethod
+    def rebuild_queries(
+        cls,
+        room_id: int | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> tuple[Delete, Insert]:
+        """
+        Строит запросы пересборки реестра (см. rebuild): очистка ночей и их заполнение по bookings.
+
+        :return: (DELETE по реестру, INSERT ... SELECT по bookings)
+        """
+        clear = delete(RoomInventoryDaily)
+        stays = select(Bookings.room_id)
+        first_night, last_night = Bookings.date_from, Bookings.date_to - 1
+
+        if room_id is not None:
+            clear = clear.where(RoomInventoryDaily.room_id == room_id)
+            stays = stays.where(Bookings.room_id == room_id)
+        if date_from is not None and date_to is not None:
+            clear = clear.where(RoomInventoryDaily.day >= date_from, RoomInventoryDaily.day < date_to)
+            stays = stays.where(Bookings.stay.op("&&")(func.daterange(date_from, date_to)))
+            # Ночи брони обрезаются по границам периода
+            first_night = func.greatest(Bookings.date_from, date_from)
+            last_night = func.least(Bookings.date_to, date_to) - 1
+
+        nights = func.generate_series(first_night, last_night, literal_column("interval '1 day'"))
+        stays = stays.add_columns(nights.cast(Date).label("day")).subquery("stays")
+        fill = insert(RoomInventoryDaily).from_select(
+            ["room_id", "day", "booked_count"],
+            select(stays.c.room_id, stays.c.day, func.count()).group_by(stays.c.room_id, stays.c.day),
+        )
+        return clear, fill
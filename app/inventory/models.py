@@ -0,0 +1,42 @@
+"""
+Модель SQLAlchemy для посуточного учёта занятости номеров (room_inventory_daily).
+
+- Одна строка = одна комната (тип номера) на одну ночь.
+- booked_count — сколько номеров этого типа занято в эту ночь.
+- Таблица поддерживается BookingDAO.add/delete в той же транзакции, что и сама бронь,
+  поэтому проверка доступности читает только запрошенные дни, а не всю историю bookings.
+"""
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RoomInventoryDaily(Base):
+    """
+    Модель таблицы 'room_inventory_daily' (посуточный реестр занятости).
+
+    Атрибуты:
+        room_id: int — внешний ключ на комнату (часть составного PK)
+        day: date — ночь проживания (часть составного PK)
+        booked_count: int — количество занятых номеров на эту ночь
+
+    Ночь day занята бронью, если date_from <= day < date_to (день выезда не занимает номер).
+    """
+    __tablename__ = "room_inventory_daily"
+
+    room_id: Mapped[int] = mapped_column(ForeignKey("rooms.id"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    booked_count: Mapped[int] = mapped_column(nullable=False, server_default="0")
+
+    # Поиск по отелям читает диапазон дней сразу по всем комнатам — нужен индекс, начинающийся с day
+    __table_args__ = (
+        Index("ix_room_inventory_daily_day_room_id", "day", "room_id"),
+    )
+
+    def __str__(self) -> str:
+        """Строковое представление записи реестра для отладки."""
+        return f"Номер #{self.room_id} на {self.day}: занято {self.booked_count}"
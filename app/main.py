@@ -5,6 +5,7 @@
 - Определяет стартовый редирект и базовую инициализацию.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 import time
 
@@ -24,12 +25,16 @@ from sqladmin import Admin
 from app.admin.auth import authentication_backend
 from app.admin.views import BookingsAdmin, HotelsAdmin, RoomsAdmin, UsersAdmin
 from app.bookings.router import router as router_bookings
+from app.cache.catalog import CatalogCache
+from app.cache.client import init_cache_redis
 from app.config import settings
-from app.database import engine
+from app.database import engine, pool_config, request_scope
 from app.hotels.rooms.router import router as router_rooms
 from app.hotels.router import router as router_hotels
 from app.images.router import router as router_images
+from app.importer.jobs import ImportJobWorker
 from app.importer.router import router as router_import
+from app.importer.utils import shutdown_parse_pool
 from app.logger import logger
 from app.pages.router import router as router_pages
 from app.pages.auth_router import router as router_auth
@@ -37,11 +42,44 @@ from app.pages.booking_router import router as router_booking
 from app.pages.hotel_detail_router import router as router_hotel_detail
 from app.pages.profile_router import router as router_profile
 from app.prometheus.router import router as router_prometheus
+from app.responses import ORJSONResponse
+from app.users.auth import shutdown_hash_executor
 from app.users.router import router as router_users
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Инициализация Redis-кеша при старте приложения
+    (fastapi-cache, кеш доступности с инвалидацией по броням и кеш справочных данных).
+    Фоновая задача слушает канал инвалидации справочных данных и чистит память воркера.
+    В лог пишутся действующие параметры пула соединений БД.
+    Если включён IMPORT_JOB_WORKER — запускается воркер фоновых задач импорта CSV.
+    При остановке закрываются пул процессов разбора CSV (если импорт его запускал) и пул потоков bcrypt.
+    """
+    logger.info("Database pool", extra=pool_config())
+    redis = aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
+        encoding="utf8",
+        decode_responses=True,
+    )
+    FastAPICache.init(RedisBackend(redis), prefix="cache")
+    init_cache_redis(redis)
+    catalog_listener = asyncio.create_task(CatalogCache.listen(redis))
+    import_worker = asyncio.create_task(ImportJobWorker.run()) if settings.IMPORT_JOB_WORKER else None
+    yield
+    catalog_listener.cancel()
+    if import_worker is not None:
+        # Задача, которую грузил воркер, возвращается в очередь (ImportJobWorker.process)
+        import_worker.cancel()
+        await asyncio.gather(import_worker, return_exceptions=True)
+    shutdown_parse_pool()
+    shutdown_hash_executor()
+
 app = FastAPI(
     title="Бронирование Отелей",
     root_path="/api",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # orjson вместо json.dumps (app/responses.py)
 )
 
 def include_routers(app: FastAPI) -> None:
@@ -77,19 +115,6 @@ app.add_middleware(
                    "Access-Control-Allow-Origin", "Authorization"],
 )
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Инициализация Redis-кеша при старте приложения.
-    """
-    redis = aioredis.from_url(
-        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
-        encoding="utf8",
-        decode_responses=True,
-    )
-    FastAPICache.init(RedisBackend(redis), prefix="cache")
-    yield
-
 instrumentator = Instrumentator(
     should_group_status_codes=False,
     excluded_handlers=[
@@ -127,6 +152,26 @@ async def add_process_time_header(request: Request, call_next):
     })
     return response
 
+@app.middleware("http")
+async def db_request_scope(request: Request, call_next):
+    """
+    Одна сессия чтения БД на запрос: зависимости и DAO (BaseDAO и наследники) читают
+    через неё, а не открывают по сессии на вызов (app/database.py: request_scope).
+    """
+    async with request_scope():
+        return await call_next(request)
+
+@app.middleware("http")
+async def add_etag_header(request: Request, call_next):
+    """
+    Ставит ETag, посчитанный зависимостью условного GET (app/cache/versions.py), в успешный ответ.
+    """
+    response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+    return response
+
 @app.get("/")
 def root_redirect() -> RedirectResponse:
     """
@@ -12,6 +12,8 @@ from app.config import settings
 from app.database import Base
 from app.hotels.models import Hotels
 from app.hotels.rooms.models import Rooms
+from app.importer.models import ImportJobs
+from app.inventory.models import RoomInventoryDaily
 from app.users.models import Users
 
 # this is the Alembic Config object, which provides
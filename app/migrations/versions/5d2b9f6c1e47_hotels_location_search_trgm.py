@@ -0,0 +1,35 @@
+"""Hotels normalized location_search with trigram index
+
+Revision ID: 5d2b9f6c1e47
+Revises: c41f7d2a8e53
+Create Date: 2025-06-16 10:05:52.418733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2b9f6c1e47'
+down_revision: Union[str, None] = 'c41f7d2a8e53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # pg_trgm: триграммные операторы и класс операторов gin_trgm_ops
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('hotels', sa.Column(
+        'location_search', sa.String(), sa.Computed("btrim(replace(lower(location), 'ё', 'е'))", ), nullable=True,
+    ))
+    op.create_index(
+        'ix_hotels_location_search_trgm', 'hotels', ['location_search'], unique=False,
+        postgresql_using='gin', postgresql_ops={'location_search': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_hotels_location_search_trgm', table_name='hotels', postgresql_using='gin')
+    op.drop_column('hotels', 'location_search')
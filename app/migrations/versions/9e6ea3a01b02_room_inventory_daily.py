@@ -0,0 +1,45 @@
+"""Room inventory daily ledger
+
+Revision ID: 9e6ea3a01b02
+Revises: bb910a50ece3
+Create Date: 2025-06-02 19:14:08.512044
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e6ea3a01b02'
+down_revision: Union[str, None] = 'bb910a50ece3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('room_inventory_daily',
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('booked_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ),
+    sa.PrimaryKeyConstraint('room_id', 'day')
+    )
+    op.create_index('ix_room_inventory_daily_day_room_id', 'room_inventory_daily', ['day', 'room_id'], unique=False)
+
+    # Backfill: раскладываем существующие брони по ночам (date_from <= day < date_to)
+    op.execute(
+        """
+        INSERT INTO room_inventory_daily (room_id, day, booked_count)
+        SELECT b.room_id, d::date, COUNT(*)
+        FROM bookings b
+        CROSS JOIN LATERAL generate_series(b.date_from, b.date_to - 1, interval '1 day') AS d
+        GROUP BY b.room_id, d::date
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_room_inventory_daily_day_room_id', table_name='room_inventory_daily')
+    op.drop_table('room_inventory_daily')
@@ -0,0 +1,26 @@
+"""Import job claim token
+
+Revision ID: a6e1d4b7c205
+Revises: 3f8c2a6d9b14
+Create Date: 2025-07-21 09:14:03.218455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6e1d4b7c205'
+down_revision: Union[str, None] = '3f8c2a6d9b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('import_jobs', sa.Column('claim_token', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'claim_token')
@@ -0,0 +1,33 @@
+"""Bookings stay daterange with GiST index
+
+Revision ID: c41f7d2a8e53
+Revises: 9e6ea3a01b02
+Create Date: 2025-06-09 12:41:27.903518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41f7d2a8e53'
+down_revision: Union[str, None] = '9e6ea3a01b02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gist нужен, чтобы включить целочисленный room_id в GiST-индекс вместе с daterange
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column('bookings', sa.Column(
+        'stay', postgresql.DATERANGE(), sa.Computed('daterange(date_from, date_to)', ), nullable=True,
+    ))
+    op.create_index('ix_bookings_room_id_stay', 'bookings', ['room_id', 'stay'], unique=False, postgresql_using='gist')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_room_id_stay', table_name='bookings', postgresql_using='gist')
+    op.drop_column('bookings', 'stay')
@@ -0,0 +1,47 @@
+"""Services columns to JSONB with GIN indexes
+
+Revision ID: e7a3c9051b6d
+Revises: 5d2b9f6c1e47
+Create Date: 2025-06-23 17:22:40.116958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9051b6d'
+down_revision: Union[str, None] = '5d2b9f6c1e47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    for table in ('hotels', 'rooms'):
+        op.alter_column(
+            table, 'services',
+            type_=postgresql.JSONB(), existing_type=sa.JSON(),
+            postgresql_using='services::jsonb',
+        )
+    op.create_index(
+        'ix_hotels_services_gin', 'hotels', ['services'], unique=False,
+        postgresql_using='gin', postgresql_ops={'services': 'jsonb_path_ops'},
+    )
+    op.create_index(
+        'ix_rooms_services_gin', 'rooms', ['services'], unique=False,
+        postgresql_using='gin', postgresql_ops={'services': 'jsonb_path_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rooms_services_gin', table_name='rooms', postgresql_using='gin')
+    op.drop_index('ix_hotels_services_gin', table_name='hotels', postgresql_using='gin')
+    for table in ('hotels', 'rooms'):
+        op.alter_column(
+            table, 'services',
+            type_=sa.JSON(), existing_type=postgresql.JSONB(),
+            postgresql_using='services::json',
+        )
@@ -87,7 +87,7 @@ async def register_process(
     :param password: пароль из формы
     :return: RedirectResponse или register.html с ошибкой
     """
-    existing_user = await UsersDAO.find_one_or_none(email=email)
+    existing_user = await UsersDAO.find_one_or_none(primary=True, email=email)
     if existing_user:
         return templates.TemplateResponse("register.html", {
             "request": request,
@@ -95,7 +95,7 @@ async def register_process(
             "user": None,
         })
 
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash(password)
     await UsersDAO.add(email=email, hashed_password=hashed_password)
 
     response = RedirectResponse(url="/pages/login", status_code=status.HTTP_302_FOUND)
@@ -10,6 +10,7 @@ from datetime import date, timedelta
 from fastapi import APIRouter, Request, Form, Depends, Query, status
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.users.dependencies import get_current_user
 from app.bookings.dao import BookingDAO
@@ -102,12 +103,23 @@ async def booking_submit(
             "error": "Дата выезда должна быть позже даты заезда хотя бы на 1 день."
         })
 
-    booking = await BookingDAO.add(
-        user_id=user.id,
-        room_id=room_id,
-        date_from=date_from,
-        date_to=date_to,
-    )
+    try:
+        booking = await BookingDAO.add(
+            user_id=user.id,
+            room_id=room_id,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    except SQLAlchemyError:
+        # Ошибка уже в логе (BookingDAO.add); "нет мест" здесь было бы неправдой
+        return templates.TemplateResponse("booking.html", {
+            "request": request,
+            "user": user,
+            "room_id": room_id,
+            "date_from": date_from,
+            "date_to": date_to,
+            "error": "Не удалось забронировать номер, повторите попытку.",
+        })
 
     if not booking:
         return templates.TemplateResponse("booking.html", {
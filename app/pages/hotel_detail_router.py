@@ -1,6 +1,9 @@
 """
 Роутер страницы "Детали отеля" для фронта.
 - Отдаёт шаблон hotel_detail.html с информацией об отеле и всех его номерах на выбранные даты.
+- Добавляет тепловую карту свободных номеров по дням (календарь считается одним запросом),
+  чтобы даты можно было выбрать без перезагрузки страницы под каждый вариант.
+- Карточка отеля читается из двухуровневого кеша (память воркера -> Redis), без запроса к БД.
 - Валидирует даты, возвращает 400 (Bad Request) при ошибке.
 """
 
@@ -11,6 +14,7 @@ from fastapi.templating import Jinja2Templates
 
 from app.hotels.dao import HotelDAO
 from app.hotels.rooms.dao import RoomDAO
+from app.hotels.rooms.router import CALENDAR_DEFAULT_DAYS
 from app.users.dependencies import get_optional_user
 
 router = APIRouter(
@@ -32,7 +36,8 @@ async def hotel_detail(
     """
     Детальная страница отеля (GET /pages/hotels/{hotel_id}):
     - Показывает карточку отеля, список всех комнат и их доступность на выбранные даты.
-    - В шаблон передаются: hotel, rooms, user, date_from, date_to.
+    - В шаблон передаются: hotel, rooms, user, date_from, date_to,
+      calendar_days (дни тепловой карты) и calendar ({room_id: [свободно по дням]}).
     :param request: FastAPI Request
     :param hotel_id: id отеля
     :param date_from: дата заезда
@@ -63,8 +68,10 @@ async def hotel_detail(
             detail="Дата выезда должна быть позже даты заезда хотя бы на 1 день"
         )
 
-    hotel = await HotelDAO.find_one_or_none(id=hotel_id)
+    hotel = await HotelDAO.find_by_id_cached(hotel_id)
     rooms = await RoomDAO.find_all(hotel_id, date_from, date_to)
+    calendar = await RoomDAO.find_calendar(hotel_id, today, CALENDAR_DEFAULT_DAYS)
+    calendar_days = [today + timedelta(days=i) for i in range(CALENDAR_DEFAULT_DAYS)]
 
     # Если hotel == None, шаблон hotel_detail.html должен корректно отработать этот случай
     return templates.TemplateResponse("hotel_detail.html", {
@@ -72,6 +79,8 @@ async def hotel_detail(
         "user": user,
         "hotel": hotel,
         "rooms": rooms,
+        "calendar": {room["room_id"]: room["free"] for room in calendar},
+        "calendar_days": calendar_days,
         "date_from": date_from,
         "date_to": date_to,
     })
@@ -32,7 +32,7 @@ async def profile_page(
       - bookings: список бронирований пользователя (может быть пустым)
     Если бронирований нет, bookings=[].
     """
-    bookings = await BookingDAO.find_all(user_id=user.id)
+    bookings = await BookingDAO.find_all(user_id=user.id, primary=True)  # новая бронь видна сразу
     return templates.TemplateResponse("profile.html", {
         "request": request,
         "user": user,
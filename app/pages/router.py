@@ -2,7 +2,8 @@
 Роутер FastAPI для HTML-страниц фронта (через Jinja2).
 
 Отвечает за рендеринг главной страницы поиска, отображение списка отелей и передачу переменных из backend в шаблоны.
-Все параметры (location, даты) приходят через query string.
+Все параметры (location, даты, cursor страницы) приходят через query string.
+Результаты поиска выводятся постранично (keyset по id), ссылка "Далее" передаёт next_cursor.
 """
 
 from datetime import date, timedelta
@@ -11,8 +12,9 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Request, Query
 from fastapi.templating import Jinja2Templates
 
-from app.hotels.router import get_hotels_by_location_and_time
+from app.hotels.router import HOTELS_PAGE_LIMIT, search_hotels_page
 from app.hotels.dao import HotelDAO
+from app.hotels.schemas import SHotelsPage
 from app.users.dependencies import get_optional_user
 
 router = APIRouter(prefix="/pages", tags=["Фронтенд"])
@@ -25,6 +27,7 @@ async def index_page(
     location: Optional[str] = Query(None, description="Локация для поиска отеля (город или регион)"),
     date_from: Optional[str] = Query(None, description="Дата заезда в формате YYYY-MM-DD"),
     date_to: Optional[str] = Query(None, description="Дата выезда в формате YYYY-MM-DD"),
+    cursor: Optional[int] = Query(None, description="Курсор следующей страницы результатов"),
     user=Depends(get_optional_user),
 ):
     """
@@ -34,8 +37,10 @@ async def index_page(
     :param location: str | None — поисковый город/регион (query param)
     :param date_from: str | None — дата заезда (query param, ISO format)
     :param date_to: str | None — дата выезда (query param, ISO format)
+    :param cursor: int | None — курсор страницы результатов (next_cursor предыдущей страницы)
     :param user: опциональный пользователь (Depends)
-    :return: HTML шаблон index.html с переменными поиска, ошибкой (если даты невалидны), списком найденных отелей
+    :return: HTML шаблон index.html с переменными поиска, ошибкой (если даты невалидны),
+             страницей найденных отелей и курсором следующей страницы
     """
     today = date.today()
     tomorrow = today + timedelta(days=1)
@@ -58,14 +63,17 @@ async def index_page(
     error = None
     if parsed_to <= parsed_from:
         error = "Дата выезда должна быть позже даты заезда хотя бы на 1 день"
-        hotels = []
+        page = {"items": [], "next_cursor": None}
     else:
-        hotels = await HotelDAO.find_all(location or "", parsed_from, parsed_to)
+        page = await HotelDAO.find_page(
+            location or "", parsed_from, parsed_to, limit=HOTELS_PAGE_LIMIT, cursor=cursor,
+        )
 
     return templates.TemplateResponse("index.html", {
         "request": request,
         "user": user,
-        "hotels": hotels,
+        "hotels": page["items"],
+        "next_cursor": page["next_cursor"],
         "location": location,
         "date_from": parsed_from,
         "date_to": parsed_to,
@@ -76,19 +84,21 @@ async def index_page(
 @router.get("/hotels")
 async def get_hotels_pages(
     request: Request,
-    hotels=Depends(get_hotels_by_location_and_time),
+    hotels=Depends(search_hotels_page),
     user=Depends(get_optional_user),
 ):
     """
     Страница со списком найденных отелей.
 
     :param request: FastAPI Request (обязательно для шаблонов)
-    :param hotels: список отелей (получен через Depends)
+    :param hotels: JSON-ответ поиска отелей (получен через Depends, с кешем API; Response по схеме SHotelsPage)
     :param user: текущий пользователь (опционально)
-    :return: HTML шаблон hotels.html с переданными данными
+    :return: HTML шаблон hotels.html с отелями страницы и курсором следующей
     """
+    page = SHotelsPage.model_validate_json(hotels.body)
     return templates.TemplateResponse("hotels.html", {
         "request": request,
-        "hotels": hotels,
+        "hotels": page.items,
+        "next_cursor": page.next_cursor,
         "user": user,
     })
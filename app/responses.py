@@ -0,0 +1,106 @@
+"""
+Быстрая сериализация JSON-ответов (orjson + pydantic-core).
+
+- ORJSONResponse — класс ответа по умолчанию (main.py): orjson вместо json.dumps,
+  RowMapping из DAO сериализуется без промежуточного jsonable_encoder.
+- typed_json / typed_response — валидация по схеме ответа и сразу байты JSON (TypeAdapter.dump_json),
+  без шага FastAPI "валидация -> python-объекты -> json.dumps". TypeAdapter на тип создаётся один раз.
+
+- ndjson_stream — построчный JSON (application/x-ndjson) из асинхронного потока строк DAO:
+  для StreamingResponse, когда клиент просит Accept: application/x-ndjson (accepts_ndjson).
+
+Эндпоинт, вернувший Response, FastAPI не валидирует повторно: схема ответа для документации
+задаётся через response_model / аннотацию, а проверяется здесь.
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, AsyncIterable, AsyncIterator, Sequence
+
+import orjson
+from fastapi import responses
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(obj: Any) -> Any:
+    """Типы, которых не знает orjson: строки DAO (RowMapping) и прочее — через jsonable_encoder."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализует ответ в JSON через orjson (даты, UUID, RowMapping — без jsonable_encoder).
+
+    :param content: JSON-совместимые данные, строки DAO, pydantic-модели
+    :return: байты JSON
+    """
+    return orjson.dumps(content, default=_default)
+
+
+class ORJSONResponse(responses.ORJSONResponse):
+    """JSON-ответ через orjson; понимает RowMapping из DAO."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """
+    TypeAdapter схемы ответа (кешируется: построение валидатора дороже самой валидации).
+
+    :param schema: тип ответа, например List[SRoomInfo]
+    """
+    return TypeAdapter(schema)
+
+
+def typed_json(content: Any, schema: Any) -> bytes:
+    """
+    Валидирует данные по схеме ответа (лишние колонки DAO отбрасываются) и сериализует в JSON.
+
+    :param content: данные DAO (RowMapping, dict, ORM-объекты) или уже готовые модели
+    :param schema: тип ответа
+    :return: байты JSON
+    """
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+
+def typed_response(content: Any, schema: Any, **kwargs) -> responses.Response:
+    """
+    Ответ эндпоинта по схеме: см. typed_json.
+
+    :param content: данные DAO
+    :param schema: тип ответа
+    :param kwargs: параметры Response (status_code, headers)
+    """
+    return responses.Response(typed_json(content, schema), media_type="application/json", **kwargs)
+
+
+def accepts_ndjson(accept: str | None) -> bool:
+    """
+    Просит ли клиент NDJSON (заголовок Accept; q-параметры не учитываются).
+
+    :param accept: значение заголовка Accept
+    """
+    if not accept:
+        return False
+    return any(item.split(";", 1)[0].strip() == NDJSON_MEDIA_TYPE for item in accept.split(","))
+
+
+async def ndjson_stream(batches: AsyncIterable[Sequence[Any]], schema: Any) -> AsyncIterator[bytes]:
+    """
+    Сериализует поток порций строк DAO в NDJSON: по объекту JSON на строку, одна порция — один кусок ответа.
+
+    :param batches: асинхронный итератор порций строк (например, HotelDAO.stream_all)
+    :param schema: схема одной строки, например SHotelInfo
+    :return: асинхронный итератор байтов для StreamingResponse
+    """
+    adapter = type_adapter(schema)
+    async for rows in batches:
+        yield b"".join(adapter.dump_json(adapter.validate_python(row, from_attributes=True)) + b"\n" for row in rows)
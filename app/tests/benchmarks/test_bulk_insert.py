@@ -0,0 +1,59 @@
+"""
+Бенчмарк массовой вставки: 100 000 комнат через BaseDAO.add_bulk против построчного BaseDAO.add.
+Сравнивает строк в секунду:
+- add_bulk: многострочные INSERT ... RETURNING id по BULK_INSERT_CHUNK_SIZE строк, одна транзакция
+- add: по INSERT, сессии и коммиту на строку (замер на ROW_BY_ROW_SAMPLE строк — 100 000 заняли бы минуты)
+
+Примечания:
+- Запускается только с RUN_BENCHMARKS=1 (результаты печатаются, запускать с -s).
+- В режиме TEST пул выключен (NullPool): построчный add открывает соединение на каждую строку,
+  с пулом разрыв меньше, но round-trip и коммит на строку остаются.
+"""
+
+import os
+import time
+
+import pytest
+
+from app.hotels.rooms.dao import RoomDAO
+
+pytestmark = pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="бенчмарки: RUN_BENCHMARKS=1")
+
+ROWS = 100_000
+ROW_BY_ROW_SAMPLE = 2_000
+ROOM_NAME = "benchmark-room"
+
+
+def rooms(count: int) -> list[dict]:
+    return [
+        {
+            "hotel_id": i % 6 + 1,
+            "name": ROOM_NAME,
+            "description": f"Комната {i}",
+            "price": 1000 + i % 5000,
+            "services": ["Wi-Fi", "Кондиционер"],
+            "quantity": 1 + i % 10,
+            "image_id": 1,
+        }
+        for i in range(count)
+    ]
+
+
+async def test_bulk_insert_throughput():
+    data = rooms(ROWS)
+    try:
+        started = time.perf_counter()
+        ids = await RoomDAO.add_bulk(data)
+        bulk_rps = ROWS / (time.perf_counter() - started)
+        assert len(ids) == ROWS
+
+        started = time.perf_counter()
+        for row in data[:ROW_BY_ROW_SAMPLE]:
+            await RoomDAO.add(**row)
+        row_rps = ROW_BY_ROW_SAMPLE / (time.perf_counter() - started)
+    finally:
+        await RoomDAO.delete(name=ROOM_NAME)
+
+    print(f"{'add_bulk':>10}: {bulk_rps:10.0f} строк/с ({ROWS} строк)")
+    print(f"{'add':>10}: {row_rps:10.0f} строк/с ({ROW_BY_ROW_SAMPLE} строк), 100k ≈ {ROWS / row_rps:.0f} с")
+    assert bulk_rps > row_rps
@@ -0,0 +1,69 @@
+"""
+Бенчмарк потокового импорта броней через COPY (read_csv_batches + BookingDAO.copy_batches).
+Печатает строк в секунду и прирост пикового RSS процесса: память не должна расти с размером файла.
+
+Примечания:
+- Запускается только с RUN_BENCHMARKS=1 (результаты печатаются, запускать с -s).
+- Размер файла — COPY_BENCHMARK_ROWS (по умолчанию 1 000 000); CSV пишется во временный файл на диске.
+- Время включает пересборку реестра room_inventory_daily за период импорта.
+"""
+
+import os
+import random
+import resource
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.bookings.dao import BookingDAO
+from app.bookings.models import Bookings
+from app.config import settings
+from app.database import async_session_maker
+from app.importer.utils import read_csv_batches
+from app.inventory.dao import InventoryDAO
+
+pytestmark = pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="бенчмарки: RUN_BENCHMARKS=1")
+
+ROWS = int(os.getenv("COPY_BENCHMARK_ROWS", 1_000_000))
+PRICE_MARK = 7  # цена броней бенчмарка — по ней они удаляются
+PERIOD_FROM = date(2040, 1, 1)
+
+
+def write_csv(file, rows: int) -> None:
+    file.write(b"room_id;user_id;date_from;date_to;price\n")
+    for _ in range(rows // 10_000 + 1):
+        lines = []
+        for _ in range(min(10_000, rows)):
+            date_from = PERIOD_FROM + timedelta(days=random.randrange(365))
+            date_to = date_from + timedelta(days=random.randint(1, 14))
+            lines.append(f"{random.randint(1, 11)};{random.randint(1, 2)};{date_from};{date_to};{PRICE_MARK}\n")
+        rows -= len(lines)
+        file.write("".join(lines).encode())
+        if not rows:
+            break
+    file.seek(0)
+
+
+async def test_copy_import_throughput():
+    with tempfile.TemporaryFile() as file:
+        write_csv(file, ROWS)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        loaded = 0
+        try:
+            started = time.perf_counter()
+            async for count in BookingDAO.copy_batches(read_csv_batches(file, settings.IMPORT_COPY_BATCH_SIZE, BookingDAO.model)):
+                loaded += count
+            elapsed = time.perf_counter() - started
+        finally:
+            async with async_session_maker() as session:
+                await session.execute(delete(Bookings).where(Bookings.price == PRICE_MARK))
+                await InventoryDAO.rebuild(session, date_from=PERIOD_FROM, date_to=PERIOD_FROM + timedelta(days=400))
+                await session.commit()
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+
+    print(f"COPY: {loaded / elapsed:10.0f} строк/с ({loaded} строк за {elapsed:.1f} с), "
+          f"прирост пикового RSS {rss_growth / 1024:.0f} МБ")
+    assert loaded == ROWS
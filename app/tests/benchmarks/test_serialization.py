@@ -0,0 +1,85 @@
+"""
+Бенчмарк сериализации списков в JSON: ответ на 1000 строк DAO (SRoomInfo).
+Сравнивает ответов в секунду:
+- fastapi: путь FastAPI по умолчанию — валидация, python-объекты (mode="json"), json.dumps (JSONResponse)
+- orjson_response: тот же путь, но с классом ответа по умолчанию ORJSONResponse
+- typed_json: валидация TypeAdapter и сразу байты (app/responses.py)
+
+Примечания:
+- Запускается только с RUN_BENCHMARKS=1 (результаты печатаются, запускать с -s).
+- Строки берутся из БД один раз (RowMapping, как их отдаёт DAO); в замер БД не входит.
+"""
+
+import os
+import time
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, select, true
+
+from app.database import async_session_maker
+from app.hotels.rooms.models import Rooms
+from app.hotels.rooms.schemas import SRoomInfo
+from app.responses import ORJSONResponse, typed_json
+
+pytestmark = pytest.mark.skipif(not os.getenv("RUN_BENCHMARKS"), reason="бенчмарки: RUN_BENCHMARKS=1")
+
+ROWS = 1000
+ITERATIONS = 200
+
+
+async def fetch_rows() -> list:
+    """1000 строк номеров с total_cost и rooms_left (номера тестовой БД, повторённые generate_series)."""
+    copies = func.generate_series(1, ROWS).table_valued("n").render_derived(name="copies")
+    query = (
+        select(
+            Rooms.__table__.columns,
+            (Rooms.price * 3).label("total_cost"),
+            Rooms.quantity.label("rooms_left"),
+        )
+        .join(copies, true())
+        .limit(ROWS)
+    )
+    async with async_session_maker() as session:
+        result = await session.execute(query)
+        return result.mappings().all()
+
+
+def throughput(render, rows) -> float:
+    """Ответов в секунду."""
+    render(rows)  # прогрев (построение валидаторов)
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        render(rows)
+    return ITERATIONS / (time.perf_counter() - started)
+
+
+async def test_list_serialization_throughput():
+    rows = await fetch_rows()
+    assert len(rows) == ROWS
+    schema = List[SRoomInfo]
+    adapter = TypeAdapter(schema)
+
+    def fastapi_default(rows) -> bytes:
+        content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+        return JSONResponse(content).body
+
+    def orjson_response(rows) -> bytes:
+        content = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+        return ORJSONResponse(content).body
+
+    def typed(rows) -> bytes:
+        return typed_json(rows, schema)
+
+    assert adapter.validate_json(typed(rows)) == adapter.validate_json(fastapi_default(rows))
+
+    results = {
+        "fastapi": throughput(fastapi_default, rows),
+        "orjson_response": throughput(orjson_response, rows),
+        "typed_json": throughput(typed, rows),
+    }
+    for name, rps in results.items():
+        print(f"{name:>16}: {rps:8.1f} ответов/с ({ROWS} строк)")
+    assert results["typed_json"] > results["fastapi"]
@@ -1,7 +1,8 @@
 """
 Pytest-фикстуры для тестирования FastAPI-приложения:
-- Пересоздаёт тестовую БД, наполняет мок-данными из JSON
+- Пересоздаёт тестовую БД, наполняет мок-данными из JSON (и пересобирает реестр room_inventory_daily)
 - Возвращает асинхронных клиентов (авторизованный и нет)
+- По запросу включает кеш доступности (app/cache) на реальном Redis
 - Гарантирует: работает только если settings.MODE == "TEST"
 """
 
@@ -11,13 +12,19 @@ from datetime import datetime
 
 import pytest
 from httpx import ASGITransport, AsyncClient
-from sqlalchemy import insert
+import redis
+from redis import asyncio as aioredis
+from sqlalchemy import insert, text
 
 from app.bookings.models import Bookings
+from app.cache.catalog import CatalogCache
+from app.cache.client import init_cache_redis
+from app.cache.tagged import CACHE_PREFIX
 from app.config import settings
 from app.database import Base, async_session_maker, engine
 from app.hotels.models import Hotels
 from app.hotels.rooms.models import Rooms
+from app.inventory.dao import InventoryDAO
 from app.main import app as fastapi_app
 from app.users.models import Users
 
@@ -31,6 +38,10 @@ async def prepare_database():
     assert settings.MODE == "TEST", "Тестовые фикстуры могут работать только в тестовом режиме!"
 
     async with engine.begin() as conn:
+        # Расширения, которые в проде ставят миграции:
+        # GiST-индекс по bookings.room_id + stay и триграммный индекс по hotels.location_search
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
 
@@ -56,6 +67,8 @@ async def prepare_database():
         await session.execute(insert(Rooms).values(rooms))
         await session.execute(insert(Users).values(users))
         await session.execute(insert(Bookings).values(bookings))
+        # Брони вставлены напрямую — раскладываем их по посуточному реестру
+        await InventoryDAO.rebuild(session)
         await session.commit()
 
 @pytest.fixture(scope="function")
@@ -92,6 +105,31 @@ async def session():
     async with async_session_maker() as session:
         yield session
 
+@pytest.fixture(scope="function")
+def cache_redis():
+    """
+    Включает кеш доступности (app/cache) на время теста: lifespan в тестах не запускается,
+    поэтому без фикстуры кеш выключен. Ключи кеша и память воркера (CatalogCache.local)
+    очищаются до и после теста (синхронным клиентом: асинхронный подключается уже в цикле событий теста).
+    :yield: Redis-клиент кеша
+    """
+    url = f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
+    sync_redis = redis.Redis.from_url(url)
+
+    def clear():
+        keys = sync_redis.keys(f"{CACHE_PREFIX}:*")
+        if keys:
+            sync_redis.delete(*keys)
+        CatalogCache.local.clear()
+
+    clear()
+    cache = aioredis.from_url(url, encoding="utf8", decode_responses=True)
+    init_cache_redis(cache)
+    yield cache
+    init_cache_redis(None)
+    clear()
+    sync_redis.close()
+
 # Если потребуется event_loop для Windows/asyncio, раскомментируйте и настройте:
 # @pytest.fixture(scope="session")
 # def event_loop():
@@ -0,0 +1,115 @@
+"""
+Интеграционный тест конкурентного бронирования последнего номера.
+Проверяет:
+- Из N одновременных POST /bookings на номер с quantity=1 успешен ровно один (200), остальные — 409
+- В bookings ровно одна бронь на этот номер, в реестре room_inventory_daily занято не больше 1
+- При quantity > 1 успешно ровно quantity броней: ни перебронирования, ни ложных 409
+- Исчерпанные попытки при конфликте — 503, а не 409; число попыток не меньше 1
+"""
+
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DBAPIError
+
+from app.bookings.dao import BookingDAO
+from app.bookings.models import Bookings
+from app.config import Settings
+from app.database import async_session_maker
+from app.hotels.rooms.models import Rooms
+from app.inventory.models import RoomInventoryDaily
+
+CONCURRENT_REQUESTS = 20
+
+
+async def test_concurrent_bookings_of_last_room(authenticated_ac: AsyncClient):
+    """
+    Создаёт номер с quantity=1 и отправляет CONCURRENT_REQUESTS одновременных броней на одни даты.
+    """
+    async with async_session_maker() as session:
+        room_id = await session.execute(
+            insert(Rooms).values(
+                hotel_id=1, name="Единственный номер", price=1000, services=[], quantity=1, image_id=1,
+            ).returning(Rooms.id)
+        )
+        room_id = room_id.scalar()
+        await session.commit()
+
+    responses = await asyncio.gather(*[
+        authenticated_ac.post("/bookings", json={
+            "room_id": room_id,
+            "date_from": "2032-03-01",
+            "date_to": "2032-03-05",
+        })
+        for _ in range(CONCURRENT_REQUESTS)
+    ])
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [200] + [409] * (CONCURRENT_REQUESTS - 1)
+
+    async with async_session_maker() as session:
+        bookings_count = await session.execute(
+            select(func.count()).select_from(Bookings).where(Bookings.room_id == room_id)
+        )
+        assert bookings_count.scalar() == 1
+
+        max_booked = await session.execute(
+            select(func.max(RoomInventoryDaily.booked_count)).where(RoomInventoryDaily.room_id == room_id)
+        )
+        assert max_booked.scalar() == 1
+
+
+async def test_concurrent_bookings_fill_room_exactly(authenticated_ac: AsyncClient):
+    """
+    Номер с quantity=10 и втрое больше одновременных броней: успешны ровно 10, мест не остаётся.
+    """
+    quantity = 10
+    async with async_session_maker() as session:
+        room_id = await session.execute(
+            insert(Rooms).values(
+                hotel_id=1, name="Номер на десятерых", price=1000, services=[], quantity=quantity, image_id=1,
+            ).returning(Rooms.id)
+        )
+        room_id = room_id.scalar()
+        await session.commit()
+
+    responses = await asyncio.gather(*[
+        authenticated_ac.post("/bookings", json={
+            "room_id": room_id,
+            "date_from": "2032-04-01",
+            "date_to": "2032-04-05",
+        })
+        for _ in range(quantity * 3)
+    ])
+    status_codes = sorted(response.status_code for response in responses)
+    assert status_codes == [200] * quantity + [409] * (quantity * 2)
+
+    async with async_session_maker() as session:
+        max_booked = await session.execute(
+            select(func.max(RoomInventoryDaily.booked_count)).where(RoomInventoryDaily.room_id == room_id)
+        )
+        assert max_booked.scalar() == quantity
+
+
+class SerializationFailure(Exception):
+    sqlstate = "40001"
+
+
+async def test_exhausted_retries_are_not_reported_as_fully_booked(authenticated_ac: AsyncClient, monkeypatch):
+    async def conflicting(*args):
+        raise DBAPIError("INSERT INTO bookings ...", {}, SerializationFailure())
+
+    monkeypatch.setattr(BookingDAO, "_add_atomic", conflicting)
+    response = await authenticated_ac.post("/bookings", json={
+        "room_id": 1,
+        "date_from": "2032-04-01",
+        "date_to": "2032-04-05",
+    })
+    assert response.status_code == 503
+
+
+def test_booking_retries_at_least_one():
+    with pytest.raises(ValidationError):
+        Settings(BOOKING_SERIALIZABLE_RETRIES=0)
@@ -0,0 +1,71 @@
+"""
+Интеграционный тест планов запросов на большом объёме броней.
+Проверяет (EXPLAIN на 1 000 000 броней):
+- Пересечение периодов по bookings (stay && daterange) идёт через GiST-индекс ix_bookings_room_id_stay
+- Поиск (booked_rooms по реестру) и atomic-бронь читают room_inventory_daily по индексу, а не seq scan
+
+Примечания:
+- Брони, реестр и статистика ANALYZE создаются в одной транзакции и откатываются после теста.
+"""
+
+from datetime import date
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql import ClauseElement
+
+from app.bookings.dao import BookingDAO
+from app.database import async_session_maker
+from app.inventory.dao import InventoryDAO
+
+SEED_BOOKINGS = 1_000_000
+
+
+def as_sql(query: ClauseElement) -> str:
+    """Компилирует запрос SQLAlchemy в SQL с подставленными значениями (для EXPLAIN)."""
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def test_overlap_queries_use_indexes():
+    """
+    Засевает SEED_BOOKINGS броней по 11 комнатам за 10 лет и проверяет планы запросов.
+    """
+    date_from, date_to = date(2034, 6, 10), date(2034, 6, 13)
+
+    async with async_session_maker() as session:
+        await session.execute(text("SELECT setseed(0.42)"))
+        await session.execute(text(
+            """
+            INSERT INTO bookings (room_id, user_id, date_from, date_to, price)
+            SELECT 1 + i % 11, 1, d, d + 1 + (random() * 6)::int, 1000
+            FROM (
+                SELECT i, DATE '2030-01-01' + (random() * 3650)::int AS d
+                FROM generate_series(1, :count) AS i
+            ) AS s
+            """
+        ), {"count": SEED_BOOKINGS})
+        await InventoryDAO.rebuild(session)
+        await session.execute(text("ANALYZE bookings"))
+        await session.execute(text("ANALYZE room_inventory_daily"))
+
+        async def explain(query: ClauseElement) -> str:
+            plan = await session.execute(text("EXPLAIN " + as_sql(query)))
+            return "\n".join(plan.scalars().all())
+
+        try:
+            # Пересборка реестра за период: брони отбираются по stay && daterange
+            _, fill = InventoryDAO.rebuild_queries(room_id=5, date_from=date_from, date_to=date_to)
+            plan = await explain(fill)
+            assert "ix_bookings_room_id_stay" in plan, plan
+            assert "Seq Scan on bookings" not in plan, plan
+
+            # Поиск: занятость всех комнат за период по реестру
+            plan = await explain(select(InventoryDAO.booked_rooms_cte(date_from, date_to)))
+            assert "Seq Scan on room_inventory_daily" not in plan, plan
+
+            # Бронирование: проверка мест и вставка одним запросом
+            plan = await explain(BookingDAO.atomic_add_query(1, 5, date_from, date_to))
+            assert "Seq Scan on room_inventory_daily" not in plan, plan
+            assert "Seq Scan on bookings" not in plan, plan
+        finally:
+            await session.rollback()
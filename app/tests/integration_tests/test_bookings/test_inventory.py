@@ -0,0 +1,49 @@
+"""
+Интеграционный тест посуточного реестра занятости (room_inventory_daily).
+Проверяет:
+- BookingDAO.add занимает каждую ночь брони (день выезда не занят)
+- BookingDAO.delete освобождает эти ночи
+- RoomDAO.find_all считает rooms_left по реестру
+"""
+
+from datetime import date
+
+from sqlalchemy import select
+
+from app.bookings.dao import BookingDAO
+from app.database import async_session_maker
+from app.hotels.rooms.dao import RoomDAO
+from app.inventory.models import RoomInventoryDaily
+
+
+async def get_ledger(room_id: int, date_from: date, date_to: date) -> dict[date, int]:
+    """Возвращает {day: booked_count} по комнате за период [date_from, date_to]."""
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(RoomInventoryDaily.day, RoomInventoryDaily.booked_count).where(
+                RoomInventoryDaily.room_id == room_id,
+                RoomInventoryDaily.day >= date_from,
+                RoomInventoryDaily.day <= date_to,
+            )
+        )
+        return dict(result.all())
+
+
+async def test_add_and_delete_booking_updates_ledger():
+    """
+    Бронь room_id=5 на 2031-01-10..2031-01-13 занимает три ночи и освобождает их после удаления.
+    """
+    date_from, date_to = date(2031, 1, 10), date(2031, 1, 13)
+    booking = await BookingDAO.add(user_id=2, room_id=5, date_from=date_from, date_to=date_to)
+    assert booking is not None
+
+    ledger = await get_ledger(5, date_from, date_to)
+    assert ledger == {date(2031, 1, 10): 1, date(2031, 1, 11): 1, date(2031, 1, 12): 1}
+
+    rooms = await RoomDAO.find_all(hotel_id=3, date_from=date_from, date_to=date_to)
+    room = next(r for r in rooms if r["id"] == 5)
+    assert room["rooms_left"] == room["quantity"] - 1
+
+    await BookingDAO.delete(id=booking.id, user_id=2)
+    ledger = await get_ledger(5, date_from, date_to)
+    assert all(count == 0 for count in ledger.values())
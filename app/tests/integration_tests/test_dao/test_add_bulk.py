@@ -0,0 +1,62 @@
+"""
+Интеграционный тест массовой вставки (BaseDAO.add_bulk) и импорта CSV (POST /import/{table_name}).
+Проверяет:
+- id возвращаются в порядке входных строк, вставка идёт порциями по chunk_size
+- Ошибка в любой порции откатывает весь импорт
+- Импорт комнат из CSV через эндпоинт
+- Импорт броней занимает ночи в реестре room_inventory_daily (rooms_left уменьшается)
+"""
+
+from datetime import date, datetime
+
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.hotels.rooms.dao import RoomDAO
+
+
+def room(name: str, hotel_id: int = 1) -> dict:
+    return {"hotel_id": hotel_id, "name": name, "price": 1000, "quantity": 1, "image_id": 1}
+
+
+async def test_add_bulk_returns_ids_in_order():
+    rows = [room(f"bulk-{i}") for i in range(5)]
+    ids = await RoomDAO.add_bulk(rows, chunk_size=2)
+    assert len(ids) == 5
+    assert [(await RoomDAO.find_by_id(room_id))["name"] for room_id in ids] == [row["name"] for row in rows]
+    for room_id in ids:
+        await RoomDAO.delete(id=room_id)
+
+
+async def test_add_bulk_is_atomic():
+    rows = [room("bulk-ok-1"), room("bulk-ok-2"), room("bulk-bad", hotel_id=999_999)]
+    assert await RoomDAO.add_bulk(rows, chunk_size=2) is None
+    assert await RoomDAO.find_one_or_none(name="bulk-ok-1") is None
+
+
+async def test_import_rooms_csv(ac: AsyncClient):
+    csv = "hotel_id;name;price;quantity;image_id\n2;csv-room-1;3000;2;1\n2;csv-room-2;4000;1;1\n"
+    response = await ac.post("/import/rooms", files={"file": ("rooms.csv", csv.encode(), "text/csv")})
+    assert response.status_code == 201
+    ids = response.json()["result"]
+    assert len(ids) == 2
+    for room_id in ids:
+        await RoomDAO.delete(id=room_id)
+
+
+async def test_import_bookings_updates_inventory():
+    async def rooms_left() -> int:
+        rooms = await RoomDAO.find_all(3, date(2033, 9, 1), date(2033, 9, 3))
+        return next(row["rooms_left"] for row in rooms if row["id"] == 5)
+
+    before = await rooms_left()
+    ids = await BookingDAO.add_bulk([
+        {"room_id": 5, "user_id": 1, "date_from": datetime(2033, 9, 1), "date_to": datetime(2033, 9, 3), "price": 100},
+        {"room_id": 5, "user_id": 2, "date_from": datetime(2033, 9, 2), "date_to": datetime(2033, 9, 5), "price": 100},
+    ])
+    assert len(ids) == 2
+    assert await rooms_left() == before - 2
+
+    for booking_id in ids:
+        await BookingDAO.delete(id=booking_id)
+    assert await rooms_left() == before
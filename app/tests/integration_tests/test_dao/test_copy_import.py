@@ -0,0 +1,94 @@
+"""
+Интеграционный тест потокового импорта CSV через COPY (POST /import/{table_name}?mode=copy).
+Проверяет:
+- Комнаты: JSONB-поле services и пустые значения (NULL) загружаются корректно
+- Брони грузятся порциями и занимают ночи в реестре room_inventory_daily
+- Ошибка в порции: закоммиченные порции остаются (и учтены в реестре), в ответе — сколько строк загружено
+- Большой файл разбирается в пуле процессов: порции приходят по порядку, все строки загружены
+"""
+
+from datetime import date
+
+from httpx import AsyncClient
+
+from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.hotels.rooms.dao import RoomDAO
+from app.importer.utils import shutdown_parse_pool
+
+
+def csv_file(text: str) -> dict:
+    return {"file": ("data.csv", text.encode(), "text/csv")}
+
+
+async def rooms_left(room_id: int, hotel_id: int, date_from: date, date_to: date) -> int:
+    rooms = await RoomDAO.find_all(hotel_id, date_from, date_to)
+    return next(row["rooms_left"] for row in rooms if row["id"] == room_id)
+
+
+async def test_copy_rooms(ac: AsyncClient):
+    csv = (
+        "hotel_id;name;description;price;services;quantity;image_id\n"
+        '4;copy-room;;2500;"[""Wi-Fi"", ""Сейф""]";3;1\n'
+        "4;copy-room;Без услуг;1800;;1;1\n"
+    )
+    response = await ac.post("/import/rooms", params={"mode": "copy"}, files=csv_file(csv))
+    assert response.status_code == 201
+    assert response.json()["result"] == {"rows": 2}
+
+    with_services = await RoomDAO.find_one_or_none(name="copy-room", price=2500)
+    without_services = await RoomDAO.find_one_or_none(name="copy-room", price=1800)
+    assert (with_services["description"], with_services["services"]) == (None, ["Wi-Fi", "Сейф"])
+    assert (without_services["description"], without_services["services"]) == ("Без услуг", None)
+    await RoomDAO.delete(name="copy-room")
+
+
+async def test_copy_bookings_in_batches(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 2)
+    period = (date(2033, 10, 1), date(2033, 10, 4))
+    before = await rooms_left(5, 3, *period)
+
+    csv = "room_id;user_id;date_from;date_to;price\n" + "5;1;2033-10-01;2033-10-04;500\n" * 3
+    response = await ac.post("/import/bookings", params={"mode": "copy"}, files=csv_file(csv))
+    assert response.status_code == 201
+    assert response.json()["result"] == {"rows": 3}
+    assert await rooms_left(5, 3, *period) == before - 3
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
+    assert await rooms_left(5, 3, *period) == before
+
+
+async def test_copy_keeps_committed_batches_on_error(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 1)
+    period = (date(2033, 11, 1), date(2033, 11, 3))
+    before = await rooms_left(5, 3, *period)
+
+    csv = (
+        "room_id;user_id;date_from;date_to;price\n"
+        "5;1;2033-11-01;2033-11-03;500\n"
+        "999999;1;2033-11-01;2033-11-03;500\n"  # нет такой комнаты — нарушение внешнего ключа
+    )
+    response = await ac.post("/import/bookings", params={"mode": "copy"}, files=csv_file(csv))
+    assert response.status_code == 500
+    assert response.json()["detail"].endswith(": 1")
+    assert await rooms_left(5, 3, *period) == before - 1
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
+
+
+async def test_copy_parses_in_process_pool(ac: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 3)
+    monkeypatch.setattr(settings, "IMPORT_PARSE_PROCESS_MIN_BYTES", 0)
+    period = (date(2033, 12, 10), date(2033, 12, 12))
+    before = await rooms_left(5, 3, *period)
+
+    csv = "room_id;user_id;date_from;date_to;price\n" + "5;1;2033-12-10;2033-12-12;500\n" * 10
+    try:
+        response = await ac.post("/import/bookings", params={"mode": "copy"}, files=csv_file(csv))
+    finally:
+        shutdown_parse_pool()
+    assert response.status_code == 201
+    assert response.json()["result"] == {"rows": 10}
+    assert await rooms_left(5, 3, *period) == before - 10
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
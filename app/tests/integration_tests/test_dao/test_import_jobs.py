@@ -0,0 +1,137 @@
+"""
+Интеграционный тест фоновых задач импорта CSV (POST /import/{table_name}?mode=job, app/importer/jobs.py).
+Проверяет:
+- Ответ сразу (202, id задачи), файл — на диске; воркер грузит его порциями, прогресс — в GET /import/jobs/{id}
+- Сбой порции откатывает и её строки, и её прогресс; продолжение (resume) грузит файл
+  с последней закоммиченной порции — без дублей
+- Воркер, чью брошенную задачу забрал другой, не закоммитит ни порции, ни статуса задачи
+"""
+
+import os
+from datetime import date
+
+from httpx import AsyncClient
+from sqlalchemy import update
+
+from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.database import async_session_maker
+from app.hotels.rooms.dao import RoomDAO
+from app.importer.dao import ImportJobDAO
+from app.importer.jobs import ImportJobWorker
+from app.importer.models import ImportJobs
+
+
+def csv_file(text: str) -> dict:
+    return {"file": ("data.csv", text.encode(), "text/csv")}
+
+
+async def rooms_left(room_id: int, hotel_id: int, date_from: date, date_to: date) -> int:
+    rooms = await RoomDAO.find_all(hotel_id, date_from, date_to)
+    return next(row["rooms_left"] for row in rooms if row["id"] == room_id)
+
+
+async def test_job_loads_file_in_background(ac: AsyncClient, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "IMPORT_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 2)
+    period = (date(2033, 12, 1), date(2033, 12, 3))
+    before = await rooms_left(5, 3, *period)
+
+    csv = "room_id;user_id;date_from;date_to;price\n" + "5;1;2033-12-01;2033-12-03;500\n" * 3
+    response = await ac.post("/import/bookings", params={"mode": "job"}, files=csv_file(csv))
+    assert response.status_code == 202
+    job_id = response.json()["result"]["job_id"]
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"]) == ("pending", 0)
+    assert len(os.listdir(tmp_path)) == 1
+
+    job = await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER)
+    assert job["id"] == job_id
+    assert await ImportJobWorker.process(job)
+
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"], status["attempts"]) == ("done", 3, 1)
+    assert status["rows_per_sec"] > 0
+    assert os.listdir(tmp_path) == []
+    assert await rooms_left(5, 3, *period) == before - 3
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
+
+
+async def test_failed_job_resumes_from_last_committed_batch(ac: AsyncClient, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "IMPORT_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 1)
+    monkeypatch.setattr(settings, "IMPORT_JOB_MAX_ATTEMPTS", 1)
+    period = (date(2034, 1, 1), date(2034, 1, 3))
+    before = await rooms_left(5, 3, *period)
+
+    csv = "room_id;user_id;date_from;date_to;price\n" + "5;1;2034-01-01;2034-01-03;500\n" * 3
+    response = await ac.post("/import/bookings", params={"mode": "job"}, files=csv_file(csv))
+    job_id = response.json()["result"]["job_id"]
+
+    # Вторая порция падает уже после COPY — в той же транзакции, что и её прогресс
+    progress = ImportJobDAO.progress
+    calls = []
+
+    async def failing_progress(session, *args):
+        calls.append(args)
+        if len(calls) == 2:
+            raise ConnectionError("connection lost")
+        await progress(session, *args)
+
+    monkeypatch.setattr(ImportJobDAO, "progress", failing_progress)
+    assert not await ImportJobWorker.process(await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER))
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"]) == ("failed", 1)
+    assert status["error"] == "ConnectionError: connection lost"
+    assert await rooms_left(5, 3, *period) == before - 1
+
+    monkeypatch.setattr(ImportJobDAO, "progress", progress)
+    response = await ac.post(f"/import/jobs/{job_id}/resume")
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+    assert await ImportJobWorker.process(await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER))
+
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"], status["error"]) == ("done", 3, None)
+    assert await rooms_left(5, 3, *period) == before - 3
+
+    assert (await ac.post(f"/import/jobs/{job_id}/resume")).status_code == 409
+    assert (await ac.get("/import/jobs/999999")).status_code == 404
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
+
+
+async def test_stale_worker_cannot_write_after_takeover(ac: AsyncClient, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "IMPORT_JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "IMPORT_COPY_BATCH_SIZE", 1)
+    period = (date(2034, 2, 1), date(2034, 2, 3))
+    before = await rooms_left(5, 3, *period)
+
+    csv = "room_id;user_id;date_from;date_to;price\n" + "5;1;2034-02-01;2034-02-03;500\n" * 3
+    response = await ac.post("/import/bookings", params={"mode": "job"}, files=csv_file(csv))
+    job_id = response.json()["result"]["job_id"]
+
+    # Первый воркер взял задачу и завис: она выглядит брошенной, её забирает второй
+    stale = await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER)
+    async with async_session_maker() as session:
+        await session.execute(
+            update(ImportJobs).where(ImportJobs.id == job_id).values(updated_at=date(2000, 1, 1))
+        )
+        await session.commit()
+    current = await ImportJobDAO.claim(settings.IMPORT_JOB_STALE_AFTER)
+    assert current["id"] == stale["id"] == job_id
+    assert current["claim_token"] != stale["claim_token"]
+
+    assert not await ImportJobWorker.process(stale)
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"], status["attempts"]) == ("running", 0, 2)
+    assert await rooms_left(5, 3, *period) == before
+
+    assert await ImportJobWorker.process(current)
+    status = (await ac.get(f"/import/jobs/{job_id}")).json()
+    assert (status["status"], status["rows_done"]) == ("done", 3)
+    assert await rooms_left(5, 3, *period) == before - 3
+    assert not await ImportJobDAO.release(stale)
+
+    await BookingDAO.delete(room_id=5, date_from=period[0])
@@ -0,0 +1,70 @@
+"""
+Интеграционный тест маршрутизации чтений на реплики (app/database.py: read_session).
+"Реплика" — отдельный engine к той же тестовой БД: проверяется, через какой engine прошёл запрос.
+Проверяет:
+- Чтения DAO (BaseDAO и поиск) идут в реплику, запись брони — в основную БД
+- primary=True читает из основной БД (список броней пользователя)
+- Без реплик всё читается из основной БД
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from sqlalchemy import NullPool, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.bookings.dao import BookingDAO
+from app.config import settings
+from app.hotels.dao import HotelDAO
+from app.users.dao import UsersDAO
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture
+async def replica(monkeypatch):
+    replica_engine = create_async_engine(settings.TEST_DATABASE_URL, poolclass=NullPool)
+    monkeypatch.setattr(database, "replica_session_makers", [
+        sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False),
+    ])
+    yield replica_engine
+    await replica_engine.dispose()
+
+
+async def test_reads_go_to_replica(replica):
+    with count_queries(database.engine) as primary_queries, count_queries(replica) as replica_queries:
+        assert await UsersDAO.find_by_id(1) is not None
+        assert await UsersDAO.find_one_or_none(email="test@test.com") is not None
+        assert await HotelDAO.find_all("Алтай", date(2033, 8, 1), date(2033, 8, 3))
+    assert len(replica_queries) == 3
+    assert primary_queries == []
+
+    with count_queries(database.engine) as primary_queries, count_queries(replica) as replica_queries:
+        booking = await BookingDAO.add(user_id=1, room_id=1, date_from=date(2033, 8, 1), date_to=date(2033, 8, 3))
+        bookings = await BookingDAO.find_all(user_id=1, primary=True)
+    assert booking.id in [row["id"] for row in bookings]
+    assert primary_queries and replica_queries == []
+
+    await BookingDAO.delete(id=booking.id)
+
+
+async def test_without_replicas_reads_from_primary():
+    assert database.replica_session_makers == []
+    with count_queries(database.engine) as primary_queries:
+        await UsersDAO.find_by_id(1)
+    assert len(primary_queries) == 1
@@ -0,0 +1,65 @@
+"""
+Интеграционный тест общей сессии чтения на HTTP-запрос (app/database.py: request_scope).
+Проверяет:
+- GET /bookings (пользователь + его брони) берёт из пула одно соединение
+- Страница отеля (отель, номера, календарь) — тоже одно
+- Вне запроса каждый вызов DAO открывает свою сессию (прежнее поведение)
+- Ошибка запроса в общей сессии не ломает следующие чтения
+"""
+
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+
+from app.database import engine, read_session, request_scope
+from app.users.dao import UsersDAO
+
+
+@contextmanager
+def count_checkouts():
+    """Считает соединения, выданные пулом engine внутри блока."""
+    checkouts = []
+
+    def on_checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine.sync_engine.pool, "checkout", on_checkout)
+    try:
+        yield checkouts
+    finally:
+        event.remove(engine.sync_engine.pool, "checkout", on_checkout)
+
+
+async def test_bookings_use_one_connection(authenticated_ac: AsyncClient):
+    with count_checkouts() as checkouts:
+        response = await authenticated_ac.get("/bookings")
+    assert response.status_code == 200
+    assert len(checkouts) == 1
+
+
+async def test_hotel_page_uses_one_connection(ac: AsyncClient):
+    date_from = date.today() + timedelta(days=30)
+    params = {"date_from": date_from.isoformat(), "date_to": (date_from + timedelta(days=2)).isoformat()}
+    with count_checkouts() as checkouts:
+        response = await ac.get("/pages/hotels/1", params=params)
+    assert response.status_code == 200
+    assert len(checkouts) == 1
+
+
+async def test_outside_request_each_call_has_own_session():
+    with count_checkouts() as checkouts:
+        await UsersDAO.find_by_id(1)
+        await UsersDAO.find_by_id(2)
+    assert len(checkouts) == 2
+
+
+async def test_failed_query_does_not_break_request_session():
+    async with request_scope():
+        with pytest.raises(DBAPIError):
+            async with read_session() as session:
+                await session.execute(text("SELECT 1 / 0"))
+        assert await UsersDAO.find_by_id(1) is not None
@@ -0,0 +1,71 @@
+"""
+Интеграционный тест импорта справочника в режиме upsert (POST /import/{table_name}?mode=upsert).
+Проверяет:
+- Отели без id сопоставляются по (name, location): повторный импорт не дублирует строки,
+  из дублей файла берётся последний, неизменные строки не перезаписываются
+- Номера с id: ON CONFLICT по id, последовательность id сдвигается за импортированные,
+  изменённый номер сбрасывается в кеше справочных данных
+- Брони в режиме upsert не импортируются
+"""
+
+from httpx import AsyncClient
+
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+
+
+def csv_file(text: str) -> dict:
+    return {"file": ("data.csv", text.encode(), "text/csv")}
+
+
+HOTELS_HEADER = "name;location;services;rooms_quantity;image_id\n"
+
+
+async def test_upsert_hotels_by_natural_key(ac: AsyncClient):
+    csv = HOTELS_HEADER + (
+        'upsert-hotel-1;Тверь;"[""Wi-Fi""]";5;1\n'
+        'upsert-hotel-2;Тверь;"[]";7;1\n'
+        'upsert-hotel-1;Тверь;"[""Wi-Fi"", ""Парковка""]";5;1\n'
+    )
+    response = await ac.post("/import/hotels", params={"mode": "upsert"}, files=csv_file(csv))
+    assert response.status_code == 201
+    assert response.json()["result"] == {"inserted": 2, "updated": 0, "unchanged": 0, "duplicates": 1}
+    hotel = await HotelDAO.find_one_or_none(name="upsert-hotel-1")
+    assert hotel["services"] == ["Wi-Fi", "Парковка"]
+
+    response = await ac.post("/import/hotels", params={"mode": "upsert"}, files=csv_file(csv))
+    assert response.json()["result"] == {"inserted": 0, "updated": 0, "unchanged": 2, "duplicates": 1}
+
+    changed = HOTELS_HEADER + 'upsert-hotel-1;Тверь;"[""Wi-Fi"", ""Парковка""]";5;1\nupsert-hotel-2;Тверь;"[]";9;1\n'
+    response = await ac.post("/import/hotels", params={"mode": "upsert"}, files=csv_file(changed))
+    assert response.json()["result"] == {"inserted": 0, "updated": 1, "unchanged": 1, "duplicates": 0}
+    assert (await HotelDAO.find_one_or_none(name="upsert-hotel-2"))["rooms_quantity"] == 9
+    # one_or_none упал бы на дубле
+    assert (await HotelDAO.find_one_or_none(name="upsert-hotel-1"))["id"] == hotel["id"]
+
+    await HotelDAO.delete(location="Тверь")
+
+
+async def test_upsert_rooms_by_id(ac: AsyncClient, cache_redis):
+    header = "id;hotel_id;name;description;price;services;quantity;image_id\n"
+    csv = header + "9001;4;upsert-room;;3000;;2;1\n"
+    response = await ac.post("/import/rooms", params={"mode": "upsert"}, files=csv_file(csv))
+    assert response.json()["result"] == {"inserted": 1, "updated": 0, "unchanged": 0, "duplicates": 0}
+    assert (await RoomDAO.find_by_id_cached(9001))["price"] == 3000
+
+    csv = header + "9001;4;upsert-room;;3500;;2;1\n"
+    response = await ac.post("/import/rooms", params={"mode": "upsert"}, files=csv_file(csv))
+    assert response.json()["result"] == {"inserted": 0, "updated": 1, "unchanged": 0, "duplicates": 0}
+    assert (await RoomDAO.find_by_id_cached(9001))["price"] == 3500
+
+    # Следующий id из последовательности — после импортированного
+    [new_id] = await RoomDAO.add_bulk([{"hotel_id": 4, "name": "upsert-room", "price": 1, "quantity": 1, "image_id": 1}])
+    assert new_id > 9001
+
+    await RoomDAO.delete(name="upsert-room")
+
+
+async def test_upsert_bookings_not_supported(ac: AsyncClient):
+    csv = "room_id;user_id;date_from;date_to;price\n5;1;2034-02-01;2034-02-03;500\n"
+    response = await ac.post("/import/bookings", params={"mode": "upsert"}, files=csv_file(csv))
+    assert response.status_code == 400
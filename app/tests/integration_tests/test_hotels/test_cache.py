@@ -0,0 +1,207 @@
+"""
+Интеграционный тест кеша доступности с инвалидацией по броням (app/cache/tagged.py).
+Проверяет:
+- Повторный запрос номеров отеля читается из кеша
+- Бронь другого отеля или на непересекающиеся даты запись не сбрасывает
+- Бронь номера отеля на пересекающиеся даты сбрасывает запись, и rooms_left сразу актуален
+- Поиск: ключ по нормализованной локации; снятие брони сбрасывает пересекающиеся записи поиска
+- Single-flight: 500 одновременных промахов по ключу — один пересчёт (по числу SQL-запросов)
+- Redis-блокировка: воркер без блокировки ждёт запись, посчитанную другим воркером
+- Stale-while-revalidate: после мягкого TTL запись отдаётся сразу, пересчёт — один, в фоне
+- Импорт справочника (copy, upsert) сбрасывает записи отелей: новый номер, новая цена и перенос номера
+  в другой отель видны сразу
+"""
+
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from datetime import date
+
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.bookings.dao import BookingDAO
+from app.cache.tagged import _entry_key, _lock_key, encode_entry, request_window, tagged_cache
+from app.config import settings
+from app.database import engine
+from app.hotels.dao import HotelDAO
+from app.hotels.rooms.dao import RoomDAO
+
+ROOMS_URL = "/hotels/3/rooms"
+ROOMS_PARAMS = {"date_from": "2033-02-01", "date_to": "2033-02-05"}
+
+
+async def rooms_left(ac: AsyncClient, room_id: int) -> int:
+    response = await ac.get(ROOMS_URL, params=ROOMS_PARAMS)
+    assert response.status_code == 200
+    return next(room["rooms_left"] for room in response.json() if room["id"] == room_id)
+
+
+async def test_booking_evicts_only_affected_entries(ac: AsyncClient, cache_redis):
+    """
+    Номера отеля 3 (комната 5, quantity=20) на 2033-02-01..2033-02-05.
+    """
+    assert await rooms_left(ac, 5) == 20
+    assert await rooms_left(ac, 5) == 20
+    cached_keys = await cache_redis.keys("tcache:hotel_rooms:*")
+    assert len(cached_keys) == 1
+
+    # Другой отель и даты "встык" (выезд = заезд) запись не трогают
+    other_hotel = await BookingDAO.add(user_id=2, room_id=1, date_from=date(2033, 2, 1), date_to=date(2033, 2, 5))
+    adjacent = await BookingDAO.add(user_id=2, room_id=5, date_from=date(2033, 2, 5), date_to=date(2033, 2, 8))
+    assert await cache_redis.keys("tcache:hotel_rooms:*") == cached_keys
+
+    # Пересекающаяся бронь этого отеля сбрасывает запись
+    overlapping = await BookingDAO.add(user_id=2, room_id=5, date_from=date(2033, 1, 30), date_to=date(2033, 2, 2))
+    assert await cache_redis.keys("tcache:hotel_rooms:*") == []
+    assert await rooms_left(ac, 5) == 19
+
+    await BookingDAO.delete(id=overlapping.id)
+    assert await rooms_left(ac, 5) == 20
+
+    await BookingDAO.delete(id=other_hotel.id)
+    await BookingDAO.delete(id=adjacent.id)
+
+
+async def test_search_cache_key_and_eviction_on_release(ac: AsyncClient, cache_redis):
+    """
+    Поиск "Алтай" (отели 1–3) на 2033-03-01..2033-03-03 и бронь в отеле 4 (Коми) на те же даты.
+    """
+    params = {"date_from": "2033-03-01", "date_to": "2033-03-03"}
+    response = await ac.get("/hotels/Алтай", params=params)
+    assert response.status_code == 200
+    assert [hotel["id"] for hotel in response.json()["items"]] == [1, 2, 3]
+
+    # Та же локация в другом регистре и с пробелами — та же запись кеша
+    assert (await ac.get("/hotels/ алтай ", params=params)).json() == response.json()
+    assert len(await cache_redis.keys("tcache:hotels_search:*")) == 1
+
+    # Бронь отеля не из выдачи её не меняет, а снятие брони может добавить отель — запись сбрасывается
+    booking = await BookingDAO.add(user_id=2, room_id=7, date_from=date(2033, 3, 2), date_to=date(2033, 3, 4))
+    assert len(await cache_redis.keys("tcache:hotels_search:*")) == 1
+    await BookingDAO.delete(id=booking.id)
+    assert await cache_redis.keys("tcache:hotels_search:*") == []
+
+
+@contextmanager
+def count_queries():
+    """Собирает SQL-запросы, выполненные через engine внутри блока."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+async def test_concurrent_misses_compute_once_per_key(ac: AsyncClient, cache_redis):
+    """
+    По 250 одновременных запросов поиска на два ключа ("Алтай" и "Коми") на 2034-04-01..2034-04-03:
+    SQL-запросов столько же, сколько у двух пересчётов find_page.
+    """
+    params = {"date_from": "2034-04-01", "date_to": "2034-04-03"}
+    with count_queries() as baseline:
+        for location in ("Алтай", "Коми"):
+            await HotelDAO.find_page(location, date(2034, 4, 1), date(2034, 4, 3), limit=20)
+
+    with count_queries() as statements:
+        responses = await asyncio.gather(*[
+            ac.get(f"/hotels/{location}", params=params)
+            for location in ("Алтай", "Коми")
+            for _ in range(250)
+        ])
+    assert all(response.status_code == 200 for response in responses)
+    assert {response.json()["items"][0]["id"] for response in responses} == {1, 4}
+    assert len(statements) == len(baseline)
+
+
+async def test_waits_for_entry_computed_by_other_worker(cache_redis, monkeypatch):
+    """
+    Блокировку ключа держит "другой воркер": запрос не считает сам, а дожидается его записи.
+    """
+    monkeypatch.setattr(settings, "CACHE_REDIS_LOCK", True)
+    calls = []
+
+    @tagged_cache("test_lock", window=request_window, tags=lambda params, data: [])
+    async def compute(date_from: date, date_to: date) -> dict:
+        calls.append((date_from, date_to))
+        return {"source": "this worker"}
+
+    params = {"date_from": date(2034, 5, 1), "date_to": date(2034, 5, 2)}
+    key = _entry_key("test_lock", params)
+    lock = cache_redis.lock(_lock_key(key), timeout=5)
+    assert await lock.acquire(blocking=False)
+
+    task = asyncio.create_task(compute(**params))
+    await asyncio.sleep(0.2)
+    await cache_redis.set(key, encode_entry(json.dumps({"source": "other worker"}), fresh_until=time.time() + 60))
+    await lock.release()
+
+    assert await task == {"source": "other worker"}
+    assert calls == []
+
+
+async def test_stale_entry_served_while_refreshing(cache_redis):
+    """
+    Мягкий TTL 1 сек: после него запрос сразу получает старый ответ, а пересчёт идёт в фоне (один).
+    """
+    calls = []
+
+    @tagged_cache("test_swr", window=request_window, tags=lambda params, data: [], expire=1, stale_ttl=60)
+    async def compute(date_from: date, date_to: date) -> dict:
+        calls.append(date_from)
+        await asyncio.sleep(0.3)
+        return {"version": len(calls)}
+
+    params = {"date_from": date(2034, 6, 1), "date_to": date(2034, 6, 2)}
+    assert await compute(**params) == {"version": 1}
+    await asyncio.sleep(1.1)
+
+    started = time.monotonic()
+    stale = await asyncio.gather(*[compute(**params) for _ in range(10)])
+    assert time.monotonic() - started < 0.2
+    assert stale == [{"version": 1}] * 10
+
+    await asyncio.sleep(0.5)
+    assert len(calls) == 2
+    assert await compute(**params) == {"version": 2}
+
+
+async def test_catalog_import_evicts_cached_responses(ac: AsyncClient, cache_redis):
+    async def rooms(hotel_id: int) -> dict[str, int]:
+        response = await ac.get(f"/hotels/{hotel_id}/rooms", params=ROOMS_PARAMS)
+        return {room["name"]: room["price"] for room in response.json()}
+
+    def csv_file(text: str) -> dict:
+        return {"file": ("rooms.csv", text.encode(), "text/csv")}
+
+    assert "import-evict-room" not in await rooms(3)
+    assert "import-evict-room" not in await rooms(4)
+
+    header = "id;hotel_id;name;description;price;services;quantity;image_id\n"
+    response = await ac.post(
+        "/import/rooms", params={"mode": "copy"}, files=csv_file(header + "9101;3;import-evict-room;;1000;[];2;1\n")
+    )
+    assert response.status_code == 201
+    try:
+        assert (await rooms(3))["import-evict-room"] == 1000
+
+        response = await ac.post(
+            "/import/rooms", params={"mode": "upsert"}, files=csv_file(header + "9101;3;import-evict-room;;1500;[];2;1\n")
+        )
+        assert response.json()["result"]["updated"] == 1
+        assert (await rooms(3))["import-evict-room"] == 1500
+
+        # Перенос номера в отель 4: сбрасываются записи обоих отелей
+        await ac.post(
+            "/import/rooms", params={"mode": "upsert"}, files=csv_file(header + "9101;4;import-evict-room;;1500;[];2;1\n")
+        )
+        assert "import-evict-room" not in await rooms(3)
+        assert (await rooms(4))["import-evict-room"] == 1500
+    finally:
+        await RoomDAO.delete(name="import-evict-room")
@@ -0,0 +1,27 @@
+"""
+Интеграционный тест календаря доступности (RoomDAO.find_calendar).
+Проверяет:
+- Для каждой комнаты и каждого дня число свободных номеров совпадает с RoomDAO.find_all на эту ночь
+- Длина календаря по каждой комнате равна запрошенному числу дней
+"""
+
+from datetime import date, timedelta
+
+from app.hotels.rooms.dao import RoomDAO
+
+
+async def test_calendar_matches_single_night_availability():
+    """Календарь отеля 1 на 20 дней (период с бронями из mock_bookings.json) сверяется с find_all по ночам."""
+    hotel_id, date_from, days = 1, date(2023, 6, 15), 20
+
+    calendar = await RoomDAO.find_calendar(hotel_id, date_from, days)
+
+    assert calendar
+    free_by_room = {room["room_id"]: room["free"] for room in calendar}
+    assert all(len(free) == days for free in free_by_room.values())
+    for i in range(days):
+        night = date_from + timedelta(days=i)
+        rooms = await RoomDAO.find_all(hotel_id, night, night + timedelta(days=1))
+        assert {room["id"]: free_by_room[room["id"]][i] for room in rooms} == {
+            room["id"]: room["rooms_left"] for room in rooms
+        }
@@ -0,0 +1,114 @@
+"""
+Интеграционный тест двухуровневого кеша справочных данных (app/cache/catalog.py).
+Проверяет:
+- Отель по id: промах обоих уровней -> попадание в память воркера -> попадание в Redis
+- Счётчики catalog_cache_requests_total по уровням
+- Инвалидация через Redis pub/sub удаляет запись из памяти воркера
+- Некорректное сообщение в канале не останавливает слушателя: память очищается, он переподключается
+- Значение, прочитанное до инвалидации, не возвращается в кеш после неё (гонка загрузки и правки)
+- GET /hotels/id/{hotel_id} отдаёт отель из кеша
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from httpx import AsyncClient
+from prometheus_client import REGISTRY
+
+from app.cache.catalog import INVALIDATION_CHANNEL, CatalogCache
+from app.hotels.dao import HotelDAO
+
+
+def requests_count(tier: str, result: str) -> float:
+    return REGISTRY.get_sample_value("catalog_cache_requests_total", {"tier": tier, "result": result}) or 0
+
+
+async def test_hotel_served_from_tiers(ac: AsyncClient, cache_redis):
+    """
+    Отель 1 читается трижды: из БД, из памяти воркера и (после очистки памяти) из Redis.
+    """
+    tiers = [("local", "hit"), ("local", "miss"), ("redis", "hit"), ("redis", "miss")]
+    before = {tier: requests_count(*tier) for tier in tiers}
+
+    hotel = await HotelDAO.find_by_id_cached(1)
+    assert hotel["id"] == 1
+    assert await HotelDAO.find_by_id_cached(1) is hotel
+    CatalogCache.local.clear()
+    assert await HotelDAO.find_by_id_cached(1) == hotel
+
+    delta = {tier: requests_count(*tier) - before[tier] for tier in tiers}
+    assert delta == {("local", "hit"): 1, ("local", "miss"): 2, ("redis", "hit"): 1, ("redis", "miss"): 1}
+
+    response = await ac.get("/hotels/id/1")
+    assert response.status_code == 200
+    assert response.json()["name"] == hotel["name"]
+
+
+async def test_invalidation_message_clears_worker_memory(cache_redis):
+    """
+    Сообщение в канал инвалидации (как от админки другого воркера) удаляет отель из памяти.
+    """
+    await HotelDAO.find_by_id_cached(2)
+    assert CatalogCache.local.get("hotels:2") is not None
+
+    listener = asyncio.create_task(CatalogCache.listen(cache_redis))
+    try:
+        await asyncio.sleep(0.2)  # подписка на канал
+        await cache_redis.publish(INVALIDATION_CHANNEL, json.dumps(["hotels:2"]))
+        await asyncio.sleep(0.2)
+        assert CatalogCache.local.get("hotels:2") is None
+    finally:
+        listener.cancel()
+
+    await HotelDAO.invalidate_cached(2)
+    assert await cache_redis.get("tcache:catalog:hotels:2") is None
+
+
+async def test_listener_survives_malformed_message(cache_redis):
+    await HotelDAO.find_by_id_cached(2)
+
+    listener = asyncio.create_task(CatalogCache.listen(cache_redis))
+    try:
+        await asyncio.sleep(0.2)
+        await cache_redis.publish(INVALIDATION_CHANNEL, "not json")
+        await asyncio.sleep(0.2)
+        assert not listener.done()
+        assert CatalogCache.local.get("hotels:2") is None  # пропущенное могло быть важным
+
+        await HotelDAO.find_by_id_cached(2)
+        await asyncio.sleep(1.2)  # пауза перед переподключением и подписка
+        await cache_redis.publish(INVALIDATION_CHANNEL, json.dumps(["hotels:2"]))
+        await asyncio.sleep(0.2)
+        assert CatalogCache.local.get("hotels:2") is None
+    finally:
+        listener.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await listener
+
+
+async def test_load_racing_invalidation_is_not_cached(cache_redis):
+    """
+    Загрузчик читает старую запись, а пока он её возвращает, запись правят и инвалидируют.
+    """
+    loads = []
+
+    async def stale_loader():
+        loads.append(1)
+        row = {"id": 2, "name": "до правки"}
+        if len(loads) == 1:
+            await CatalogCache.invalidate("hotels:2")  # правка закоммичена и сброшена во время загрузки
+        return row
+
+    assert (await CatalogCache.get_or_load("hotels:2", stale_loader))["name"] == "до правки"
+    assert await cache_redis.get("tcache:catalog:hotels:2") is None
+    assert CatalogCache.local.get("hotels:2") is None
+
+    # Следующая загрузка — уже после правки — кешируется как обычно
+    await CatalogCache.get_or_load("hotels:2", stale_loader)
+    assert await cache_redis.get("tcache:catalog:hotels:2") is not None
+    assert await CatalogCache.get_or_load("hotels:2", stale_loader) is not None
+    assert len(loads) == 2
+
+    await HotelDAO.invalidate_cached(2)
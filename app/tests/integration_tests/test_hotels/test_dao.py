@@ -0,0 +1,77 @@
+"""
+Интеграционный тест поиска отелей по локации (HotelDAO.find_all).
+Проверяет:
+- Поиск нечувствителен к регистру, ё/е и крайним пробелам
+- Запрос с опечаткой находит отели по похожему слову (pg_trgm), но только если нет совпадений по подстроке
+- Пустая строка не фильтрует по локации
+- Постраничная выдача (find_page) по курсору next_cursor
+- Фильтры по услугам отеля (services) и цене номера (max_price)
+
+Примечания:
+- Локации согласованы с app/tests/mock_hotels.json (Алтай — id 1-3, Коми/Сыктывкар — id 4-5, Сириус — id 6)
+"""
+
+from datetime import date
+
+import pytest
+
+from app.hotels.dao import HotelDAO
+
+
+@pytest.mark.parametrize(
+    "location, hotel_ids",
+    [
+        ("Алтай", [1, 2, 3]),
+        ("  республика АЛТАЙ ", [1, 2, 3]),
+        ("Посёлок городского типа", [6]),    # ё в запросе и в данных
+        ("Сыктывкр", [4, 5]),                # опечатка
+        ("поселок Сириус", [6]),             # подстроки нет — находится по похожим словам
+        ("", [1, 2, 3, 4, 5, 6]),
+    ]
+)
+async def test_find_all_by_location(location: str, hotel_ids: list[int]):
+    """Ищет отели по локации на свободные даты и сравнивает набор id."""
+    hotels = await HotelDAO.find_all(location, date(2031, 2, 1), date(2031, 2, 5))
+    assert [hotel["id"] for hotel in hotels] == hotel_ids
+
+
+def test_normalize_location():
+    """Нормализация запроса совпадает с выражением колонки location_search."""
+    assert HotelDAO.normalize_location("  Посёлок ЁЛКИ ") == "поселок елки"
+
+
+async def test_find_page_walks_all_hotels_by_cursor():
+    """Проходит поиск страницами по 2 отеля через next_cursor и собирает все id без пропусков и повторов."""
+    date_from, date_to = date(2031, 2, 1), date(2031, 2, 5)
+    hotel_ids, cursor, pages = [], None, 0
+    while True:
+        page = await HotelDAO.find_page("", date_from, date_to, limit=2, cursor=cursor)
+        hotel_ids += [hotel["id"] for hotel in page["items"]]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert hotel_ids == [1, 2, 3, 4, 5, 6]
+    assert pages == 3
+
+
+@pytest.mark.parametrize(
+    "services, hotel_ids",
+    [
+        (["Парковка"], [1, 2, 3, 4, 5, 6]),
+        (["Wi-Fi", "Тренажёрный зал"], [4, 6]),
+        (["Кондиционер в номере", "Wi-Fi"], [1, 5, 6]),
+        (["Сауна"], []),
+    ]
+)
+async def test_find_all_by_services(services: list[str], hotel_ids: list[int]):
+    """Фильтр services: у отеля должны быть все перечисленные услуги (порядок не важен)."""
+    hotels = await HotelDAO.find_all("", date(2031, 2, 1), date(2031, 2, 5), services=services)
+    assert [hotel["id"] for hotel in hotels] == hotel_ids
+
+
+async def test_find_all_by_max_price():
+    """Фильтр max_price: в Коми номер не дороже 4500 есть только в отеле 4, rooms_left — только по нему."""
+    hotels = await HotelDAO.find_all("Коми", date(2031, 2, 1), date(2031, 2, 5), max_price=4500)
+    assert [(hotel["id"], hotel["rooms_left"]) for hotel in hotels] == [(4, 20)]
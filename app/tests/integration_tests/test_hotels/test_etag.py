@@ -0,0 +1,129 @@
+"""
+Интеграционный тест условных GET (ETag / If-None-Match, app/cache/versions.py).
+Проверяет:
+- Ответ содержит ETag; повтор с If-None-Match — 304 без тела и без SQL-запросов
+- Бронь номера отеля меняет ETag его эндпоинтов, но не ETag другого отеля
+- ETag поиска меняется после брони в любом отеле
+- ETag поиска меняется после импорта новых отелей (mode=copy — без upsert)
+- С репликами ответ сразу после увеличения версии отдаётся без ETag (реплика могла не получить запись)
+- Правка номера в админке: запрос с прежним ETag получает 200 уже с новой ценой, а не закешированный ответ
+"""
+
+from datetime import date
+
+from httpx import AsyncClient
+from sqlalchemy import event
+from starlette.requests import Request
+
+from app.admin.views import RoomsAdmin
+
+from app.bookings.dao import BookingDAO
+from app.cache import versions
+from app.cache.versions import HotelVersions
+from app.database import engine
+from app.hotels.dao import HotelDAO
+from app.main import admin
+
+ROOMS_PARAMS = {"date_from": "2033-07-01", "date_to": "2033-07-04"}
+
+
+async def get(ac: AsyncClient, url: str, etag: str | None = None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return await ac.get(url, params=params, headers=headers)
+
+
+async def test_not_modified_until_booking(ac: AsyncClient, cache_redis):
+    """
+    Номера отеля 3, отель 1 по id и поиск "Алтай"; затем бронь комнаты 5 (отель 3) на те же даты.
+    """
+    rooms = await get(ac, "/hotels/3/rooms", **ROOMS_PARAMS)
+    hotel = await get(ac, "/hotels/id/1")
+    search = await get(ac, "/hotels/Алтай", **ROOMS_PARAMS)
+    etags = {name: response.headers["ETag"] for name, response in
+             {"rooms": rooms, "hotel": hotel, "search": search}.items()}
+
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        not_modified = await get(ac, "/hotels/3/rooms", etags["rooms"], **ROOMS_PARAMS)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etags["rooms"]
+    assert statements == []
+
+    # Другие даты — другой ETag
+    other_dates = await get(ac, "/hotels/3/rooms", etags["rooms"], date_from="2033-07-02", date_to="2033-07-04")
+    assert other_dates.status_code == 200
+
+    booking = await BookingDAO.add(user_id=2, room_id=5, date_from=date(2033, 7, 2), date_to=date(2033, 7, 3))
+    try:
+        rooms = await get(ac, "/hotels/3/rooms", etags["rooms"], **ROOMS_PARAMS)
+        assert rooms.status_code == 200
+        assert rooms.headers["ETag"] != etags["rooms"]
+        assert next(room for room in rooms.json() if room["id"] == 5)["rooms_left"] == 19
+
+        assert (await get(ac, "/hotels/id/1", etags["hotel"])).status_code == 304
+        assert (await get(ac, "/hotels/Алтай", etags["search"], **ROOMS_PARAMS)).status_code == 200
+    finally:
+        await BookingDAO.delete(id=booking.id)
+
+
+async def test_search_modified_after_hotel_import(ac: AsyncClient, cache_redis):
+    search = await get(ac, "/hotels/Вологда", **ROOMS_PARAMS)
+    assert (await get(ac, "/hotels/Вологда", search.headers["ETag"], **ROOMS_PARAMS)).status_code == 304
+
+    csv = "name;location;services;rooms_quantity;image_id\netag-import-hotel;Вологда;[];5;1\n"
+    response = await ac.post(
+        "/import/hotels", params={"mode": "copy"}, files={"file": ("hotels.csv", csv.encode(), "text/csv")}
+    )
+    assert response.status_code == 201
+    try:
+        modified = await get(ac, "/hotels/Вологда", search.headers["ETag"], **ROOMS_PARAMS)
+        assert modified.status_code == 200
+        assert modified.headers["ETag"] != search.headers["ETag"]
+    finally:
+        await HotelDAO.delete(location="Вологда")
+
+
+async def test_no_etag_while_replicas_may_lag(ac: AsyncClient, cache_redis, monkeypatch):
+    monkeypatch.setattr(versions, "replica_lag_allowance", lambda: 60)
+    await HotelVersions.bump([3])
+
+    assert "ETag" not in (await get(ac, "/hotels/3/rooms", **ROOMS_PARAMS)).headers
+    assert "ETag" not in (await get(ac, "/hotels/Алтай", **ROOMS_PARAMS)).headers
+    # Версия отеля 1 не менялась
+    assert "ETag" in (await get(ac, "/hotels/id/1")).headers
+
+    monkeypatch.setattr(versions, "replica_lag_allowance", lambda: 0)
+    assert "ETag" in (await get(ac, "/hotels/3/rooms", **ROOMS_PARAMS)).headers
+
+
+async def test_admin_room_edit_refreshes_cached_rooms(ac: AsyncClient, cache_redis):
+    """Цена комнаты 5 (отель 3) меняется в админке после того, как номера отеля попали в кеш."""
+    rooms_admin = next(view for view in admin.views if isinstance(view, RoomsAdmin))
+    request = Request({"type": "http", "method": "POST", "headers": []})
+
+    def price(response) -> int:
+        return next(room["price"] for room in response.json() if room["id"] == 5)
+
+    cached = await get(ac, "/hotels/3/rooms", **ROOMS_PARAMS)
+    old_price = price(cached)
+    assert price(await get(ac, "/hotels/3/rooms", **ROOMS_PARAMS)) == old_price  # из кеша
+    search = await get(ac, "/hotels/Алтай", **ROOMS_PARAMS)
+
+    await rooms_admin.update_model(request, "5", {"price": old_price + 100})
+    try:
+        rooms = await get(ac, "/hotels/3/rooms", cached.headers["ETag"], **ROOMS_PARAMS)
+        assert rooms.status_code == 200
+        assert price(rooms) == old_price + 100
+        assert (await get(ac, "/hotels/3/rooms", rooms.headers["ETag"], **ROOMS_PARAMS)).status_code == 304
+        assert (await get(ac, "/hotels/Алтай", search.headers["ETag"], **ROOMS_PARAMS)).status_code == 200
+        assert await cache_redis.keys("tcache:hotels_search:*") != []  # поиск пересчитан и снова в кеше
+    finally:
+        await rooms_admin.update_model(request, "5", {"price": old_price})
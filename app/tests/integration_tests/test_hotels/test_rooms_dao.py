@@ -0,0 +1,23 @@
+"""
+Интеграционный тест пакетного получения номеров (RoomDAO.find_all_for_hotels).
+Проверяет:
+- Результат по каждому отелю совпадает с RoomDAO.find_all для этого отеля
+- Отель без номеров / несуществующий отель возвращается с пустым списком
+"""
+
+from datetime import date
+
+from app.hotels.rooms.dao import RoomDAO
+
+
+async def test_find_all_for_hotels_matches_find_all():
+    """Сравнивает пакетный ответ для отелей 1, 3 и несуществующего 999 с поштучными вызовами find_all."""
+    date_from, date_to = date(2023, 6, 1), date(2023, 6, 20)
+
+    rooms_by_hotel = await RoomDAO.find_all_for_hotels([1, 3, 999], date_from, date_to)
+
+    assert list(rooms_by_hotel) == [1, 3, 999]
+    assert rooms_by_hotel[999] == []
+    for hotel_id in (1, 3):
+        single = await RoomDAO.find_all(hotel_id, date_from, date_to)
+        assert rooms_by_hotel[hotel_id] == sorted(single, key=lambda room: room["id"])
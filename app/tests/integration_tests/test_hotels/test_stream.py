@@ -0,0 +1,59 @@
+"""
+Интеграционный тест потоковой выдачи поиска (Accept: application/x-ndjson).
+Проверяет:
+- NDJSON содержит те же отели, что и JSON-страница, по объекту SHotelInfo на строку
+- cursor применяется, limit — нет
+- HotelDAO.stream_all читает серверный курсор порциями по batch_size строк
+- У JSON и NDJSON разные ETag
+"""
+
+import json
+from datetime import date
+
+from httpx import AsyncClient
+
+from app.hotels.dao import HotelDAO
+
+PARAMS = {"date_from": "2033-07-01", "date_to": "2033-07-05"}
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def parse_ndjson(text: str) -> list[dict]:
+    assert text.endswith("\n")
+    return [json.loads(line) for line in text.splitlines()]
+
+
+async def test_ndjson_stream_matches_json_page(ac: AsyncClient):
+    page = await ac.get("/hotels/Алтай", params={**PARAMS, "limit": 100})
+    assert page.status_code == 200
+
+    response = await ac.get("/hotels/Алтай", params=PARAMS, headers=NDJSON)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["vary"] == "Accept"
+    assert parse_ndjson(response.text) == page.json()["items"]
+
+    # cursor продолжает выдачу, limit потоком игнорируется
+    after_first = await ac.get("/hotels/Алтай", params={**PARAMS, "cursor": 1, "limit": 1}, headers=NDJSON)
+    assert parse_ndjson(after_first.text) == page.json()["items"][1:]
+
+
+async def test_stream_all_reads_in_batches():
+    batches = [
+        list(rows)
+        async for rows in HotelDAO.stream_all("", date(2033, 7, 1), date(2033, 7, 5), batch_size=2)
+    ]
+    assert len(batches) > 1
+    assert all(len(rows) <= 2 for rows in batches)
+    hotels = await HotelDAO.find_all("", date(2033, 7, 1), date(2033, 7, 5))
+    assert [row for rows in batches for row in rows] == list(hotels)
+
+
+async def test_ndjson_has_own_etag(ac: AsyncClient, cache_redis):
+    json_etag = (await ac.get("/hotels/Коми", params=PARAMS)).headers["etag"]
+    response = await ac.get("/hotels/Коми", params=PARAMS, headers=NDJSON)
+    assert response.status_code == 200
+    assert response.headers["etag"] != json_etag
+
+    not_modified = await ac.get("/hotels/Коми", params=PARAMS, headers={**NDJSON, "If-None-Match": response.headers["etag"]})
+    assert not_modified.status_code == 304
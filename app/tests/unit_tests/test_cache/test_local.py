@@ -0,0 +1,43 @@
+"""
+Юнит-тест кеша в памяти воркера LocalTTLCache (1-й уровень кеша справочных данных).
+Проверяет:
+- При переполнении вытесняется давно не использованная запись (чтение продлевает "свежесть")
+- Запись недоступна после TTL и удаляется из памяти
+"""
+
+import pytest
+
+from app.cache import catalog
+from app.cache.catalog import LocalTTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Подменяет time.monotonic модуля кеша управляемыми часами."""
+    now = [1000.0]
+    monkeypatch.setattr(catalog.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_eviction(clock):
+    cache = LocalTTLCache(max_entries=2, ttl=60)
+    cache.set("hotels:1", {"id": 1})
+    cache.set("hotels:2", {"id": 2})
+    assert cache.get("hotels:1") == {"id": 1}
+
+    cache.set("hotels:3", {"id": 3})
+    assert len(cache) == 2
+    assert cache.get("hotels:2") is None
+    assert cache.get("hotels:1") == {"id": 1}
+    assert cache.get("hotels:3") == {"id": 3}
+
+
+def test_ttl_expiry(clock):
+    cache = LocalTTLCache(max_entries=10, ttl=60)
+    cache.set("rooms:5", {"id": 5})
+
+    clock[0] += 59
+    assert cache.get("rooms:5") == {"id": 5}
+    clock[0] += 1
+    assert cache.get("rooms:5", "missing") == "missing"
+    assert len(cache) == 0
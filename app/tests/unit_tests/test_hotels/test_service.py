@@ -0,0 +1,70 @@
+"""
+Юнит-тест поиска гибких дат RoomsService.find_best_dates.
+Проверяет:
+- Окна выбираются только там, где комната свободна все ночи подряд
+- Сортировка: total_cost, затем дата заезда, затем id комнаты; top-k обрезается по limit
+- Результат совпадает с полным перебором окон
+
+Примечания:
+- RoomDAO.find_calendar подменяется фиксированным календарём (без БД)
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from app.hotels.rooms.dao import RoomDAO
+from app.hotels.rooms.service import RoomsService
+
+WITHIN_FROM = date(2030, 1, 1)
+CALENDAR = [
+    {"room_id": 1, "quantity": 2, "price": 3000, "free": [2, 1, 0, 1, 2, 2, 1, 0]},
+    {"room_id": 2, "quantity": 1, "price": 1000, "free": [0, 1, 1, 0, 1, 1, 1, 1]},
+    {"room_id": 3, "quantity": 3, "price": 1000, "free": [3, 3, 3, 3, 3, 3, 3, 3]},
+]
+
+
+@pytest.fixture
+def fake_calendar(monkeypatch):
+    """Подменяет календарь отеля фиксированными данными CALENDAR."""
+    async def find_calendar(hotel_id: int, date_from: date, days: int) -> list[dict]:
+        return [{**room, "free": room["free"][:days]} for room in CALENDAR]
+
+    monkeypatch.setattr(RoomDAO, "find_calendar", find_calendar)
+
+
+def brute_force(nights: int, days: int) -> list[dict]:
+    """Эталон: перебор всех (комната, дата заезда) без NumPy."""
+    windows = []
+    for room in CALENDAR:
+        for start in range(days - nights + 1):
+            rooms_left = min(room["free"][start:start + nights])
+            if rooms_left > 0:
+                windows.append({
+                    "room_id": room["room_id"],
+                    "date_from": WITHIN_FROM + timedelta(days=start),
+                    "date_to": WITHIN_FROM + timedelta(days=start + nights),
+                    "total_cost": room["price"] * nights,
+                    "rooms_left": rooms_left,
+                })
+    return sorted(windows, key=lambda w: (w["total_cost"], w["date_from"], w["room_id"]))
+
+
+@pytest.mark.parametrize("nights, limit", [(1, 100), (2, 100), (3, 5), (8, 10), (9, 10)])
+async def test_find_best_dates_matches_brute_force(fake_calendar, nights: int, limit: int):
+    """Сравнивает результат сервиса с полным перебором на календаре из 8 дней."""
+    days = 8
+    best_dates = await RoomsService.find_best_dates(
+        1, nights, WITHIN_FROM, WITHIN_FROM + timedelta(days=days), limit,
+    )
+    assert best_dates == brute_force(nights, days)[:limit]
+
+
+async def test_find_best_dates_cheapest_first(fake_calendar):
+    """При равной цене (комнаты 2 и 3) раньше идёт более ранняя дата заезда, затем меньший id комнаты."""
+    best_dates = await RoomsService.find_best_dates(1, 2, WITHIN_FROM, WITHIN_FROM + timedelta(days=8), 3)
+    assert [(w["room_id"], w["date_from"]) for w in best_dates] == [
+        (3, date(2030, 1, 1)),
+        (2, date(2030, 1, 2)),
+        (3, date(2030, 1, 2)),
+    ]
@@ -0,0 +1,64 @@
+"""
+Юнит-тест разбора CSV по схеме таблицы (app/importer/parsing.py, app/importer/utils.py).
+Проверяет:
+- Типы колонок берутся из модели (вычисляемые колонки не импортируются)
+- Значения приводятся по типу колонки: пустая ячейка — None (у строковых — ""), строка из цифр
+  в текстовой колонке остаётся строкой, JSON в одинарных кавычках принимается
+- Ошибка приведения называет колонку и значение
+- Порции заканчиваются на границе записи: перевод строки в кавычках не разрывает запись
+"""
+
+import io
+from datetime import date
+
+import pytest
+
+from app.bookings.models import Bookings
+from app.hotels.models import Hotels
+from app.hotels.rooms.models import Rooms
+from app.importer.parsing import column_kinds, parse_chunk
+from app.importer.utils import _read_chunk
+
+
+def test_column_kinds_from_model():
+    assert column_kinds(Hotels.__table__) == {
+        "id": "int", "name": "str", "location": "str", "services": "json", "rooms_quantity": "int", "image_id": "int",
+    }
+    assert column_kinds(Bookings.__table__)["date_from"] == "date"
+    assert "total_cost" not in column_kinds(Bookings.__table__)
+
+
+def test_parse_chunk_converts_by_column_type():
+    header = ["hotel_id", "name", "description", "price", "services", "quantity", "image_id"]
+    chunk = (
+        '4;101;;2500;"[""Wi-Fi""]";3;\n'
+        "4;Люкс;Вид на море;9000;['Сейф', 'Мини-бар'];1;2\n"
+    ).encode()
+    assert parse_chunk(chunk, header, column_kinds(Rooms.__table__)) == [
+        {"hotel_id": 4, "name": "101", "description": "", "price": 2500, "services": ["Wi-Fi"], "quantity": 3, "image_id": None},
+        {"hotel_id": 4, "name": "Люкс", "description": "Вид на море", "price": 9000,
+         "services": ["Сейф", "Мини-бар"], "quantity": 1, "image_id": 2},
+    ]
+
+    rows = parse_chunk(b"5;1;2031-01-05;2031-1-9;500\n", ["room_id", "user_id", "date_from", "date_to", "price"],
+                       column_kinds(Bookings.__table__))
+    assert (rows[0]["date_from"], rows[0]["date_to"]) == (date(2031, 1, 5), date(2031, 1, 9))
+
+
+def test_parse_chunk_errors_name_column():
+    kinds = column_kinds(Bookings.__table__)
+    with pytest.raises(ValueError, match="price.*'5OO'"):
+        parse_chunk(b"5;1;2031-01-05;2031-01-09;500\n5;1;2031-01-05;2031-01-09;5OO\n",
+                    ["room_id", "user_id", "date_from", "date_to", "price"], kinds)
+    with pytest.raises(ValueError, match="Ожидалось колонок: 2"):
+        parse_chunk(b"5;1\n5;1;7\n", ["room_id", "user_id"], kinds)
+
+
+def test_read_chunk_keeps_quoted_newlines_in_record():
+    file = io.BytesIO('4;a;"строка 1\nстрока 2";1\n4;b;;2\n4;c;;3\n'.encode())
+    first = _read_chunk(file, 1)
+    assert first == '4;a;"строка 1\nстрока 2";1\n'.encode()
+    assert _read_chunk(file, 5) == b"4;b;;2\n4;c;;3\n"
+    assert _read_chunk(file, 5) == b""
+    [row] = parse_chunk(first, ["hotel_id", "name", "description", "quantity"], column_kinds(Rooms.__table__))
+    assert row["description"] == "строка 1\nстрока 2"
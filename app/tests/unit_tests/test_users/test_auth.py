@@ -0,0 +1,62 @@
+"""
+Юнит-тест хеширования паролей вне цикла событий (app/users/auth.py).
+Проверяет:
+- Хеш и проверка пароля работают через пул потоков bcrypt
+- Пока идут проверки паролей, цикл событий продолжает обслуживать другие задачи
+- Одновременно выполняется не больше PASSWORD_HASH_THREADS проверок, остальные ждут в очереди;
+  ожидание и время bcrypt попадают в метрики Prometheus
+"""
+
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+
+from app.config import settings
+from app.users import auth
+
+
+def histogram(name: str, operation: str) -> tuple[float, float]:
+    """(число наблюдений, сумма) гистограммы для operation."""
+    return tuple(
+        REGISTRY.get_sample_value(f"{name}_{suffix}", {"operation": operation}) or 0.0 for suffix in ("count", "sum")
+    )
+
+
+async def test_bcrypt_runs_off_event_loop(monkeypatch):
+    auth.shutdown_hash_executor()
+    monkeypatch.setattr(settings, "PASSWORD_HASH_THREADS", 1)
+    hashed = await auth.get_password_hash("secret")
+    queued_before = histogram("password_hash_queue_seconds", "verify")
+    timed_before = histogram("password_hash_seconds", "verify")
+
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    try:
+        results = await asyncio.gather(
+            auth.verify_password("secret", hashed),
+            auth.verify_password("wrong", hashed),
+            auth.verify_password("secret", hashed),
+        )
+    finally:
+        ticking.cancel()
+        auth.shutdown_hash_executor()
+    elapsed = time.perf_counter() - started
+
+    assert results == [True, False, True]
+    # Цикл не замирал на время bcrypt: паузы между тиками много короче одной проверки
+    gaps = [later - earlier for earlier, later in zip(ticks, ticks[1:])]
+    assert max(gaps) < elapsed / 3
+    queued = histogram("password_hash_queue_seconds", "verify")
+    timed = histogram("password_hash_seconds", "verify")
+    assert (queued[0] - queued_before[0], timed[0] - timed_before[0]) == (3, 3)
+    # Один поток: вторая проверка ждала в очереди одну, третья — две; в сумме не меньше одной проверки
+    one_verify = (timed[1] - timed_before[1]) / 3
+    assert queued[1] - queued_before[1] >= one_verify
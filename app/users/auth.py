@@ -1,16 +1,22 @@
 """
 Модуль аутентификации пользователей:
-- Хеширование и проверка паролей (bcrypt + passlib)
+- Хеширование и проверка паролей (bcrypt + passlib) в отдельном пуле потоков: bcrypt отпускает GIL,
+  и цикл событий воркера не стоит 100–300 мс на каждом входе и регистрации
 - Генерация JWT-токенов (с exp, alg из настроек)
 - Аутентификация пользователя по email и паролю
 
 ВНИМАНИЕ: Для корректной работы bcrypt требуется установить пакет pip install "passlib[bcrypt]"
 """
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime, timedelta
+from typing import Callable, TypeVar
 
 from jose import jwt
 from passlib.context import CryptContext
+from prometheus_client import Histogram
 from pydantic import EmailStr
 
 from app.config import settings
@@ -19,22 +25,84 @@ from app.users.dao import UsersDAO
 # Настройка passlib с использованием bcrypt для безопасного хранения паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def get_password_hash(password: str) -> str:
+T = TypeVar("T")
+
+PASSWORD_HASH_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PASSWORD_HASH_QUEUE_SECONDS = Histogram(
+    "password_hash_queue_seconds",
+    "Ожидание свободного потока для bcrypt (operation: hash — регистрация, verify — вход)",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Время самого хеширования или проверки пароля bcrypt",
+    ["operation"],
+    buckets=PASSWORD_HASH_BUCKETS,
+)
+
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_slots: asyncio.Semaphore | None = None
+
+
+def _get_hash_executor() -> tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+    """
+    Пул потоков bcrypt (PASSWORD_HASH_THREADS) и семафор с тем же числом мест; создаются при первом вызове.
+    Пул отдельный от пула потоков Starlette: всплеск входов не занимает потоки остальных обработчиков.
+    Очередь — на семафоре в цикле событий, а не в пуле: запрос, отменённый во время ожидания
+    (клиент отключился), не оставляет в очереди пула хеширование, которое уже никому не нужно.
+    """
+    global _hash_executor, _hash_slots
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(settings.PASSWORD_HASH_THREADS, thread_name_prefix="bcrypt")
+        _hash_slots = asyncio.Semaphore(settings.PASSWORD_HASH_THREADS)
+    return _hash_executor, _hash_slots
+
+
+def shutdown_hash_executor() -> None:
+    """Останавливает пул потоков bcrypt (main.lifespan при остановке)."""
+    global _hash_executor, _hash_slots
+    if _hash_executor is not None:
+        _hash_executor.shutdown(cancel_futures=True)
+        _hash_executor = _hash_slots = None
+
+
+async def _run_bcrypt(operation: str, func: Callable[..., T], *args) -> T:
+    """
+    Выполняет func в пуле потоков bcrypt и пишет в метрики ожидание места и время выполнения.
+
+    :param operation: метка метрик ("hash" или "verify")
+    :param func: метод pwd_context
+    :return: результат func
+    """
+    executor, slots = _get_hash_executor()
+    queued_at = time.perf_counter()
+    async with slots:
+        started_at = time.perf_counter()
+        PASSWORD_HASH_QUEUE_SECONDS.labels(operation).observe(started_at - queued_at)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            PASSWORD_HASH_SECONDS.labels(operation).observe(time.perf_counter() - started_at)
+
+
+async def get_password_hash(password: str) -> str:
     """
-    Возвращает bcrypt-хеш пароля.
+    Возвращает bcrypt-хеш пароля (вычисляется в пуле потоков bcrypt).
     :param password: Пароль в открытом виде
     :return: Хешированный пароль (str)
     """
-    return pwd_context.hash(password)
+    return await _run_bcrypt("hash", pwd_context.hash, password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Проверяет, совпадает ли исходный пароль с хешем.
+    Проверяет, совпадает ли исходный пароль с хешем (в пуле потоков bcrypt).
     :param plain_password: Обычный пароль пользователя
     :param hashed_password: Сохранённый хеш из БД
     :return: True если совпадает, иначе False
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await _run_bcrypt("verify", pwd_context.verify, plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
     """
@@ -61,7 +129,7 @@ async def authenticate_user(email: EmailStr, password: str):
     :param password: пароль пользователя
     :return: Объект пользователя или None (если не найден/неверный пароль)
     """
-    user = await UsersDAO.find_one_or_none(email=email)
-    if not user or not verify_password(password, user.hashed_password):
+    user = await UsersDAO.find_one_or_none(primary=True, email=email)  # вход сразу после регистрации
+    if not user or not await verify_password(password, user.hashed_password):
         return None
     return user
@@ -29,10 +29,10 @@ async def register_user(user_data: SUserAuth) -> None:
     :raises UserAlreadyExistsException: если пользователь с таким email уже существует
     :return: None (статус 201 Created)
     """
-    existing_user = await UsersDAO.find_one_or_none(email=user_data.email)
+    existing_user = await UsersDAO.find_one_or_none(primary=True, email=user_data.email)
     if existing_user:
         raise UserAlreadyExistsException
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     await UsersDAO.add(email=user_data.email, hashed_password=hashed_password)
 
 